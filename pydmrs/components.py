@@ -4,6 +4,7 @@ try:
 except ImportError:  # Python v3.2 or less
     from collections import MutableMapping
 from abc import ABCMeta
+from contextlib import contextmanager
 from functools import total_ordering
 from itertools import chain
 from warnings import warn
@@ -11,6 +12,52 @@ from warnings import warn
 from pydmrs._exceptions import *
 
 
+# Validation levels control how carefully input is checked when constructing components:
+# STRICT: normalise input, raising errors for invalid input and warning about unnormalised input
+# NORMALISE: normalise input, but skip all checks and warnings
+# TRUSTED: assume input is already normalised (e.g. output written by pydmrs),
+#          only converting from serialised forms (stripping '_rel' from preds and quotes from cargs)
+
+STRICT = 'strict'
+NORMALISE = 'normalise'
+TRUSTED = 'trusted'
+VALIDATION_LEVELS = (STRICT, NORMALISE, TRUSTED)
+
+_validation_level = STRICT
+
+
+def get_validation_level():
+    """
+    Return the current validation level
+    """
+    return _validation_level
+
+
+def set_validation_level(level):
+    """
+    Set the validation level globally (STRICT, NORMALISE, or TRUSTED)
+    """
+    global _validation_level
+    if level not in VALIDATION_LEVELS:
+        raise PydmrsValueError('validation level must be one of {}'.format(VALIDATION_LEVELS))
+    _validation_level = level
+
+
+@contextmanager
+def validation_level(level):
+    """
+    Temporarily set the validation level globally, within a 'with' statement
+    (this affects all threads; to validate one call differently,
+    pass the level explicitly, e.g. the validation argument of the loaders in pydmrs.serial)
+    """
+    old_level = _validation_level
+    set_validation_level(level)
+    try:
+        yield
+    finally:
+        set_validation_level(old_level)
+
+
 @total_ordering
 class Pred(object):
     """
@@ -38,55 +85,140 @@ class Pred(object):
         """
         return type(other) == Pred
 
+    def __hash__(self):
+        """
+        All Pred() instances are equal, so share a hash
+        """
+        return hash(Pred)
+
     def __le__(self, other):
         """
         Checks whether the other object is a Pred (including subclasses)
         """
         return isinstance(other, Pred)
+
+    # Comparison operators implement underspecification, which is only a partial order.
+    # For sorting (e.g. with sorted, bisect, or merge-joins), use sort_key instead,
+    # which gives a consistent total order: Pred() < RealPreds < GPreds,
+    # with RealPreds ordered by lemma, pos, then sense, and GPreds by name.
+    # Equal preds have equal keys, and different preds have different keys.
+
+    @property
+    def sort_key(self):
+        """
+        A key for sorting preds in a consistent total order
+        """
+        return (0,)
+
+    # Dict conversion (e.g. for JSON)
+    # Fields are stored separately, since pred strings are ambiguous
+    # (lemmas may contain underscores, and 'predsort' could be Pred() or a GPred)
+
+    def to_dict(self):
+        """
+        Return a dict with the type and fields of the pred (see Pred.from_dict)
+        """
+        return {'type': 'pred'}
+
+    @staticmethod
+    def from_dict(dictionary, level=None):
+        """
+        Create a pred from a dict produced by to_dict
+        (at the given validation level, which defaults to the global level)
+        """
+        predtype = dictionary.get('type')
+        if predtype == 'real':
+            return RealPred(dictionary['lemma'], dictionary['pos'], dictionary.get('sense'), level=level)
+        elif predtype == 'gpred':
+            return GPred(dictionary['name'])
+        elif predtype == 'pred':
+            return Pred()
+        else:
+            raise PydmrsValueError('invalid pred type: {}'.format(predtype))
     
     @staticmethod
-    def normalise_string(string):
+    def normalise_string(string, level=None):
         """
         Normalises a predicate string
+        (checks are skipped unless the validation level is STRICT,
+        and only '_rel' is stripped if the validation level is TRUSTED)
+        The validation level defaults to the global level
         """
-        # Disallow spaces
-        if ' ' in string:
-            raise PydmrsValueError('Predicates must not contain spaces')
-        # Strip surrounding quotes and disallow other quotes
-        if string[0] == '"' and string[-1] == '"':
-            string = string[1:-1]
-        if string[0] == "'":
-            warn('Predicates with opening single-quote have been deprecated', PydmrsDeprecationWarning)
-            string = string[1:]
-        if '"' in string:
-            raise PydmrsValueError('Predicates must not contain quotes')
-        # Force lower case
-        if not string.islower():
-            warn('Predicates must be lower-case', PydmrsWarning)
-            string = string.lower()
+        string, messages = Pred._normalise_string(string, level)
+        for message, category in messages:
+            warn(message, category, stacklevel=2)
+        return string
+
+    @staticmethod
+    def _normalise_string(string, level=None):
+        """
+        Normalise a predicate string (see normalise_string),
+        returning the string and a list of (message, category) pairs for any warnings
+        """
+        messages = []
+        if level is None:
+            level = _validation_level
+        if level != TRUSTED:
+            strict = (level == STRICT)
+            # Disallow spaces
+            if strict and ' ' in string:
+                raise PydmrsValueError('Predicates must not contain spaces')
+            # Strip surrounding quotes and disallow other quotes
+            if string[0] == '"' and string[-1] == '"':
+                string = string[1:-1]
+            if string[0] == "'":
+                if strict:
+                    messages.append(('Predicates with opening single-quote have been deprecated', PydmrsDeprecationWarning))
+                string = string[1:]
+            if strict and '"' in string:
+                raise PydmrsValueError('Predicates must not contain quotes')
+            # Force lower case
+            if not string.islower():
+                if strict:
+                    messages.append(('Predicates must be lower-case', PydmrsWarning))
+                string = string.lower()
         # Strip trailing '_rel'
         if string[-4:] == '_rel':
             string = string[:-4]
         
-        return string
+        return string, messages
     
     @classmethod
-    def from_string(cls, string):
+    def from_string(cls, string, level=None):
         """
-        Instantiates a pred from a string, normalising as necessary
+        Instantiates a pred from a string, normalising as necessary.
+        Results are cached (see intern_pred), so repeated strings
+        return the same instance, and are only normalised once
+        (except for strings which give warnings, so that the warnings are repeated).
+        The validation level defaults to the global level
         """
-        normalised = cls.normalise_string(string)
-        return cls.from_normalised_string(normalised)
+        if level is None:
+            level = _validation_level
+        key = (cls, string, level)
+        try:
+            return _pred_strings[key]
+        except KeyError:
+            pass
+        normalised, messages = cls._normalise_string(string, level)
+        for message, category in messages:
+            warn(message, category, stacklevel=2)
+        pred = intern_pred(cls.from_normalised_string(normalised, level))
+        if messages:
+            return pred
+        if pred_cache_size is not None and len(_pred_strings) >= pred_cache_size:
+            _pred_strings.clear()
+        _pred_strings[key] = pred
+        return pred
 
     @staticmethod
-    def from_normalised_string(string):
+    def from_normalised_string(string, level=None):
         """
         Instantiates a suitable type of Pred, from a string
         """
         if string[0] == '_':
-            return RealPred.from_normalised_string(string)
+            return RealPred.from_normalised_string(string, level)
         else:
-            return GPred.from_normalised_string(string)
+            return GPred.from_normalised_string(string, level)
 
 
 class RealPred(namedtuple('RealPredNamedTuple', ('lemma', 'pos', 'sense')), Pred):
@@ -99,16 +231,17 @@ class RealPred(namedtuple('RealPredNamedTuple', ('lemma', 'pos', 'sense')), Pred
 
     __slots__ = ()  # Suppress __dict__
 
-    def __new__(cls, lemma, pos, sense=None):
+    def __new__(cls, lemma, pos, sense=None, *, level=None):
         """
         Create a new instance, allowing the sense to be optional,
         and requiring non-empty lemma and pos
+        (spaces are only checked if the validation level is STRICT, which defaults to the global level)
         """
         if not lemma:
             raise PydmrsValueError('a RealPred must have non-empty lemma')
         if not pos:
             raise PydmrsValueError('a RealPred must have non-empty pos')
-        if ' ' in lemma or ' ' in pos or (sense and ' ' in sense):
+        if (_validation_level if level is None else level) == STRICT and (' ' in lemma or ' ' in pos or (sense and ' ' in sense)):
             raise PydmrsValueError('the values of a RealPred must not contain spaces')
         return super().__new__(cls, lemma, pos, sense)
 
@@ -134,6 +267,8 @@ class RealPred(namedtuple('RealPredNamedTuple', ('lemma', 'pos', 'sense')), Pred
         """
         Checks whether this RealPred underspecifies or equals the other RealPred
         """
+        if self is other:
+            return True
         return isinstance(other, RealPred) \
             and (self.lemma == '?' or self.lemma == other.lemma) \
             and (self.pos in ('?', 'u') or self.pos == other.pos) \
@@ -157,11 +292,25 @@ class RealPred(namedtuple('RealPredNamedTuple', ('lemma', 'pos', 'sense')), Pred
         """
         return self >= other and self != other
 
+    @property
+    def sort_key(self):
+        """
+        A key for sorting preds in a consistent total order (see Pred.sort_key)
+        """
+        return (1, self.lemma, self.pos, self.sense is not None, self.sense or '')
+
+    def to_dict(self):
+        """
+        Return a dict with the type and fields of the pred (see Pred.from_dict)
+        """
+        return {'type': 'real', 'lemma': self.lemma, 'pos': self.pos, 'sense': self.sense}
+
     @staticmethod
-    def from_normalised_string(string):
+    def from_normalised_string(string, level=None):
         """
         Create a new instance from a normalised string.
         :param string: Input string
+        :param level: Validation level (defaults to the global level)
         :return: RealPred object
         """
         # Require initial underscore
@@ -173,7 +322,7 @@ class RealPred(namedtuple('RealPredNamedTuple', ('lemma', 'pos', 'sense')), Pred
         # Require at least 2 parts
         if len(parts) < 2:
             raise PydmrsValueError("RealPred strings must have a part of speech separated by an underscore")
-        return RealPred(*parts)
+        return RealPred(*parts, level=level)
 
 
 class GPred(namedtuple('GPredNamedTuple', ('name')), Pred):
@@ -208,6 +357,8 @@ class GPred(namedtuple('GPredNamedTuple', ('name')), Pred):
         """
         Checks whether this GPred underspecifies or equals the other GPred
         """
+        if self is other:
+            return True
         return isinstance(other, GPred) and (self.name == '?' or self.name == other.name)
 
     def __lt__(self, other):
@@ -228,8 +379,21 @@ class GPred(namedtuple('GPredNamedTuple', ('name')), Pred):
         """
         return self >= other and self != other
 
+    @property
+    def sort_key(self):
+        """
+        A key for sorting preds in a consistent total order (see Pred.sort_key)
+        """
+        return (2, self.name)
+
+    def to_dict(self):
+        """
+        Return a dict with the type and fields of the pred (see Pred.from_dict)
+        """
+        return {'type': 'gpred', 'name': self.name}
+
     @staticmethod
-    def from_normalised_string(string):
+    def from_normalised_string(string, level=None):
         """
         Create a new instance from a normalised string.
         """
@@ -239,6 +403,151 @@ class GPred(namedtuple('GPredNamedTuple', ('name')), Pred):
             return GPred(string)
 
 
+# Preds are immutable, so equal preds can share a single instance.
+# Preds created from strings are also cached by the raw string (and validation level),
+# so that repeated strings are only normalised once.
+# Each cache is cleared when it reaches pred_cache_size (set to None for no limit).
+
+pred_cache_size = 2 ** 17
+_interned_preds = {}
+_pred_strings = {}
+
+
+def intern_pred(pred):
+    """
+    Return the canonical instance of a pred,
+    so that equal preds share one object
+    """
+    key = (type(pred), pred)
+    try:
+        return _interned_preds[key]
+    except KeyError:
+        pass
+    if pred_cache_size is not None and len(_interned_preds) >= pred_cache_size:
+        _interned_preds.clear()
+    _interned_preds[key] = pred
+    return pred
+
+
+def clear_pred_cache():
+    """
+    Empty the caches of interned preds
+    """
+    _interned_preds.clear()
+    _pred_strings.clear()
+
+
+class PredVocabulary(object):
+    """
+    A mapping between preds and dense integer ids (0, 1, 2, ...),
+    so that preds can be stored and compared as integers.
+    Ids are assigned in order of first addition, and a vocabulary saved with dump()
+    and loaded with load() gives the same ids in every process.
+    """
+
+    def __init__(self, preds=()):
+        """
+        Initialise the vocabulary, adding the given preds in order
+        """
+        self._ids = {}
+        self._preds = []
+        for pred in preds:
+            self.add(pred)
+
+    def __len__(self):
+        return len(self._preds)
+
+    def __iter__(self):
+        """
+        Iterate through preds, in order of id
+        """
+        return iter(self._preds)
+
+    def __contains__(self, pred):
+        return pred in self._ids
+
+    def __eq__(self, other):
+        return isinstance(other, PredVocabulary) and self._preds == other._preds
+
+    def __reduce__(self):
+        """
+        Pickle only the list of preds (e.g. to send to worker processes)
+        """
+        return (PredVocabulary, (self._preds,))
+
+    def add(self, pred):
+        """
+        Return the id of a pred, adding it to the vocabulary if necessary
+        """
+        try:
+            return self._ids[pred]
+        except KeyError:
+            pred = intern_pred(pred)
+            pred_id = len(self._preds)
+            self._ids[pred] = pred_id
+            self._preds.append(pred)
+            return pred_id
+
+    def get_id(self, pred):
+        """
+        Return the id of a pred, raising a KeyError if it is not in the vocabulary
+        """
+        try:
+            return self._ids[pred]
+        except KeyError:
+            raise PydmrsKeyError(pred)
+
+    def get_pred(self, pred_id):
+        """
+        Return the pred with a given id
+        """
+        return self._preds[pred_id]
+
+    def annotate(self, nodes, add=True):
+        """
+        Set a 'pred_id' attribute on each node (e.g. dmrs.iter_nodes()),
+        adding preds to the vocabulary if necessary (unless add is False).
+        The attribute is not updated if the node's pred is changed later.
+        """
+        lookup = self.add if add else self.get_id
+        for node in nodes:
+            node.pred_id = lookup(node.pred)
+
+    # Saving and loading
+    # Each line has the type of pred ('r', 'g', or 'p' for Pred()) and its fields, separated by tabs
+    # (A RealPred's string is ambiguous, as lemmas may contain underscores and senses are optional)
+
+    def dump(self, filehandle):
+        """
+        Write the vocabulary to a (text) file, one pred per line, in order of id
+        """
+        for pred in self._preds:
+            if isinstance(pred, RealPred):
+                filehandle.write('r\t{}\t{}\t{}\n'.format(pred.lemma, pred.pos, pred.sense or ''))
+            elif isinstance(pred, GPred):
+                filehandle.write('g\t{}\n'.format(pred.name))
+            else:
+                filehandle.write('p\n')
+
+    @classmethod
+    def load(cls, filehandle):
+        """
+        Read a vocabulary written by dump()
+        """
+        preds = []
+        for line in filehandle:
+            fields = line.rstrip('\n').split('\t')
+            if fields[0] == 'r':
+                preds.append(RealPred(fields[1], fields[2], fields[3] or None))
+            elif fields[0] == 'g':
+                preds.append(GPred(fields[1]))
+            elif fields[0] == 'p':
+                preds.append(Pred())
+            else:
+                raise PydmrsValueError('invalid pred vocabulary line: {}'.format(line))
+        return cls(preds)
+
+
 # Sortinfo objects will store features via __slots__
 # Users can define subclasses with additional features
 # The __slots__ of a class and all its parents are concatenated as the 'features' attribute
@@ -324,10 +633,12 @@ class Sortinfo(MutableMapping, metaclass=SortinfoMeta):
     def __setattr__(self, feature, value):
         """
         Set the value of a feature, converting it to lowercase unless it's None
+        (unless the validation level is TRUSTED)
         """
-        feature = feature.lower()
-        if value is not None:
-            value = value.lower()
+        if _validation_level != TRUSTED:
+            feature = feature.lower()
+            if value is not None:
+                value = value.lower()
         super().__setattr__(feature, value)
     
     def __delattr__(self, feature):
@@ -379,6 +690,33 @@ class Sortinfo(MutableMapping, metaclass=SortinfoMeta):
             if not hasattr(self, feature):
                 setattr(self, feature, None)
 
+    # Copying
+    # Values are already normalised strings (or None), so they can be shared,
+    # and we can bypass __setattr__
+
+    def __copy__(self):
+        """
+        Return a new instance with the same values
+        """
+        cls = type(self)
+        new = cls.__new__(cls)
+        for feature in self.features:
+            object.__setattr__(new, feature, getattr(self, feature))
+        return new
+
+    def __deepcopy__(self, memo):
+        """
+        Return a new instance with the same values
+        (values are immutable, so this is the same as a shallow copy)
+        """
+        return self.__copy__()
+
+    def __reduce__(self):
+        """
+        Pickle the values of the features as a tuple
+        """
+        return (_restore_sortinfo, (type(self), tuple(getattr(self, feature) for feature in self.features)))
+
     # Conversion to strings and dicts
     
     def __str__(self):
@@ -403,30 +741,73 @@ class Sortinfo(MutableMapping, metaclass=SortinfoMeta):
         Return a dict mapping from features to values, including 'cvarsort'
         """
         return dict(self.items())
+
+    def pack(self):
+        """
+        Return an immutable PackedSortinfo, for fast comparison and hashing
+        """
+        return PackedSortinfo.from_sortinfo(self)
+
+    # Immutable variants (see FrozenSortinfo)
+
+    @classmethod
+    def frozen_class(cls):
+        """
+        Return the immutable variant of this class
+        """
+        try:
+            return _frozen_classes[cls]
+        except KeyError:
+            frozen = SortinfoMeta('Frozen' + cls.__name__, (FrozenSortinfo, cls), {'__slots__': ()})
+            frozen.thawed_class = cls
+            _frozen_classes[cls] = frozen
+            return frozen
+
+    def freeze(self):
+        """
+        Return an immutable, hashable copy of this Sortinfo
+        """
+        cls = self.frozen_class()
+        new = cls.__new__(cls)
+        for feature in self.features:
+            object.__setattr__(new, feature, getattr(self, feature))
+        return new
+
+    def thaw(self):
+        """
+        Return a mutable copy of this Sortinfo
+        """
+        return self.__copy__()
     
     # Conversion from strings and dicts
     
     @classmethod
-    def from_dict(cls, dictionary):
+    def from_dict(cls, dictionary, level=None):
         """
         Instantiates a Sortinfo object from dictionary,
-        normalising as necessary
+        normalising as necessary (the validation level defaults to the global level)
         """
-        normalised = cls.normalise_dict(dictionary)
-        return cls.from_normalised_dict(normalised)
+        normalised = cls.normalise_dict(dictionary, level)
+        return cls.from_normalised_dict(normalised, level)
     
     @staticmethod
-    def normalise_dict(dictionary):
-        """
-        Normalise a sortinfo dictionary - convert keys to lowercase and correct cvarsort if necessary
-        """
-        # Convert all keys to lowercase (so that we can check if certain keys exist)
-        # Values are left untouched until the object is constructed (e.g. in case of None)
-        dictionary = {key.lower(): value for key, value in dictionary.items()}
+    def normalise_dict(dictionary, level=None):
+        """
+        Normalise a sortinfo dictionary - convert keys and values to lowercase and correct cvarsort if necessary
+        """
+        # Convert all keys and values (other than None) to lowercase,
+        # so that the result does not depend on the global validation level when the object is constructed
+        # If the validation level is TRUSTED, keys and values are assumed to be lowercase
+        if level is None:
+            level = _validation_level
+        trusted = (level == TRUSTED)
+        if trusted:
+            dictionary = dict(dictionary)
+        else:
+            dictionary = {key.lower(): value.lower() if value is not None else None
+                          for key, value in dictionary.items()}
         # Find the cvarsort
-        try:
-            dictionary['cvarsort'] = dictionary['cvarsort'].lower()
-        except KeyError:
+        if 'cvarsort' not in dictionary:
             raise PydmrsValueError('Sortinfo must have cvarsort')
         # Correct cvarsort if features are evidence for 'x' or 'e':
         if dictionary['cvarsort'] not in 'ex' and len(dictionary) > 1:
@@ -439,33 +820,44 @@ class Sortinfo(MutableMapping, metaclass=SortinfoMeta):
     # In, subclasses, _from_normalised_dict will override from_normalised_dict
     # See SortinfoMeta for details
     @staticmethod
-    def from_normalised_dict(dictionary):
+    def from_normalised_dict(dictionary, level=None):
         """
         Instantiate a suitable type of Sortinfo from a dictionary,
         mapping from features to values (including cvarsort)
+        If the validation level is TRUSTED, values are kept as they are (see _from_normalised_dict)
         """
         cvarsort = dictionary['cvarsort']
         # Instantiate an appropriate type of Sortinfo
         if cvarsort == 'e':
-            return EventSortinfo.from_normalised_dict(dictionary)
+            return EventSortinfo.from_normalised_dict(dictionary, level)
         elif cvarsort == 'x':
             if 'prontype' in dictionary:
                 dictionary['pt'] = dictionary.pop('prontype')
-            return InstanceSortinfo.from_normalised_dict(dictionary)
+            return InstanceSortinfo.from_normalised_dict(dictionary, level)
         else:
             # This needs to be updated so that the underspecified cvarsorts i, u, and p are distinguished
             return Sortinfo()
     
     @classmethod
-    def _from_normalised_dict(cls, dictionary):
+    def _from_normalised_dict(cls, dictionary, level=None):
         """
         Instantiate from a dictionary mapping features to values
+        (at the given validation level, which defaults to the global level:
+        if it is TRUSTED, __setattr__ is bypassed, so values are not converted to lowercase)
         """
         if 'cvarsort' in dictionary and dictionary['cvarsort'] != cls.cvarsort:
             raise PydmrsValueError('{} must have cvarsort {}, not {}'.format(cls.__name__,
                                                                              cls.cvarsort,
                                                                              dictionary['cvarsort']))
-        return cls(**{key:value for key, value in dictionary.items() if key != 'cvarsort'})
+        if (_validation_level if level is None else level) != TRUSTED:
+            return cls(**{key:value for key, value in dictionary.items() if key != 'cvarsort'})
+        new = cls.__new__(cls)
+        for feature in cls.features:
+            object.__setattr__(new, feature, dictionary.get(feature))
+        for feature in dictionary:
+            if feature != 'cvarsort' and feature not in cls.features:
+                raise AttributeError("'{}' object has no attribute '{}'".format(cls.__name__, feature))
+        return new
     
     @classmethod
     def from_string(cls, string):
@@ -517,6 +909,139 @@ class Sortinfo(MutableMapping, metaclass=SortinfoMeta):
     def __gt__(self, other):
         return self >= other and self != other
 
+    @property
+    def sort_key(self):
+        """
+        A key for sorting Sortinfos in a consistent total order
+        (by cvarsort, then specified features): equal Sortinfos have equal keys
+        """
+        return (self.cvarsort, tuple(sorted(self.iter_specified())))
+
+
+def _restore_sortinfo(cls, values):
+    """
+    Create a Sortinfo from pickled values (which are already normalised)
+    """
+    new = cls.__new__(cls)
+    for feature, value in zip(cls.features, values):
+        object.__setattr__(new, feature, value)
+    return new
+
+
+class FrozenSortinfo(Sortinfo):
+    """
+    A superclass for immutable, hashable Sortinfo classes.
+    Use Sortinfo.frozen_class() to get the frozen variant of a Sortinfo class,
+    Sortinfo.freeze() to get a frozen copy of an instance,
+    and FrozenSortinfo.thaw() to get a mutable copy back.
+    """
+    __slots__ = ()
+    thawed_class = Sortinfo
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialise values of features, as for the mutable class
+        """
+        mutable = self.thawed_class(*args, **kwargs)
+        for feature in self.features:
+            object.__setattr__(self, feature, getattr(mutable, feature))
+
+    def __setattr__(self, feature, value):
+        raise PydmrsTypeError("{} is immutable (use thaw() for a mutable copy)".format(type(self).__name__))
+
+    def __delattr__(self, feature):
+        raise PydmrsTypeError("{} is immutable (use thaw() for a mutable copy)".format(type(self).__name__))
+
+    def __hash__(self):
+        return hash((self.cvarsort, frozenset(self.iter_specified())))
+
+    def __repr__(self):
+        """
+        Return a string that evaluates to an equal (mutable) Sortinfo
+        """
+        return repr(self.thaw())
+
+    def __copy__(self):
+        """
+        Immutable, so copies can be the same instance
+        """
+        return self
+
+    def __reduce__(self):
+        """
+        Frozen classes are created dynamically, so pickle the mutable Sortinfo
+        """
+        return (intern_sortinfo, (self.thaw(),))
+
+    def freeze(self):
+        return self
+
+    def thaw(self):
+        """
+        Return a mutable copy of this Sortinfo
+        """
+        cls = self.thawed_class
+        new = cls.__new__(cls)
+        for feature in self.features:
+            object.__setattr__(new, feature, getattr(self, feature))
+        return new
+
+
+_frozen_classes = {Sortinfo: FrozenSortinfo}
+
+
+# Frozen Sortinfos can be shared between nodes.
+# The cache maps raw (feature, value) pairs (as given to Sortinfo.from_dict, plus the validation level)
+# to a shared frozen instance, so that repeated feature bundles are only normalised once.
+# Identical frozen instances are also shared, even if they were given in different forms.
+# Each cache is cleared when it reaches sortinfo_cache_size (set to None for no limit).
+
+sortinfo_cache_size = 2 ** 16
+_interned_sortinfos = {}
+_sortinfo_items = {}
+
+
+def intern_sortinfo(sortinfo, level=None):
+    """
+    Return a shared frozen Sortinfo, given a Sortinfo, a dict, or (feature, value) pairs
+    (dicts and pairs are normalised at the given validation level, which defaults to the global level)
+    """
+    if isinstance(sortinfo, Sortinfo):
+        frozen = sortinfo.freeze()
+    else:
+        if level is None:
+            level = _validation_level
+        if isinstance(sortinfo, dict):
+            key = (level,) + tuple(sortinfo.items())
+        else:
+            key = (level,) + tuple(sortinfo)
+        try:
+            return _sortinfo_items[key]
+        except KeyError:
+            pass
+        frozen = Sortinfo.from_dict(dict(key[1:]), level).freeze()
+    # Distinguish None, 'u' and '?', although they compare equal
+    value_key = (type(frozen),) + tuple(getattr(frozen, feature) for feature in frozen.features)
+    try:
+        frozen = _interned_sortinfos[value_key]
+    except KeyError:
+        if sortinfo_cache_size is not None and len(_interned_sortinfos) >= sortinfo_cache_size:
+            _interned_sortinfos.clear()
+        _interned_sortinfos[value_key] = frozen
+    if not isinstance(sortinfo, Sortinfo):
+        if sortinfo_cache_size is not None and len(_sortinfo_items) >= sortinfo_cache_size:
+            _sortinfo_items.clear()
+        _sortinfo_items[key] = frozen
+    return frozen
+
+
+def clear_sortinfo_cache():
+    """
+    Empty the caches of interned sortinfos
+    """
+    _interned_sortinfos.clear()
+    _sortinfo_items.clear()
+
 
 class EventSortinfo(Sortinfo):
     """
@@ -535,3 +1060,185 @@ class InstanceSortinfo(Sortinfo):
     __slots__ = ('pers', 'num', 'gend', 'ind', 'pt')
     # Person, number, gender, individuated, pronoun type
 
+
+
+# Packed sortinfo
+# Each feature is given a fixed field of PACKED_FEATURE_BITS bits in a single integer,
+# and each value of a feature is given a small integer code within its field.
+# Codes 0, 1, 2 are reserved for the underspecified values None, 'u', '?',
+# so that packing is lossless, and specified values have codes from 3 upwards.
+# Fields and codes are assigned the first time a feature or value is seen,
+# so all packed sortinfos (of any class) share the same layout and can be compared directly.
+
+PACKED_FEATURE_BITS = 8
+_PACKED_FIELD_MASK = (1 << PACKED_FEATURE_BITS) - 1
+_PACKED_UNDERSPECIFIED = (None, 'u', '?')
+
+_packed_offsets = {}  # feature -> bit offset
+_packed_codes = {}  # feature -> {value -> code}
+_packed_values = {}  # feature -> [value for each code]
+_packed_cvarsorts = {'i': 0}  # cvarsort -> code (where 'i' is underspecified)
+
+
+def _packed_offset(feature):
+    """
+    Get the bit offset of a feature, assigning a new field if necessary
+    """
+    try:
+        return _packed_offsets[feature]
+    except KeyError:
+        offset = len(_packed_offsets) * PACKED_FEATURE_BITS
+        _packed_offsets[feature] = offset
+        _packed_codes[feature] = {value: code for code, value in enumerate(_PACKED_UNDERSPECIFIED)}
+        _packed_values[feature] = list(_PACKED_UNDERSPECIFIED)
+        return offset
+
+
+def _packed_code(feature, value):
+    """
+    Get the code of a feature value, assigning a new code if necessary
+    """
+    codes = _packed_codes[feature]
+    try:
+        return codes[value]
+    except KeyError:
+        code = len(codes)
+        if code > _PACKED_FIELD_MASK:
+            raise PydmrsValueError('too many values for feature {} to pack'.format(feature))
+        codes[value] = code
+        _packed_values[feature].append(value)
+        return code
+
+
+class PackedSortinfo(object):
+    """
+    An immutable, hashable encoding of a Sortinfo object,
+    where all feature values are packed into a single integer,
+    together with a mask of which features are specified.
+    Comparisons (==, <=, etc.) follow those of Sortinfo,
+    but only take a few integer operations.
+    """
+
+    __slots__ = ('sortinfo_class', 'cvarsort', 'values', 'mask', 'specified')
+
+    def __init__(self, sortinfo_class, cvarsort, values, mask):
+        """
+        Initialise from the Sortinfo class, the cvarsort code,
+        the packed values, and the mask of specified features
+        """
+        # Sortinfo.__setattr__ is not involved here, so set slots directly
+        object.__setattr__(self, 'sortinfo_class', sortinfo_class)
+        object.__setattr__(self, 'cvarsort', cvarsort)
+        object.__setattr__(self, 'values', values)
+        object.__setattr__(self, 'mask', mask)
+        object.__setattr__(self, 'specified', values & mask)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PackedSortinfo objects are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('PackedSortinfo objects are immutable')
+
+    @classmethod
+    def from_sortinfo(cls, sortinfo):
+        """
+        Pack a Sortinfo object
+        """
+        try:
+            cvarsort = _packed_cvarsorts[sortinfo.cvarsort]
+        except KeyError:
+            cvarsort = len(_packed_cvarsorts)
+            _packed_cvarsorts[sortinfo.cvarsort] = cvarsort
+        values = 0
+        mask = 0
+        for feature in sortinfo.features:
+            offset = _packed_offset(feature)
+            code = _packed_code(feature, getattr(sortinfo, feature))
+            values |= code << offset
+            if code >= len(_PACKED_UNDERSPECIFIED):
+                mask |= _PACKED_FIELD_MASK << offset
+        return cls(type(sortinfo), cvarsort, values, mask)
+
+    def unpack(self):
+        """
+        Return an equivalent (mutable) Sortinfo object
+        """
+        cls = self.sortinfo_class
+        new = cls.__new__(cls)
+        for feature in cls.features:
+            code = (self.values >> _packed_offsets[feature]) & _PACKED_FIELD_MASK
+            object.__setattr__(new, feature, _packed_values[feature][code])
+        return new
+
+    def __str__(self):
+        return str(self.unpack())
+
+    def __repr__(self):
+        return 'PackedSortinfo({})'.format(repr(self.unpack()))
+
+    def __hash__(self):
+        return hash((self.cvarsort, self.specified))
+
+    # Comparison methods (see Sortinfo)
+    # A Sortinfo can be compared with a packed Sortinfo, by packing it; other types are not supported
+
+    def __eq__(self, other):
+        """
+        Checks two packed Sortinfos for equality.
+        Returns True if all specified features are the same.
+        """
+        other = _pack_other(other)
+        if other is None:
+            return NotImplemented
+        return self.cvarsort == other.cvarsort \
+            and self.specified == other.specified
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __le__(self, other):
+        """
+        Checks whether this packed Sortinfo underspecifies or equals the other one.
+        """
+        other = _pack_other(other)
+        if other is None:
+            return NotImplemented
+        return (self.cvarsort == 0 or self.cvarsort == other.cvarsort) \
+            and (other.values & self.mask) == self.specified
+
+    def __lt__(self, other):
+        less_or_equal = self.__le__(other)
+        if less_or_equal is NotImplemented:
+            return NotImplemented
+        return less_or_equal and self != other
+
+    def __ge__(self, other):
+        other = _pack_other(other)
+        if other is None:
+            return NotImplemented
+        return other <= self
+
+    def __gt__(self, other):
+        greater_or_equal = self.__ge__(other)
+        if greater_or_equal is NotImplemented:
+            return NotImplemented
+        return greater_or_equal and self != other
+
+    def __reduce__(self):
+        """
+        Codes are only valid within one process, so pickle the unpacked Sortinfo
+        """
+        return (PackedSortinfo.from_sortinfo, (self.unpack(),))
+
+
+def _pack_other(other):
+    """
+    Return the other operand of a comparison as a PackedSortinfo, or None if it is not a Sortinfo
+    """
+    if isinstance(other, PackedSortinfo):
+        return other
+    elif isinstance(other, Sortinfo):
+        return other.pack()
+    else:
+        return None
@@ -88,7 +88,15 @@ class Node(object):
     """
     A DMRS node
     """
-    def __init__(self, nodeid=None, pred=None, sortinfo=None, cfrom=None, cto=None, surface=None, base=None, carg=None):
+    def __init__(self, nodeid=None, pred=None, sortinfo=None, cfrom=None, cto=None, surface=None, base=None, carg=None, level=None):
+        """
+        Create a new node, converting a pred string and a sortinfo dict
+        (at the given validation level, which defaults to the global level)
+        A sortinfo given as a dict is shared and immutable (see intern_sortinfo);
+        to change it, replace it with a mutable copy, e.g. node.sortinfo = node.sortinfo.thaw()
+        """
+        if level is None:
+            level = get_validation_level()
         self.nodeid = nodeid
         self.cfrom = cfrom
         self.cto = cto
@@ -96,13 +104,13 @@ class Node(object):
         self.base = base
 
         if isinstance(pred, str):
-            self.pred = Pred.from_string(pred)
+            self.pred = Pred.from_string(pred, level)
         else:
             self.pred = pred
 
         if carg and carg[0] == '"' and carg[-1] == '"':
             carg = carg[1:-1]
-        if carg and '"' in carg:
+        if carg and '"' in carg and level == STRICT:
             raise PydmrsValueError('Cargs must not contain quotes.')
         self.carg = carg
 
@@ -110,10 +118,9 @@ class Node(object):
             self.sortinfo = None
         elif isinstance(sortinfo, Sortinfo):  # Allow Sortinfo instances
             self.sortinfo = sortinfo
-        elif isinstance(sortinfo, dict):  # Allow initialising sortinfo from a dict
-            self.sortinfo = Sortinfo.from_dict(sortinfo)
-        elif isinstance(sortinfo, list):  # Allow initialising sortinfo from (key,value) pairs
-            self.sortinfo = Sortinfo.from_dict({x: y for x, y in sortinfo})
+        elif isinstance(sortinfo, (dict, list)):  # Allow initialising sortinfo from a dict or (key,value) pairs
+            # Sortinfos from dicts are immutable and shared between nodes (see intern_sortinfo)
+            self.sortinfo = intern_sortinfo(sortinfo, level)
         else:
             raise PydmrsTypeError("unsupported type for sortinfo")
 
@@ -156,6 +163,24 @@ class Node(object):
     def span(self):
         return self.cfrom, self.cto
 
+    @property
+    def pred_sort_key(self):
+        """
+        The sort key of the pred (see Pred.sort_key), allowing for no pred
+        """
+        return self.pred.sort_key if self.pred is not None else ()
+
+    @property
+    def sort_key(self):
+        """
+        A key for sorting nodes in a consistent total order, by pred, carg, then sortinfo.
+        Equal nodes (see __eq__) have equal keys.
+        The key is computed when needed, so that setting attributes stays cheap
+        """
+        return (self.pred_sort_key,
+                self.carg is not None, self.carg or '',
+                self.sortinfo.sort_key if self.sortinfo is not None else ())
+
     @property
     def is_gpred_node(self):
         return isinstance(self.pred, GPred)
@@ -174,6 +199,47 @@ class Node(object):
                    self.base,
                    self.carg)
 
+    def __copy__(self):
+        """
+        Return a new node with the same attributes
+        """
+        cls = type(self)
+        new = cls.__new__(cls)
+        new.__dict__.update(self.__dict__)
+        return new
+
+    def __deepcopy__(self, memo):
+        """
+        Return a new node with the same attributes.
+        Preds are immutable and are shared; the sortinfo is copied.
+        """
+        new = self.__copy__()
+        memo[id(self)] = new
+        if self.sortinfo is not None:
+            new.sortinfo = copy.copy(self.sortinfo)
+        return new
+
+    # Pickling
+    # The standard attributes are pickled as a tuple, and any others (e.g. pred_id) as a dict
+
+    _pickled_attributes = ('nodeid', 'pred', 'sortinfo', 'cfrom', 'cto', 'surface', 'base', 'carg')
+
+    def __getstate__(self):
+        values = tuple(getattr(self, attribute) for attribute in self._pickled_attributes)
+        extra = self._extra_attributes()
+        return (values, extra) if extra else (values,)
+
+    def __setstate__(self, state):
+        self.__dict__.update(zip(self._pickled_attributes, state[0]))
+        if len(state) > 1:
+            self.__dict__.update(state[1])
+
+    def _extra_attributes(self):
+        """
+        Return a dict of any non-standard attributes
+        """
+        return {key: value for key, value in self.__dict__.items() if key not in self._pickled_attributes}
+
 
 class PointerNode(Node):
     """
@@ -185,6 +251,28 @@ class PointerNode(Node):
         super().__init__(*args, **kwargs)
         self.graph = graph
 
+    def __deepcopy__(self, memo):
+        """
+        Return a new node with the same attributes.
+        The graph is not copied: if the graph is being copied at the same time,
+        the new node points to the new graph, and otherwise to no graph.
+        """
+        new = super().__deepcopy__(memo)
+        new.graph = memo.get(id(self.graph))
+        return new
+
+    def __setstate__(self, state):
+        """
+        As with copying, unpickling a single node does not unpickle the graph
+        """
+        super().__setstate__(state)
+        self.graph = None
+
+    def _extra_attributes(self):
+        extra = super()._extra_attributes()
+        extra.pop('graph', None)
+        return extra
+
     @property
     def incoming(self):
         """
@@ -547,7 +635,7 @@ class Dmrs(object):
         """
         Currently processes "<dmrs>...</dmrs>"
         To be updated for "<dmrslist>...</dmrslist>"...
-        Expects a bytestring; to load from a string instead, specify encoding
+        Expects a bytestring, or a string (see pydmrs.serial.loads_xml)
         """
         from pydmrs.serial import loads_xml
         return loads_xml(bytestring, encoding=encoding, cls=cls, **kwargs)
@@ -555,10 +643,11 @@ class Dmrs(object):
     @classmethod
     def load_xml(cls, filehandle, **kwargs):
         """
-        Load a DMRS from a file
+        Load a DMRS from a file (or filename)
         NB: read file as bytes!
         """
-        return cls.loads_xml(filehandle.read(), **kwargs)
+        from pydmrs.serial import load_xml
+        return load_xml(filehandle, cls=cls, **kwargs)
 
     def dumps_xml(self, encoding=None):
         """
@@ -576,6 +665,70 @@ class Dmrs(object):
         """
         filehandle.write(self.dumps_xml())
 
+    # Plain dict serialisation (e.g. for JSON)
+    # Nodes are lists, in the order of Node's positional arguments,
+    # with preds and sortinfos given as positions in shared lists of pred dicts (see Pred.to_dict) and sortinfo dicts.
+    # Links are lists of (start, end, rargname, post).
+
+    def to_dict(self):
+        """
+        Return a dict of lists, strings, and ints, representing the graph (see from_dict)
+        """
+        preds = {}
+        sortinfos = {}
+        sortinfo_ids = {}  # Shared (frozen) sortinfos only need to be converted once
+        nodes = []
+        for node in self.iter_nodes():
+            pred = node.pred
+            if pred is not None:
+                pred = preds.setdefault(pred, len(preds))
+            sortinfo = node.sortinfo
+            if sortinfo is not None:
+                try:
+                    sortinfo_id = sortinfo_ids[id(sortinfo)]
+                except KeyError:
+                    key = tuple((feature, value) for feature, value in sortinfo.items() if value is not None)
+                    sortinfo_id = sortinfo_ids[id(sortinfo)] = sortinfos.setdefault(key, len(sortinfos))
+            else:
+                sortinfo_id = None
+            nodes.append([node.nodeid, pred, sortinfo_id, node.cfrom, node.cto, node.surface, node.base, node.carg])
+        return {'nodes': nodes,
+                'links': [list(link) for link in self.iter_links()],
+                'preds': [pred.to_dict() for pred in preds],
+                'sortinfos': [dict(key) for key in sortinfos],
+                'cfrom': self.cfrom,
+                'cto': self.cto,
+                'surface': self.surface,
+                'ident': self.ident,
+                'index': self.index.nodeid if self.index is not None else None,
+                'top': self.top.nodeid if self.top is not None else None}
+
+    @classmethod
+    def from_dict(cls, dictionary, validation=TRUSTED, **kwargs):
+        """
+        Create a graph from a dict produced by to_dict
+        By default, the input is trusted (see validation_level); to check it, specify validation
+        """
+        level = validation if validation is not None else get_validation_level()
+        preds = [Pred.from_dict(pred, level) for pred in dictionary['preds']]
+        sortinfos = [intern_sortinfo(sortinfo, level) for sortinfo in dictionary['sortinfos']]
+        Node = cls.Node
+        nodes = [Node(nodeid,
+                      preds[pred] if pred is not None else None,
+                      sortinfos[sortinfo] if sortinfo is not None else None,
+                      cfrom, cto, surface, base, carg, level=level)
+                 for nodeid, pred, sortinfo, cfrom, cto, surface, base, carg in dictionary['nodes']]
+        links = [Link(*link) for link in dictionary['links']]
+        return cls(nodes,
+                   links,
+                   dictionary.get('cfrom'),
+                   dictionary.get('cto'),
+                   dictionary.get('surface'),
+                   dictionary.get('ident'),
+                   dictionary.get('index'),
+                   dictionary.get('top'),
+                   **kwargs)
+
     def convert_to(self, cls, copy_nodes=False):
         """
         Convert to a different DMRS format, optionally copying the nodes
@@ -596,6 +749,77 @@ class Dmrs(object):
                    self.index.nodeid if self.index else None,
                    self.top.nodeid if self.top else None)
 
+    def __copy__(self):
+        """
+        Return a new graph with its own containers,
+        but sharing the same node instances
+        """
+        return self._clone(lambda node: node)
+
+    def __deepcopy__(self, memo):
+        """
+        Return a new graph with copies of all nodes.
+        Links and preds are immutable and are shared.
+        """
+        return self._clone(lambda node: copy.deepcopy(node, memo), memo)
+
+    def _clone(self, copy_node, memo=None):
+        """
+        Create a new instance of the same class, with the same simple attributes,
+        copying the nodes with copy_node, and rebuilding the containers directly
+        (rather than calling add_node and add_link, unless the class does not define _copy_containers)
+        """
+        cls = type(self)
+        if cls._copy_containers is Dmrs._copy_containers:
+            # The containers are not known, so start from an empty graph
+            new = cls(cfrom=self.cfrom, cto=self.cto, surface=self.surface, ident=self.ident, **self._init_kwargs())
+            new.__dict__.update((key, value) for key, value in self.__dict__.items() if key not in new.__dict__)
+        else:
+            new = cls.__new__(cls)
+            new.__dict__.update(self.__dict__)
+        if memo is not None:
+            memo[id(self)] = new
+        new._copy_containers(self, copy_node)
+        if self.index is not None:
+            new.index = new[self.index.nodeid]
+        if self.top is not None:
+            new.top = new[self.top.nodeid]
+        return new
+
+    def _copy_containers(self, other, copy_node):
+        """
+        Add copies of the nodes and the links of another graph
+        (subclasses can override this to copy their containers directly)
+        """
+        for node in other.iter_nodes():
+            self.add_node(copy_node(node))
+        for link in other.iter_links():
+            self.add_link(link)
+
+    # Pickling
+    # Graphs are pickled as lists of nodes and links, with the index and top as nodeids,
+    # rather than with pointers and link indexes, which are rebuilt when unpickling.
+    # Nodes (with their preds and sortinfos) are pickled as objects, so nothing is converted.
+    # Attributes set by the constructor are listed in _standard_attributes; any others are kept.
+
+    _standard_attributes = frozenset(('cfrom', 'cto', 'surface', 'ident', 'index', 'top'))
+
+    def __reduce__(self):
+        nodes = list(self.iter_nodes())  # Lazy graphs are loaded first
+        links = list(self.iter_links())
+        extra = {key: value for key, value in self.__dict__.items() if key not in self._standard_attributes}
+        return (_restore_dmrs, (type(self), nodes, links,
+                                (self.cfrom, self.cto, self.surface, self.ident,
+                                 self.index.nodeid if self.index is not None else None,
+                                 self.top.nodeid if self.top is not None else None),
+                                self._init_kwargs(), extra))
+
+    def _init_kwargs(self):
+        """
+        Keyword arguments needed to create a similar empty graph
+        """
+        return {}
+
     def visualise(self, format='dot', filehandle=None):
         """
         Returns the bytestring of the chosen visualisation representation
@@ -617,6 +841,8 @@ class ListDmrs(Dmrs):
     A DMRS graph implemented with lists for nodes and links
     """
 
+    _standard_attributes = Dmrs._standard_attributes | {'nodes', 'links'}
+
     def __init__(self, *args, **kwargs):
         """
         Initialise the graph
@@ -659,6 +885,13 @@ class ListDmrs(Dmrs):
     def iter_links(self):
         return self.links.__iter__()
 
+    def _copy_containers(self, other, copy_node):
+        """
+        Copy the lists of nodes and links from another graph
+        """
+        self.nodes = [copy_node(node) for node in other.nodes]
+        self.links = list(other.links)
+
     def add_link(self, link):
         """Add a link"""
         self.links.append(link)
@@ -764,6 +997,9 @@ class DictDmrs(Dmrs):
     """
     A DMRS graph implemented with dicts for nodes and links
     """
+
+    _standard_attributes = Dmrs._standard_attributes | {'_nodes', 'outgoing', 'incoming'}
+
     def __init__(self, *args, **kwargs):
         """
         Initialise dictionaries from lists
@@ -834,6 +1070,14 @@ class DictDmrs(Dmrs):
         """
         return sorted(self._nodes.values(), key=attrgetter('nodeid'))
 
+    def _copy_containers(self, other, copy_node):
+        """
+        Copy the dicts of nodes and links from another graph
+        """
+        self._nodes = {nodeid: copy_node(node) for nodeid, node in other._nodes.items()}
+        self.outgoing = SetDict((nodeid, set(links)) for nodeid, links in other.outgoing.items())
+        self.incoming = SetDict((nodeid, set(links)) for nodeid, links in other.incoming.items())
+
     def add_link(self, link):
         """
         Add a link.
@@ -950,6 +1194,78 @@ class DictPointDmrs(PointerMixin, DictDmrs):
     """
 
 
+class LazyMixin(Dmrs):
+    """
+    Allow a DMRS class to be loaded lazily (e.g. by serial.XmlCorpus or serial.BinaryCorpus)
+    Only cfrom, cto, surface, and ident are set up front;
+    nodes, links, index, and top are loaded when anything else is first accessed
+    """
+
+    @classmethod
+    def lazy(cls, loader, cfrom=None, cto=None, surface=None, ident=None):
+        """
+        Create a graph which is loaded when needed, by calling loader() to produce a graph of this class
+        """
+        dmrs = cls.__new__(cls)
+        dmrs.__dict__.update(cfrom=cfrom, cto=cto, surface=surface, ident=ident, _loader=loader)
+        return dmrs
+
+    @property
+    def loaded(self):
+        """
+        Whether nodes and links have been loaded
+        """
+        return '_loader' not in self.__dict__
+
+    def load(self):
+        """
+        Load nodes and links, if they have not been loaded yet
+        """
+        loader = self.__dict__.get('_loader')
+        if loader is None:
+            return
+        graph = loader()
+        # Keep any changes made to the simple attributes before loading
+        attributes = {key: value for key, value in self.__dict__.items() if key != '_loader'}
+        self.__dict__.clear()
+        self.__dict__.update(graph.__dict__)
+        self.__dict__.update(attributes)
+        if isinstance(self, PointerMixin):
+            for node in self.iter_nodes():
+                node.graph = self
+
+    def _clone(self, copy_node, memo=None):
+        """
+        Load the graph before copying it, so that the copy is loaded too
+        """
+        self.load()
+        return super()._clone(copy_node, memo)
+
+    def __getattr__(self, name):
+        """
+        Load the graph when an attribute that has not been set is accessed
+        """
+        # Only called if normal attribute lookup fails
+        if name.startswith('__') or '_loader' not in self.__dict__:
+            raise AttributeError(name)
+        self.load()
+        return getattr(self, name)
+
+
+class LazyListDmrs(LazyMixin, ListDmrs):
+    """
+    A DMRS graph implemented with lists for nodes and links,
+    which can be loaded lazily
+    """
+
+
+class LazyDictDmrs(LazyMixin, DictDmrs):
+    """
+    A DMRS graph implemented with dicts for nodes and links,
+    which can be loaded lazily
+    """
+
+
 def filter_links(iterable, rargname, post):
     """
     Filter links according to the label.
@@ -965,12 +1281,21 @@ def filter_links(iterable, rargname, post):
         return (x for x in iterable if x.rargname == rargname and x.post == post)
 
 
+def _restore_dmrs(cls, nodes, links, attributes, kwargs, extra):
+    """
+    Recreate a pickled graph (see Dmrs.__reduce__)
+    """
+    dmrs = cls(nodes, links, *attributes, **kwargs)
+    dmrs.__dict__.update(extra)
+    return dmrs
+
+
 def span_pred_key(node):
     """
     For use as a node_key in SortDictDmrs.
-    This sorts nodes by: cfrom (ascending), cto (descending), predstring (ascending)
+    This sorts nodes by: cfrom (ascending), cto (descending), pred (ascending, see Pred.sort_key)
     """
-    return (node.cfrom, -node.cto, str(node.pred))
+    return (node.cfrom, -node.cto, node.pred_sort_key)
 
 def abstractSortDictDmrs(node_key=None, link_key=None):
     """
@@ -999,6 +1324,9 @@ class SortDictDmrs(DictDmrs):
     nodes = None
     links = None
 
+    _standard_attributes = DictDmrs._standard_attributes | {'nodes', 'links', '_node_keys', '_link_keys',
+                                                            'node_key', 'link_key', 'loads_xml'}
+
     def __init__(self, *args, node_key=None, link_key=None, **kwargs):
         # Sorted lists
         self.nodes = []
@@ -1018,33 +1346,83 @@ class SortDictDmrs(DictDmrs):
         # If link_key not specified but node_key specified,
         # sort according to start and end keys
         elif node_key is not None:
-            self.link_key = lambda x : (node_key(self[x.start]),
-                                        node_key(self[x.end]),
-                                        x.rargname if x.rargname else '',  # in case None
-                                        x.post)
+            self.link_key = self._node_link_key
         # If link_key not specified and node_key not specified,
         # we don't need to look up the node to find the nodeid
         else:
-            self.link_key = lambda x : (x.start,
-                                        x.end,
-                                        x.rargname if x.rargname else '',  # in case None
-                                        x.post)
+            self.link_key = self._nodeid_link_key
 
         super().__init__(*args, **kwargs)
 
-        # To allow this instance to use the loads_xml method,
-        # while keeping the same node_key and link_key
+        self._bind_loads_xml()
+
+    def _node_link_key(self, link):
+        """
+        Default link key if node_key is specified:
+        start key, end key, rargname, post
+        """
+        return (self.node_key(self[link.start]),
+                self.node_key(self[link.end]),
+                link.rargname if link.rargname else '',  # in case None
+                link.post)
+
+    def _nodeid_link_key(self, link):
+        """
+        Default link key if node_key is not specified:
+        start nodeid, end nodeid, rargname, post
+        """
+        return (link.start,
+                link.end,
+                link.rargname if link.rargname else '',  # in case None
+                link.post)
+
+    def _has_default_link_key(self):
+        """
+        Check if the link key is one of the defaults, bound to this instance
+        """
+        return getattr(self.link_key, '__self__', None) is self
+
+    def _bind_loads_xml(self):
+        """
+        To allow this instance to use the loads_xml method,
+        while keeping the same node_key and link_key
+        """
         def loads_xml_wrapper(*args, **kwargs):
             """
             Load a SortDictDmrs from XML, using the same node and link keys as this instance
             """
             return type(self).loads_xml(*args,
                                         node_key=self.node_key,
-                                        link_key=self.link_key,
+                                        link_key=None if self._has_default_link_key() else self.link_key,
                                         **kwargs)
         loads_xml_wrapper.__name__ = type(self).loads_xml.__name__
         self.loads_xml = loads_xml_wrapper
 
+    def _init_kwargs(self):
+        """
+        Keyword arguments needed to create a similar empty graph (with the same node and link keys)
+        """
+        if not self._has_default_link_key():
+            return {'node_key': self.node_key, 'link_key': self.link_key}
+        elif self.link_key.__name__ == '_node_link_key':
+            return {'node_key': self.node_key}
+        else:
+            return {}
+
+    def _copy_containers(self, other, copy_node):
+        """
+        Copy the dicts and the sorted lists from another graph
+        """
+        super()._copy_containers(other, copy_node)
+        self.nodes = [self._nodes[node.nodeid] for node in other.nodes]
+        self.links = list(other.links)
+        self._node_keys = list(other._node_keys)
+        self._link_keys = list(other._link_keys)
+        # Default link keys look up nodes in the graph, so must be bound to the new graph
+        if other._has_default_link_key():
+            self.link_key = getattr(self, other.link_key.__name__)
+        self._bind_loads_xml()
+
     def __iter__(self):
         return (n.nodeid for n in self.nodes)
 
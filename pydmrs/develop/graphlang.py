@@ -1,6 +1,7 @@
 from pydmrs.components import Pred, RealPred, GPred, Sortinfo, EventSortinfo, InstanceSortinfo
 from pydmrs.core import Link, Node, ListDmrs
 from pydmrs.mapping.mapping import AnchorNode, SubgraphNode
+from pydmrs._exceptions import PydmrsValueError
 
 
 def parse_graphlang(string, cls=ListDmrs, queries={}):
@@ -101,9 +102,10 @@ def _parse_node(string, nodeid, queries):
             l += 1
     else:
         ref_id = None
+        l = 0
     if string[l:l+4] == 'node' and (len(string) - l == 4 or string[l+4] == '?'):
-        value, query_key = _parse_value(pred[l+4:], None)
-        assert value is None
+        value, query_key = _parse_value(string[l+4:], None)
+        assert not value
         if query_key:
             assert query_key not in queries
             queries[query_key] = lambda matching, dmrs: dmrs[matching[nodeid]]
@@ -112,7 +114,7 @@ def _parse_node(string, nodeid, queries):
         sortinfo = Sortinfo()
         ref_name = 'node'
     elif m < 0:
-        pred, ref_name = _parse_pred(string[l:m], nodeid, queries)
+        pred, ref_name = _parse_pred(string[l:], nodeid, queries)
         carg = None
         sortinfo = None
     else:
@@ -131,10 +133,10 @@ def _parse_node(string, nodeid, queries):
             m = r + 1
         else:
             carg = None
-        if string[m] == ' ':
+        if m < len(string) and string[m] == ' ':
             while string[m] == ' ':
                 m += 1
-            sortinfo = _parse_sortinfo(string[l:], nodeid, queries)
+            sortinfo = _parse_sortinfo(string[m:], nodeid, queries)
         else:
             sortinfo = None
 
@@ -155,7 +157,7 @@ def _parse_node(string, nodeid, queries):
 
 
 def _parse_pred(string, nodeid, queries):
-    assert string.islower(), 'Predicates must be lower-case.'
+    assert string == string.lower(), 'Predicates must be lower-case.'
     assert ' ' not in string, 'Predicates must not contain spaces.'
     if string[0] == '"' and string[-1] == '"':
         string = string[1:-1]
@@ -164,7 +166,7 @@ def _parse_pred(string, nodeid, queries):
     if (string[:4] == 'pred' and (len(string) == 4 or string[4] == '?')) or (string[:8] == 'predsort' and (len(string) == 8 or string[8] == '?')):
         i = 8 if string[:8] == 'predsort' else 4
         value, query_key = _parse_value(string[i:], None)
-        assert value is None
+        assert not value
         if query_key:
             assert query_key not in queries
             queries[query_key] = lambda matching, dmrs: dmrs[matching[nodeid]].pred
@@ -195,7 +197,7 @@ def _parse_pred(string, nodeid, queries):
     if query_key:
         assert query_key not in queries
         queries[query_key] = lambda matching, dmrs: dmrs[matching[nodeid]].pred.pos
-    sense, query_key = _parse_value(values[2], None)
+    sense, query_key = _parse_value(values[2], 'unknown')
     if query_key:
         assert query_key not in queries
         queries[query_key] = lambda matching, dmrs: dmrs[matching[nodeid]].pred.sense
@@ -224,7 +226,7 @@ _parse_event_shorthand = {
 
 
 def _parse_sortinfo(string, nodeid, queries):
-    assert string.islower(), 'Sortinfos must be lower-case.'
+    assert string == string.lower(), 'Sortinfos must be lower-case.'
     assert ' ' not in string, 'Sortinfos must not contain spaces.'
     assert string[0] in 'iex', 'Invalid sortinfo type.'
     if len(string) == 1:
@@ -236,7 +238,7 @@ def _parse_sortinfo(string, nodeid, queries):
             return Sortinfo()
     if string[1] == '?':
         value, query_key = _parse_value(string[1:], None)
-        assert value is None
+        assert not value
         if query_key:
             assert query_key not in queries
             queries[query_key] = lambda matching, dmrs: dmrs[matching[nodeid]].sortinfo
@@ -248,7 +250,7 @@ def _parse_sortinfo(string, nodeid, queries):
             return Sortinfo()
     assert string[0] in 'ex', 'Sortinfo type i cannot be specified.'
     assert string[1] == '[' and string[-1] == ']', 'Square brackets missing.'
-    if '=' not in string:  # explicit key-value specification
+    if '=' in string:  # explicit key-value specification
         if string[0] == 'e':
             sortinfo = EventSortinfo()
             shorthand = _parse_event_shorthand
@@ -285,7 +287,7 @@ def _parse_sortinfo(string, nodeid, queries):
 
 
 def _parse_link(string, left_nodeid, right_nodeid, queries):
-    assert string.islower(), 'Links must be lower-case.'
+    assert string == string.lower(), 'Links must be lower-case.'
     assert ' ' not in string, 'Links must not contain spaces.'
     l = 0
     r = len(string) - 1
@@ -305,7 +307,7 @@ def _parse_link(string, left_nodeid, right_nodeid, queries):
         l += 1
     while r >= 0 and string[r] == link_char:  # arbitrary right length
         r -= 1
-    if l + 1 < r:  # explicit specification
+    if l + 1 < r or '/' in string[l:r+1]:  # explicit specification
         r += 1
         if string[l:r] == 'rstr':  # rargname RSTR uniquely determines post H
             rargname = 'rstr'
@@ -321,7 +323,7 @@ def _parse_link(string, left_nodeid, right_nodeid, queries):
                 else:
                     rargname, rargname_query_key = _parse_value(string[l:m], '?')
                 if m + 1 == r:
-                    post, post_query_key = None
+                    post = post_query_key = None
                 else:
                     post, post_query_key = _parse_value(string[m+1:r], '?')
             else:
@@ -346,7 +348,7 @@ def _parse_link(string, left_nodeid, right_nodeid, queries):
             rargname = '?'
             post = '?'
             value, query_key = _parse_value(string[l:r+1], None)
-            assert value is None
+            assert not value
             if query_key:
                 assert query_key not in queries
                 queries[query_key] = lambda matching, dmrs: ','.join(link.labelstring for link in dmrs.get_out(matching[start], itr=True) if link.end == matching[end])
@@ -377,6 +379,292 @@ def _parse_link(string, left_nodeid, right_nodeid, queries):
     return Link(start, end, rargname, post)
 
 
+# Serialisation
+# dumps_graphlang produces the compact one-line form read by parse_graphlang.
+# The links of a graph are split into chains of the form "node link node link ...", separated by "; ".
+# Each node is written in full where it first appears, and nodes which appear again
+# are given a reference id (e.g. "1:_cat_n_1 x" and then ":1").
+# Sortinfos and links are written with the shortest available shorthand.
+# Node ids are not written, since parse_graphlang numbers nodes in the order they first appear,
+# and GraphLang has no notation for character spans, surface strings, or base forms.
+
+# Node and link strings cannot contain characters which separate nodes, links, and chains
+_reserved_pred_chars = frozenset(' "()*:;<>\n')
+_reserved_carg_chars = frozenset('"();<>\n')
+
+_dump_instance_shorthand = [(key, feature, {value: symbol for symbol, value in values.items()})
+                            for key, (feature, values) in _parse_instance_shorthand.items()]
+
+_dump_event_shorthand = [(key, feature, {value: symbol for symbol, value in values.items()})
+                         for key, (feature, values) in _parse_event_shorthand.items()]
+
+_dump_index_link_shorthand = {'ARG': 'n', 'ARG1': '1', 'ARG2': '2', 'ARG3': '3', 'ARG4': '4',
+                              'L-INDEX': 'l', 'R-INDEX': 'r'}
+
+_dump_handle_link_shorthand = {'ARG': 'n', 'ARG1': '1', 'ARG2': '2', 'ARG3': '3', 'ARG4': '4',
+                               'L-HNDL': 'l', 'R-HNDL': 'r'}
+
+
+def dumps_graphlang(dmrs):
+    """
+    Write a DMRS graph as a one-line GraphLang string, which can be read with parse_graphlang
+    """
+    chains = _find_chains(dmrs)
+    # Nodes which appear more than once need a reference id
+    counts = {}
+    for chain in chains:
+        for _, nodeid in chain:
+            counts[nodeid] = counts.get(nodeid, 0) + 1
+    anchors = {node.anchor for node in dmrs.iter_nodes() if isinstance(node, AnchorNode)}
+    ref_ids = {}
+    next_ref_id = 1
+    for nodeid in sorted(counts):
+        node = dmrs[nodeid]
+        if isinstance(node, AnchorNode):
+            ref_ids[nodeid] = node.anchor
+        elif counts[nodeid] > 1:
+            while next_ref_id in anchors:
+                next_ref_id += 1
+            ref_ids[nodeid] = next_ref_id
+            next_ref_id += 1
+    written = set()
+    strings = []
+    for chain in chains:
+        items = []
+        left = None
+        for link, nodeid in chain:
+            if link is not None:
+                items.append(_dump_link(link, left))
+            if nodeid in written:
+                items.append(':{}'.format(ref_ids[nodeid]))
+            else:
+                items.append(_dump_node(dmrs, dmrs[nodeid], ref_ids.get(nodeid)))
+                written.add(nodeid)
+            left = nodeid
+        strings.append(' '.join(items))
+    return '; '.join(strings)
+
+
+def _find_chains(dmrs):
+    """
+    Split a graph into chains of (link, nodeid) pairs, covering every node and link
+    The first pair in each chain has no link
+    """
+    adjacent = {nodeid: [] for nodeid in dmrs}
+    for i, link in enumerate(sorted(dmrs.iter_links(), key=lambda link: (link.start, link.end, str(link.rargname), str(link.post)))):
+        adjacent[link.start].append((i, link, link.end))
+        adjacent[link.end].append((i, link, link.start))
+    used = set()
+    placed = set()
+    chains = []
+    for nodeid in sorted(adjacent):
+        while nodeid not in placed or any(i not in used for i, _, _ in adjacent[nodeid]):
+            chain = [(None, nodeid)]
+            placed.add(nodeid)
+            current = nodeid
+            while True:
+                # Prefer links to nodes which have not been written yet
+                options = [(other in placed, i, link, other) for i, link, other in adjacent[current] if i not in used]
+                if not options:
+                    break
+                _, i, link, current = min(options)
+                used.add(i)
+                placed.add(current)
+                chain.append((link, current))
+            chains.append(chain)
+    return chains
+
+
+def _dump_value(value, underspec):
+    """
+    Escape a value which starts with '?', so that it is not read as underspecified or as a query
+    """
+    if value == underspec:
+        return '?'
+    if value.startswith('?'):
+        return '?' + value
+    return value
+
+
+def _dump_node(dmrs, node, ref_id):
+    string = ''
+    if dmrs.index is not None and dmrs.index.nodeid == node.nodeid:
+        string += '**'
+    if dmrs.top is not None and dmrs.top.nodeid == node.nodeid:
+        string += '*'
+    if isinstance(node, SubgraphNode):
+        string += '{{{}}}:'.format(ref_id)
+    elif isinstance(node, AnchorNode):
+        string += '[{}]:'.format(ref_id)
+    elif ref_id is not None:
+        string += '{}:'.format(ref_id)
+    if type(node.pred) is Pred and node.carg == '?' and type(node.sortinfo) is Sortinfo:
+        return string + 'node'
+    string += _dump_pred(node.pred)
+    if node.carg is not None:
+        if _reserved_carg_chars.intersection(node.carg):
+            raise PydmrsValueError('Carg cannot be written in GraphLang: {}'.format(node.carg))
+        string += '({})'.format(_dump_value(node.carg, None))
+    if node.sortinfo is not None:
+        string += ' ' + _dump_sortinfo(node.sortinfo)
+    return string
+
+
+def _dump_pred(pred):
+    if isinstance(pred, RealPred):
+        string = '_{}_{}'.format(_dump_value(pred.lemma, '?'), _dump_value(pred.pos, 'u'))
+        if pred.sense is not None:
+            string += '_' + _dump_value(pred.sense, 'unknown')
+    elif isinstance(pred, GPred):
+        string = _dump_value(pred.name, '?')
+    elif pred is None:
+        raise PydmrsValueError('Nodes without a pred cannot be written in GraphLang')
+    else:
+        return 'pred'
+    if string.endswith('_rel'):
+        # The suffix is removed when reading
+        string += '_rel'
+    if string != string.lower() or _reserved_pred_chars.intersection(string):
+        raise PydmrsValueError('Pred cannot be written in GraphLang: {}'.format(string))
+    return string
+
+
+def _dump_sortinfo(sortinfo):
+    if sortinfo.cvarsort == 'e':
+        shorthand = _dump_event_shorthand
+    elif sortinfo.cvarsort == 'x':
+        shorthand = _dump_instance_shorthand
+    elif sortinfo.cvarsort == 'i' and not any(True for _ in sortinfo.iter_specified()):
+        return 'i'
+    else:
+        raise PydmrsValueError('Sortinfo cannot be written in GraphLang: {}'.format(sortinfo))
+    values = [sortinfo[feature] for _, feature, _ in shorthand]
+    if all(value is None for value in values):
+        return sortinfo.cvarsort
+    if all(value == 'u' for value in values):
+        return sortinfo.cvarsort + '?'
+    if all(value in symbols for value, (_, _, symbols) in zip(values, shorthand)):
+        return '{}[{}]'.format(sortinfo.cvarsort, ''.join(symbols[value] for value, (_, _, symbols)
+                                                          in zip(values, shorthand)))
+    items = []
+    for value, (key, feature, symbols) in zip(values, shorthand):
+        if value in symbols:
+            if value is not None:
+                items.append('{}={}'.format(key, symbols[value]))
+        else:
+            items.append('{}={}'.format(feature, _dump_value(value, 'u')))
+    string = '{}[{}]'.format(sortinfo.cvarsort, ','.join(items))
+    if string != string.lower() or ' ' in string:
+        raise PydmrsValueError('Sortinfo cannot be written in GraphLang: {}'.format(sortinfo))
+    return string
+
+
+def _dump_link(link, left_nodeid):
+    rargname, post = link.rargname, link.post
+    if (rargname, post) == ('RSTR', 'H'):
+        char, spec = '-', ''
+    elif rargname is None and post == 'EQ':
+        char, spec = '=', ''
+    elif rargname == '?' and post == '?':
+        char, spec = '-', '?'
+    elif post in ('NEQ', 'EQ') and rargname in _dump_index_link_shorthand:
+        char, spec = '-' if post == 'NEQ' else '=', _dump_index_link_shorthand[rargname]
+    elif post in ('H', 'HEQ') and rargname in _dump_handle_link_shorthand:
+        char, spec = '-' if post == 'H' else '=', _dump_handle_link_shorthand[rargname] + 'h'
+    else:
+        char = '-'
+        spec = '{}/{}'.format('' if rargname is None else _dump_value(rargname.lower(), '?'),
+                              '' if post is None else _dump_value(post.lower(), '?'))
+        if spec == '/' or spec[0] in '-=' or spec[-1] in '-=' or _reserved_pred_chars.intersection(spec):
+            raise PydmrsValueError('Link cannot be written in GraphLang: {}'.format(link))
+    if link.start == left_nodeid:
+        return '{0}{1}{0}>'.format(char, spec)
+    else:
+        return '<{0}{1}{0}'.format(char, spec)
+
+
+# Corpora
+# A GraphLang corpus has one graph per line.
+
+class GraphlangWriter(object):
+    """
+    Write DMRS graphs to a file in GraphLang, one graph per line
+    NB: open the file as bytes!
+    Output is buffered; to also flush the file every n graphs, specify flush_every
+    """
+
+    def __init__(self, filehandle, encoding='utf-8', buffer_size=2 ** 16, flush_every=None):
+        self.filehandle = filehandle
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.flush_every = flush_every
+        self.count = 0
+        self.closed = False
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, dmrs):
+        """
+        Write a DMRS graph
+        """
+        if self.closed:
+            raise PydmrsValueError("cannot write to a closed GraphlangWriter")
+        line = dumps_graphlang(dmrs) + '\n'
+        self._buffer.append(line)
+        self._buffered += len(line)
+        self.count += 1
+        if self._buffered >= self.buffer_size:
+            self._write_buffer()
+        if self.flush_every and self.count % self.flush_every == 0:
+            self.flush()
+
+    def write_all(self, dmrs_iter):
+        """
+        Write a number of DMRS graphs
+        """
+        for dmrs in dmrs_iter:
+            self.write(dmrs)
+
+    def flush(self):
+        """
+        Write any buffered output, and flush the file
+        """
+        self._write_buffer()
+        self.filehandle.flush()
+
+    def close(self):
+        """
+        Flush the file (the file itself is not closed)
+        """
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_buffer(self):
+        if self._buffer:
+            self.filehandle.write(''.join(self._buffer).encode(self.encoding))
+            self._buffer = []
+            self._buffered = 0
+
+
+def iter_graphlang(filehandle, cls=ListDmrs, encoding='utf-8'):
+    """
+    Iterate through the DMRS graphs in a GraphLang corpus, one graph per line
+    The file can be opened as bytes (decoded with the given encoding) or as text
+    Produces ListDmrs objects by default; for a different type, specify cls
+    """
+    for line in filehandle:
+        if isinstance(line, bytes):
+            line = line.decode(encoding)
+        yield parse_graphlang(line.rstrip('\r\n'), cls=cls)
+
+
 if __name__ == '__main__':
     import sys
     assert len(sys.argv) <= 2 and sys.stdin.isatty() == (len(sys.argv) == 2), 'Invalid arguments.'
@@ -1,7 +1,10 @@
 import copy
+import time
+from warnings import warn
 from pydmrs.components import Pred, RealPred, GPred, Sortinfo, EventSortinfo, InstanceSortinfo
 from pydmrs.core import Link, Node
 from pydmrs.matching.exact_matching import dmrs_exact_matching
+from pydmrs._exceptions import PydmrsWarning
 
 
 class AnchorNode(Node):
@@ -29,12 +32,12 @@ class AnchorNode(Node):
             if isinstance(node.pred, RealPred):
                 node.pred = RealPred(node.pred.lemma if self.pred.lemma == '?' else self.pred.lemma, node.pred.pos if self.pred.pos == 'u' else self.pred.pos, node.pred.sense if self.pred.sense == '?' else self.pred.sense)
             else:
-                node.pred = copy.deepcopy(self.pred)
+                node.pred = self.pred
         elif isinstance(self.pred, GPred):
             if isinstance(node.pred, GPred):
                 node.pred = GPred(node.pred.name if self.pred.name == '?' else self.pred.name)
             else:
-                node.pred = copy.deepcopy(self.pred)
+                node.pred = self.pred
         elif not isinstance(self.pred, Pred):
             node.pred = None
         if isinstance(self.sortinfo, EventSortinfo):
@@ -79,7 +82,7 @@ class SubgraphNode(AnchorNode):
         dmrs.add_node(node)
 
 
-def dmrs_mapping(dmrs, search_dmrs, replace_dmrs, copy_dmrs=True, iterative=True, all_matches=True, require_connected=True):
+def dmrs_mapping(dmrs, search_dmrs, replace_dmrs, copy_dmrs=True, iterative=True, all_matches=True, require_connected=True, max_steps=None, timeout=None):
     """
     Performs an exact DMRS (sub)graph matching of a (sub)graph against a containing graph.
     :param dmrs DMRS graph to map.
@@ -89,6 +92,8 @@ def dmrs_mapping(dmrs, search_dmrs, replace_dmrs, copy_dmrs=True, iterative=True
     :param iterative True if all possible mappings should be performed iteratively to the same DMRS graph, instead of a separate copy per mapping (iterative=False requires copy_dmrs=True).
     :param all_matches True if all possible matches should be returned, instead of only the first (or None).
     :param require_connected True if mappings resulting in a disconnected DMRS graph should be ignored.
+    :param max_steps Optional maximum number of node assignments to try per search for search_dmrs.
+    :param timeout Optional maximum time in seconds for all searches (a warning is given if a search is truncated).
     :return Mapped DMRS graph (resp. a list of graphs in case of iterative=False and all_matches=True)
     """
     assert copy_dmrs or iterative, 'Invalid argument combination.'
@@ -107,17 +112,18 @@ def dmrs_mapping(dmrs, search_dmrs, replace_dmrs, copy_dmrs=True, iterative=True
             assert False, 'Un-matched anchor node.'
 
     # set up variables according to settings
+    deadline = time.monotonic() + timeout if timeout is not None else None
     if iterative:
         result_dmrs = copy.deepcopy(dmrs) if copy_dmrs else dmrs
     else:
-        matchings = dmrs_exact_matching(search_dmrs, dmrs)
+        matchings = dmrs_exact_matching(search_dmrs, dmrs, max_steps=max_steps, deadline=deadline)
     if not iterative and all_matches:
         result = []
 
     # continue while there is a match for search_dmrs
     while True:
         if iterative:
-            matchings = dmrs_exact_matching(search_dmrs, result_dmrs)
+            matchings = dmrs_exact_matching(search_dmrs, result_dmrs, max_steps=max_steps, deadline=deadline)
         else:
             result_dmrs = copy.deepcopy(dmrs) if copy_dmrs else dmrs
 
@@ -125,6 +131,8 @@ def dmrs_mapping(dmrs, search_dmrs, replace_dmrs, copy_dmrs=True, iterative=True
         try:
             search_matching = next(matchings)
         except StopIteration:
+            if matchings.truncated:
+                warn('Search for DMRS mapping truncated', PydmrsWarning)
             if not all_matches:
                 return None
             elif iterative:
@@ -1,12 +1,12 @@
-from pydmrs.core import DictDmrs
+from pydmrs.core import DictDmrs, span_pred_key
 from pydmrs.matching.common import are_equal_nodes, are_equal_links
 
 def sort_nodes(nodes):
     """ Returns a list of nodes sorted by:
         1) cfrom,
         2) cto (decreasing),
-        3) pred __str__()."""
-    return sorted(sorted(sorted(nodes, key=lambda node: node.pred.__str__()), key = lambda node: node.cto, reverse=True), key = lambda node: node.cfrom)
+        3) pred sort_key."""
+    return sorted(nodes, key=span_pred_key)
 
 # Finding the longest node overlap subsequence.
 #------------------------------------------------------------------------
@@ -1,127 +1,209 @@
+import time
+
 from pydmrs.core import Dmrs
+from pydmrs.matching.index import NodeIndex
+
+
+class Matchings(object):
+    """
+    An iterator over the matchings found by an exact DMRS (sub)graph matching,
+    which stops the search when its budget is exhausted.
+    The attribute truncated records whether the search stopped before it was complete
+    (when max_results is reached, only if there is a further matching).
+    """
+
+    def __init__(self, max_results=None, max_steps=None, deadline=None):
+        """
+        Create a new (empty) iterator, with an optional budget.
+        :param max_results Maximum number of matchings to return.
+        :param max_steps Maximum number of node assignments to try.
+        :param deadline Time (as given by time.monotonic) after which to stop searching.
+        """
+        self.max_results = max_results
+        self.max_steps = max_steps
+        self.deadline = deadline
+        self.count = 0
+        self.steps = 0
+        self.truncated = False
+        self._search = iter(())
+        self._buffer = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._buffer:
+            return self._buffer.pop()
+        if self.max_results is not None and self.count >= self.max_results:
+            # The search is only truncated if it would have found another matching
+            for _ in self._search:
+                self.truncated = True
+                break
+            self._search = iter(())
+            raise StopIteration
+        result = next(self._search)
+        self.count += 1
+        return result
+
+    def exists(self):
+        """
+        Checks whether there is a (further) matching, stopping the search at the first one.
+        The matching is still returned when iterating.
+        """
+        if not self._buffer:
+            try:
+                self._buffer.append(next(self))
+            except StopIteration:
+                return False
+        return True
+
+    def _step(self):
+        """
+        Counts a step of the search, and checks whether the budget allows it
+        """
+        self.steps += 1
+        if (self.max_steps is not None and self.steps > self.max_steps) \
+                or (self.deadline is not None and time.monotonic() > self.deadline):
+            self.truncated = True
+            return False
+        return True
 
 
-def dmrs_exact_matching(sub_dmrs, dmrs):
+def dmrs_exact_matching(sub_dmrs, dmrs, index=None, max_results=None, max_steps=None, deadline=None):
     """
     Performs an exact DMRS (sub)graph matching of a (sub)graph against a containing graph.
     :param sub_dmrs DMRS (sub)graph to match.
     :param dmrs DMRS graph to match against.
-    :return Iterator of dictionaries, mapping node ids of the matched (sub)graph to the corresponding matching node id in the containing graph.
+    :param index Optional NodeIndex of dmrs, to reuse when matching several (sub)graphs against the same graph.
+    :param max_results Optional maximum number of matchings to return.
+    :param max_steps Optional maximum number of node assignments to try during the search.
+    :param deadline Optional time (as given by time.monotonic) after which to stop searching.
+    :return Matchings iterator of dictionaries, mapping node ids of the matched (sub)graph to the corresponding matching node id in the containing graph.
     """
 
+    matchings = Matchings(max_results=max_results, max_steps=max_steps, deadline=deadline)
     if not isinstance(sub_dmrs, Dmrs) or not isinstance(dmrs, Dmrs) or len(sub_dmrs) > len(dmrs):
-        return iter(())
-    matching = {}
-    matching_values = set()
-    matches = {}
+        return matchings
 
-    # find matchable nodes and add unambiguous matchings
+    # find the domain of matchable nodes for every node (by looking up candidates in the index)
+    if index is None:
+        index = NodeIndex(dmrs)
+    domains = {}
     for sub_node in sub_dmrs.iter_nodes():
-        match = [node.nodeid for node in dmrs.iter_nodes() if sub_node <= node]
-        if match:
-            if len(match) == 1:
-                matching[sub_node.nodeid] = match[0]
-                matching_values.add(match[0])
-                continue
-            matches[sub_node.nodeid] = match
-        else:
-            return iter(())
+        match = index.subsumed(sub_node)
+        if not match:
+            return matchings
+        domains[sub_node.nodeid] = set(match)
 
     # match index and top
-    if sub_dmrs.index is not None:
-        if dmrs.index is None:
-            return iter(())
-        sub_index = sub_dmrs.index.nodeid
-        index = dmrs.index.nodeid
-        if sub_index in matching:
-            if matching[sub_index] != index:
-                return iter(())
-        else:
-            if index in matches[sub_index]:
-                matching[sub_index] = index
-                matching_values.add(index)
-                del matches[sub_index]
-            else:
-                return iter(())
-    if sub_dmrs.top is not None:
-        if dmrs.top is None:
-            return iter(())
-        sub_top = sub_dmrs.top.nodeid
-        top = dmrs.top.nodeid
-        if sub_top in matching:
-            if matching[sub_top] != top:
-                return iter(())
-        else:
-            if top in matches[sub_top]:
-                matching[sub_top] = top
-                matching_values.add(top)
-                del matches[sub_top]
-            else:
-                return iter(())
+    for sub_special, special in ((sub_dmrs.index, dmrs.index), (sub_dmrs.top, dmrs.top)):
+        if sub_special is not None:
+            if special is None or special.nodeid not in domains[sub_special.nodeid]:
+                return matchings
+            domains[sub_special.nodeid] = {special.nodeid}
 
-    # optimisation for nodes with uniquely matching neighbour nodes
-    for sub_nodeid, match in list(matches.items()):
-        neighbours = []
-        for n in sub_dmrs.get_neighbours(sub_nodeid, nodeids=True):
-            if n not in matching:
-                break
-            neighbours.append(matching[n])
-        else:  # all neighbours in sub_dmrs match uniquely
-            candidate = None
-            for nodeid in match:
-                if nodeid is None:  # not possible if an optional node is present
-                    candidate = None
-                    break
-                if nodeid in matching_values or any(n not in dmrs.get_neighbours(nodeid, nodeids=True) for n in neighbours):  # node is already assigned or has invalid neighbourhood
-                    continue
-                if candidate is not None:  # can't optimise in case of more than one candidate
-                    break
-                candidate = nodeid
-            else:  # loop finished (no break), i.e. candidate is unique or non-existent
-                if candidate is not None:
-                    matching[sub_nodeid] = candidate
-                    matching_values.add(candidate)
-                    del matches[sub_nodeid]
-
-    matches_items = list(matches.items())
-
-    # does an exhaustive search over all the left-over matches in matches_items
-    def _exhaustive_search(n):
-        if not n:
-            if _check_links():
-                yield matching.copy()
-            return
-        n -= 1
-        sub_nodeid, match = matches_items[n]
-        for nodeid in match:  # assign and recursively continue for every possible match
-            if nodeid is None or nodeid in matching_values:
-                continue
-            matching[sub_nodeid] = nodeid
-            matching_values.add(nodeid)
-            for result in _exhaustive_search(n):
-                yield result
-            matching_values.remove(nodeid)
-        matching.pop(sub_nodeid, None)
-        if None in match:  # without assigning if optional node is present
-            for result in _exhaustive_search(n):
-                yield result
+    # links of the (sub)graph, by start and end node, and neighbours of each node
+    sub_links = {}
+    sub_neighbours = {sub_nodeid: set() for sub_nodeid in domains}
+    for link in sub_dmrs.iter_links():
+        sub_links.setdefault((link.start, link.end), []).append(link)
+        sub_neighbours[link.start].add(link.end)
+        sub_neighbours[link.end].add(link.start)
 
-    # checks whether the links match within the current node matching
-    def _check_links():
-        count = 0
-        for l1 in dmrs.iter_links():
-            if l1.start not in matching_values or l1.end not in matching_values:
-                continue
-            for l2 in sub_dmrs.iter_links():
-                if (l2.rargname == '?' or l2.rargname == l1.rargname or (l1.rargname and l2.rargname == l1.rargname[:3] == 'ARG')) and (l2.post == '?' or l2.post == l1.post) and matching[l2.start] == l1.start and matching[l2.end] == l1.end:
-                    count += 1
+    # checks whether the links between two assigned nodes match
+    def _check_pair(sub_nodeid1, sub_nodeid2, nodeid1, nodeid2):
+        sub_pair_links = sub_links.get((sub_nodeid1, sub_nodeid2), [])
+        pair_links = index.links(nodeid1, nodeid2)
+        if sub_nodeid1 != sub_nodeid2:
+            sub_pair_links = sub_pair_links + sub_links.get((sub_nodeid2, sub_nodeid1), [])
+            pair_links = pair_links + index.links(nodeid2, nodeid1)
+        if len(sub_pair_links) != len(pair_links):
+            return False
+        assignment = {sub_nodeid1: nodeid1, sub_nodeid2: nodeid2}
+        for l1 in pair_links:
+            for l2 in sub_pair_links:
+                if (l2.rargname == '?' or l2.rargname == l1.rargname or (l1.rargname and l2.rargname == l1.rargname[:3] == 'ARG')) and (l2.post == '?' or l2.post == l1.post) and assignment[l2.start] == l1.start and assignment[l2.end] == l1.end:
                     break
                 # reversed directionality for None/EQ links which (so far) are undirected
-                if l1.rargname is l2.rargname is None and l1.post == l2.post == 'EQ' and matching[l2.start] == l1.end and matching[l2.end] == l1.start:
-                    count += 1
+                if l1.rargname is l2.rargname is None and l1.post == l2.post == 'EQ' and assignment[l2.start] == l1.end and assignment[l2.end] == l1.start:
                     break
             else:
                 return False
-        return count == sub_dmrs.count_links()
+        return True
+
+    # removes nodes from the domain of the first node which match no node in the domain of the second (linked) node
+    def _revise(sub_nodeid1, sub_nodeid2, domains):
+        domain = domains[sub_nodeid2]
+        return {nodeid1 for nodeid1 in domains[sub_nodeid1]
+                if any(nodeid2 != nodeid1 and _check_pair(sub_nodeid1, sub_nodeid2, nodeid1, nodeid2)
+                       for nodeid2 in index.neighbours(nodeid1) & domain)}
+
+    # makes the domains arc consistent over the links of the (sub)graph (AC-3), starting from the given arcs
+    def _propagate(domains, arcs):
+        arcs = list(arcs)
+        while arcs:
+            sub_nodeid1, sub_nodeid2 = arcs.pop()
+            domain = _revise(sub_nodeid1, sub_nodeid2, domains)
+            if len(domain) < len(domains[sub_nodeid1]):
+                if not domain:
+                    return False
+                domains[sub_nodeid1] = domain
+                arcs.extend((n, sub_nodeid1) for n in sub_neighbours[sub_nodeid1] if n != sub_nodeid1 and n != sub_nodeid2)
+        return True
+
+    # restrict domains to nodes whose links to themselves match
+    for sub_nodeid, domain in domains.items():
+        domains[sub_nodeid] = {nodeid for nodeid in domain if _check_pair(sub_nodeid, sub_nodeid, nodeid, nodeid)}
+        if not domains[sub_nodeid]:
+            return matchings
+    if not _propagate(domains, ((n1, n2) for n1 in sub_neighbours for n2 in sub_neighbours[n1] if n1 != n2)):
+        return matchings
+
+    matching = {}
+    assigned = {}  # inverse of matching
+
+    # checks whether assigning a node is consistent with the links to already assigned nodes (VF2-style feasibility)
+    def _check_links(sub_nodeid, nodeid):
+        neighbours = sub_neighbours[sub_nodeid]
+        for n in neighbours:
+            m = matching.get(n)
+            if m is not None and n != sub_nodeid and not _check_pair(sub_nodeid, n, nodeid, m):
+                return False
+        # links to assigned nodes which are not linked in the (sub)graph
+        for m in index.neighbours(nodeid):
+            n = assigned.get(m)
+            if n is not None and n not in neighbours:
+                return False
+        return True
+
+    # orders unassigned nodes by the size of their domain, preferring nodes linked to assigned nodes
+    def _order(sub_nodeid, domains):
+        return len(domains[sub_nodeid]), not any(n in matching for n in sub_neighbours[sub_nodeid])
+
+    # does a search over the domains of the unassigned nodes,
+    # pruning assignments which are inconsistent with the links to assigned nodes,
+    # and filtering the domains of linked nodes after each assignment (forward checking)
+    def _search(unassigned, domains):
+        if not unassigned:
+            yield matching.copy()
+            return
+        sub_nodeid = min(unassigned, key=lambda n: _order(n, domains))
+        unassigned = [n for n in unassigned if n != sub_nodeid]
+        for nodeid in index.ordered(domains[sub_nodeid]):  # assign and recursively continue for every possible match
+            if not matchings._step():
+                return
+            if nodeid in assigned or not _check_links(sub_nodeid, nodeid):
+                continue
+            new_domains = dict(domains)
+            new_domains[sub_nodeid] = {nodeid}
+            if not _propagate(new_domains, ((n, sub_nodeid) for n in sub_neighbours[sub_nodeid] if n in unassigned)):
+                continue
+            matching[sub_nodeid] = nodeid
+            assigned[nodeid] = sub_nodeid
+            for result in _search(unassigned, new_domains):
+                yield result
+            del matching[sub_nodeid]
+            del assigned[nodeid]
 
-    return _exhaustive_search(len(matches_items))
+    matchings._search = _search(list(domains), domains)
+    return matchings
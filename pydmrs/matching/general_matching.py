@@ -1,8 +1,9 @@
 
 from pydmrs.matching.common import are_equal_nodes, are_equal_links
-from pydrms.core import DictDmrs, RealPred, Node
+from pydmrs.core import DictDmrs, RealPred, Node
 
-from itertools import product, combinations, chain
+from itertools import product, combinations, chain, groupby
+from operator import attrgetter
 
 class Match(object):
     """ A mapping between two DMRS objects.
@@ -45,24 +46,16 @@ def group_same_nodes(nodes):
         as the equivalency criterion.
 
         :param A list of nodes.
-        :return A list of tuples (pred, id list) sorted by pred. The pred is
+        :return A list of tuples (pred, id list) sorted by node sort_key. The pred is
                 the shared predicate of the group; the id_list is a list of
                 nodeids of equivalent nodes.
     """
+    # Equivalent nodes have equal sort keys, so sorting brings them together
+    sort_key = attrgetter('sort_key')
     grouped_nodes = []
-    group_node_type = None
-    current_group = []
-    for node in sorted(nodes, key = lambda n: n.pred):
-        if not group_node_type:
-            group_node_type = node
-            current_group.append(node.nodeid)
-        elif are_equal_nodes(node, group_node_type):
-            current_group.append(node.nodeid)
-        else:
-            grouped_nodes.append((group_node_type.pred, current_group))
-            current_group = [node.nodeid]
-            group_node_type = node
-    grouped_nodes.append((group_node_type.pred, current_group))
+    for _, group in groupby(sorted(nodes, key=sort_key), key=sort_key):
+        group = list(group)
+        grouped_nodes.append((group[0].pred, [node.nodeid for node in group]))
     return grouped_nodes
 
 def pair_same_node_groups(dmrs1, dmrs2):
@@ -82,15 +75,17 @@ def pair_same_node_groups(dmrs1, dmrs2):
     while i < len(grouped_nodes1) and j < len(grouped_nodes2):
         pred1, group1 = grouped_nodes1[i]
         pred2, group2 = grouped_nodes2[j]
-        if pred1 == pred2 and are_equal_nodes(dmrs1[group1[0]], dmrs2[group2[0]]):
+        # Both lists are sorted by node sort key, so they can be merged
+        key1 = dmrs1[group1[0]].sort_key
+        key2 = dmrs2[group2[0]].sort_key
+        if key1 == key2:
             grouped_nodes.append((pred1, group1, group2))
             i += 1
             j += 1
+        elif key1 > key2:
+            j += 1
         else:
-            if pred1 > pred2:
-                j += 1
-            else:
-                i += 1
+            i += 1
     return grouped_nodes
 
 def find_match(start_id1, start_id2, dmrs1, dmrs2, matched_nodes, matched_links):
@@ -0,0 +1,210 @@
+from itertools import chain
+
+from pydmrs.components import RealPred, GPred
+
+
+class PredIndex(object):
+    """
+    An index from preds to items (e.g. node ids), which finds all items
+    whose pred is subsumed by a (possibly underspecified) pred pattern,
+    in time proportional to the number of results.
+    RealPreds are stored in a trie (lemma -> pos -> sense -> items),
+    with a secondary index from pos to lemmas for patterns with an underspecified lemma.
+    GPreds are stored by name.
+    """
+
+    def __init__(self, pairs=()):
+        """
+        Initialise the index from (pred, item) pairs
+        """
+        self._real = {}  # lemma -> pos -> sense -> list of items
+        self._lemmas_by_pos = {}  # pos -> set of lemmas
+        self._gpreds = {}  # name -> list of items
+        self._preds = []  # items with a Pred() pred
+        self._none = []  # items with no pred
+        self._count = 0
+        for pred, item in pairs:
+            self.add(pred, item)
+
+    @classmethod
+    def from_dmrs(cls, dmrs):
+        """
+        Index the nodes of a DMRS graph, by nodeid
+        """
+        return cls((node.pred, node.nodeid) for node in dmrs.iter_nodes())
+
+    @classmethod
+    def from_corpus(cls, dmrs_iter):
+        """
+        Index the nodes of a number of DMRS graphs,
+        by (position of the graph, nodeid)
+        """
+        return cls((node.pred, (i, node.nodeid))
+                   for i, dmrs in enumerate(dmrs_iter)
+                   for node in dmrs.iter_nodes())
+
+    def __len__(self):
+        """
+        Return the number of items in the index
+        """
+        return self._count
+
+    def add(self, pred, item):
+        """
+        Add an item with the given pred
+        """
+        if isinstance(pred, RealPred):
+            self._real.setdefault(pred.lemma, {}) \
+                .setdefault(pred.pos, {}) \
+                .setdefault(pred.sense, []).append(item)
+            self._lemmas_by_pos.setdefault(pred.pos, set()).add(pred.lemma)
+        elif isinstance(pred, GPred):
+            self._gpreds.setdefault(pred.name, []).append(item)
+        elif pred is None:
+            self._none.append(item)
+        else:
+            self._preds.append(item)
+        self._count += 1
+
+    def subsumed(self, pattern):
+        """
+        Iterate through all items whose pred is subsumed by (or equal to) the pattern,
+        i.e. all items with pred such that pattern <= pred
+        """
+        if isinstance(pattern, RealPred):
+            return self._subsumed_realpred(pattern)
+        elif isinstance(pattern, GPred):
+            if pattern.name == '?':
+                return chain.from_iterable(self._gpreds.values())
+            else:
+                return iter(self._gpreds.get(pattern.name, ()))
+        elif pattern is None:
+            return iter(self._none)
+        else:  # Pred() subsumes all preds
+            return chain(self._preds,
+                         chain.from_iterable(self._gpreds.values()),
+                         self._subsumed_realpred(RealPred('?', '?', '?')))
+
+    def _subsumed_realpred(self, pattern):
+        """
+        Iterate through all items whose RealPred is subsumed by the RealPred pattern
+        """
+        any_pos = pattern.pos in ('?', 'u')
+        any_sense = pattern.sense in ('?', 'unknown')
+        if pattern.lemma != '?':
+            lemmas = (pattern.lemma,)
+        elif not any_pos:
+            lemmas = self._lemmas_by_pos.get(pattern.pos, ())
+        else:
+            lemmas = self._real
+        for lemma in lemmas:
+            by_pos = self._real.get(lemma)
+            if by_pos is None:
+                continue
+            if any_pos:
+                by_senses = by_pos.values()
+            elif pattern.pos in by_pos:
+                by_senses = (by_pos[pattern.pos],)
+            else:
+                continue
+            for by_sense in by_senses:
+                if any_sense:
+                    for items in by_sense.values():
+                        yield from items
+                elif pattern.sense in by_sense:
+                    yield from by_sense[pattern.sense]
+
+
+class NodeIndex(object):
+    """
+    An index of the nodes of a DMRS graph by pred, carg and cvarsort,
+    which finds all nodes subsumed by a (possibly underspecified) pattern node.
+    Candidates are looked up in the most selective index,
+    and only these are compared against the pattern.
+    Links are indexed by their start and end nodes.
+    """
+
+    def __init__(self, dmrs):
+        """
+        Index the nodes of a DMRS graph
+        """
+        self.dmrs = dmrs
+        self.preds = PredIndex()
+        self._nodes = {}  # nodeid -> node
+        self._positions = {}  # nodeid -> position in the graph
+        self._cargs = {}  # carg -> list of nodeids
+        self._cvarsorts = {}  # cvarsort -> list of nodeids
+        self._links = {}  # (start, end) -> list of links
+        self._neighbours = {}  # nodeid -> set of nodeids
+        for position, node in enumerate(dmrs.iter_nodes()):
+            nodeid = node.nodeid
+            self.preds.add(node.pred, nodeid)
+            self._nodes[nodeid] = node
+            self._positions[nodeid] = position
+            self._cargs.setdefault(node.carg, []).append(nodeid)
+            cvarsort = node.sortinfo.cvarsort if node.sortinfo is not None else None
+            self._cvarsorts.setdefault(cvarsort, []).append(nodeid)
+        for link in dmrs.iter_links():
+            self._links.setdefault((link.start, link.end), []).append(link)
+            self._neighbours.setdefault(link.start, set()).add(link.end)
+            self._neighbours.setdefault(link.end, set()).add(link.start)
+
+    def __len__(self):
+        """
+        Return the number of nodes in the index
+        """
+        return len(self._nodes)
+
+    def subsumed(self, pattern):
+        """
+        Return a list of the nodeids of all nodes subsumed by the pattern node,
+        i.e. all nodes such that pattern <= node, in the order of the graph
+        """
+        if pattern.carg is not None and pattern.carg != '?':
+            candidates = self._cargs.get(pattern.carg, ())
+        elif _is_specific(pattern.pred) or not _is_specific_sortinfo(pattern.sortinfo):
+            candidates = self.preds.subsumed(pattern.pred)
+        else:
+            candidates = self._cvarsorts.get(pattern.sortinfo.cvarsort, ())
+        # only the candidates are compared against the full pattern
+        nodes = self._nodes
+        result = [nodeid for nodeid in candidates if pattern <= nodes[nodeid]]
+        result.sort(key=self._positions.__getitem__)
+        return result
+
+    def ordered(self, nodeids):
+        """
+        Return a list of the nodeids in the order of the graph
+        """
+        return sorted(nodeids, key=self._positions.__getitem__)
+
+    def links(self, start, end):
+        """
+        Return a list of the links from the start node to the end node
+        """
+        return self._links.get((start, end), [])
+
+    def neighbours(self, nodeid):
+        """
+        Return the set of nodeids of nodes linked to (or from) the node
+        """
+        return self._neighbours.get(nodeid, set())
+
+
+def _is_specific(pred):
+    """
+    Check whether a pred pattern restricts the lemma or name (and so is selective in a PredIndex)
+    """
+    if isinstance(pred, RealPred):
+        return pred.lemma != '?'
+    elif isinstance(pred, GPred):
+        return pred.name != '?'
+    return pred is None
+
+
+def _is_specific_sortinfo(sortinfo):
+    """
+    Check whether a sortinfo pattern restricts the cvarsort
+    (packed sortinfos are not, since their cvarsort codes are not comparable to plain cvarsorts)
+    """
+    return sortinfo is not None and isinstance(sortinfo.cvarsort, str) and sortinfo.cvarsort != 'i'
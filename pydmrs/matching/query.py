@@ -1,26 +1,34 @@
+import time
+from warnings import warn
+
 from pydmrs.core import Dmrs
 from pydmrs.matching.exact_matching import dmrs_exact_matching
 from pydmrs.develop.graphlang import parse_graphlang
+from pydmrs._exceptions import PydmrsWarning
 
 
 # not all_matches then None if no match
-def dmrs_query(dmrs_iter, search_dmrs_str, results_as_dict=False, results_per_dmrs=False):
+def dmrs_query(dmrs_iter, search_dmrs_str, results_as_dict=False, results_per_dmrs=False, max_results=None, max_steps=None, timeout=None):
     """
     Queries DMRS graphs for an underspecified (sub)graph pattern and returns the values of named wildcards (of the form "?[Identifier]") as they are specified in the queried graph.
     :param dmrs_iter An iterator of DMRS graphs to query.
     :param search_dmrs_str The query DMRS (sub)graph, given as a GraphLang string.
     :param results_as_dict True if a query result should be a dictionary, mapping identifiers to values.
     :param results_per_dmrs True if a (possibly empty) list per DMRS should be returned.
+    :param max_results Optional maximum number of results per DMRS (a warning is given if there are more).
+    :param max_steps Optional maximum number of node assignments to try when searching each DMRS.
+    :param timeout Optional maximum time in seconds to search each DMRS (a warning is given if a search is truncated).
     :return Iterator of dicts containing the matching node ids.
     """
 
     queries = {}
     search_dmrs = parse_graphlang(search_dmrs_str, queries=queries)
     queries = [(key, queries[key]) for key in sorted(queries)]
-    for dmrs in dmrs_iter:
+    for i, dmrs in enumerate(dmrs_iter):
         assert isinstance(dmrs, Dmrs), 'Object in dmrs_iter is not a Dmrs.'
         # perform an exact matching of search_dmrs against dmrs
-        matchings = dmrs_exact_matching(search_dmrs, dmrs)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        matchings = dmrs_exact_matching(search_dmrs, dmrs, max_results=max_results, max_steps=max_steps, deadline=deadline)
         if results_per_dmrs:
             results = []
         for matching in matchings:
@@ -33,6 +41,8 @@ def dmrs_query(dmrs_iter, search_dmrs_str, results_as_dict=False, results_per_dm
                 results.append(result)
             else:
                 yield result
+        if matchings.truncated:
+            warn('Search truncated for DMRS number {}'.format(i), PydmrsWarning)
         if results_per_dmrs:
             yield results
 
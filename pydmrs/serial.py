@@ -1,102 +1,598 @@
+import bz2
+import gzip
+import json
+import lzma
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import zlib
 import xml.etree.ElementTree as ET
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from multiprocessing import resource_tracker, shared_memory
+from xml.parsers import expat
 from warnings import warn
-from pydmrs.components import RealPred, GPred
-from pydmrs.core import Link, ListDmrs
+from pydmrs.components import (Pred, RealPred, GPred, intern_pred, PredVocabulary, intern_sortinfo,
+                               STRICT, TRUSTED, get_validation_level)
+from pydmrs.core import Link, ListDmrs, LazyMixin
 from pydmrs._exceptions import *
 
 
-def loads_xml(bytestring, encoding=None, cls=ListDmrs, **kwargs):
+# XML backends
+# Each backend parses a "<dmrs>...</dmrs>" bytestring and produces a DMRS of the given class,
+# at the given validation level (passed explicitly, so that concurrent loads do not interfere).
+# All backends pass the parts of the XML to a _DmrsBuilder, so that they produce identical graphs:
+#   'etree' parses with xml.etree.ElementTree, then walks the tree (the default),
+#   'expat' builds nodes and links directly from parser callbacks, without an element tree,
+#   'lxml' parses with lxml (if it is installed), then walks the tree.
+# Other backends can be added to XML_BACKENDS.
+
+def loads_xml(bytestring, encoding=None, cls=ListDmrs, validation=None, backend=None, **kwargs):
     """
     Currently processes "<dmrs>...</dmrs>"
     To be updated for "<dmrslist>...</dmrslist>"...
-    Expects a bytestring; to load from a string instead, specify encoding
+    Expects a bytestring, or another bytes-like object (e.g. a memoryview of a memory map), which is not copied
+    To override the encoding given in the XML declaration (or the default UTF-8), specify encoding
+    A string can also be given (it is parsed directly, so encoding is deprecated for strings)
     Produces a ListDmrs by default; for a different type, specify cls
+    If cls is lazy (see LazyMixin), only the attributes of the <dmrs> element are parsed,
+    and the rest is parsed when first needed
+    To override the global validation level (e.g. TRUSTED for pydmrs output), specify validation
+    To override the default XML backend (see xml_backend), specify backend
     """
-    if encoding:
-        bytestring = bytestring.encode(encoding)
-    xml = ET.XML(bytestring)
+    level = validation if validation is not None else get_validation_level()
+    if encoding is not None:
+        if isinstance(bytestring, str):
+            warn('Strings are parsed directly, so encoding is not needed', PydmrsDeprecationWarning, stacklevel=2)
+        else:
+            bytestring = _decode_xml(bytestring, encoding)
+    try:
+        loads = XML_BACKENDS[backend or xml_backend]
+    except KeyError:
+        raise PydmrsValueError("unknown XML backend: {}".format(backend or xml_backend))
+    if _is_lazy(cls):
+        # Only parse the attributes of the <dmrs> element for now
+        loader = partial(loads, bytestring, cls, level, **kwargs)
+        return cls.lazy(loader, **_header_attributes(_parse_header(bytestring)))
+    return loads(bytestring, cls, level, **kwargs)
+
+
+def _decode_xml(bytestring, encoding):
+    """
+    Decode a document with the given encoding, dropping any XML declaration (which would give another encoding)
+    """
+    string = str(bytestring, encoding)
+    return _XML_TEXT_DECLARATION.sub('', string, count=1)
+
+
+_XML_TEXT_DECLARATION = re.compile(r'\A\ufeff?\s*<\?xml\b.*?\?>', re.DOTALL)
+
+
+def _is_lazy(cls):
+    """
+    Check whether graphs of a class can be loaded lazily (see LazyMixin)
+    """
+    return isinstance(cls, type) and issubclass(cls, LazyMixin)
+
+
+class _HeaderFound(Exception):
+    pass
+
+
+def _parse_header(bytestring):
+    """
+    Parse the attributes of the root element of a document, without parsing the rest
+    """
+    parser = expat.ParserCreate()
+
+    def start(tag, attrib):
+        # Stop parsing at the first start tag
+        raise _HeaderFound(attrib)
+
+    parser.StartElementHandler = start
+    try:
+        parser.Parse(bytestring, True)
+    except _HeaderFound as found:
+        return found.args[0]
+    except expat.ExpatError as error:
+        raise _parse_error(error) from None
 
-    dmrs = cls(**kwargs)
 
-    dmrs.cfrom = int(xml.get('cfrom')) if 'cfrom' in xml.attrib else None
-    dmrs.cto = int(xml.get('cto')) if 'cto' in xml.attrib else None
-    dmrs.surface = xml.get('surface')
-    dmrs.ident = int(xml.get('ident')) if 'ident' in xml.attrib else None
-    index_id = int(xml.get('index')) if 'index' in xml.attrib else None
-    top_id = None
+def _header_attributes(attrib):
+    """
+    Convert the attributes of a <dmrs> element to the simple attributes of a graph
+    """
+    return {'cfrom': int(attrib['cfrom']) if 'cfrom' in attrib else None,
+            'cto': int(attrib['cto']) if 'cto' in attrib else None,
+            'surface': attrib.get('surface'),
+            'ident': int(attrib['ident']) if 'ident' in attrib else None}
+
+
+def _parse_error(error):
+    """
+    Convert an expat or lxml error to the same error as ElementTree raises
+    """
+    parse_error = ET.ParseError(str(error))
+    parse_error.code = error.code
+    parse_error.position = (error.lineno, error.offset)
+    return parse_error
+
+
+def _loads_etree(bytestring, cls=ListDmrs, level=None, **kwargs):
+    """
+    Parse a DMRS using xml.etree.ElementTree
+    """
+    return _from_element(ET.XML(bytestring), cls, level, **kwargs)
+
+
+def _loads_lxml(bytestring, cls=ListDmrs, level=None, **kwargs):
+    """
+    Parse a DMRS using lxml
+    """
+    if not isinstance(bytestring, (bytes, str)):
+        # lxml cannot parse other bytes-like objects
+        bytestring = bytes(bytestring)
+    try:
+        xml = lxml_etree.fromstring(bytestring, _lxml_parser)
+    except lxml_etree.XMLSyntaxError as error:
+        # Raise the same error as ElementTree
+        raise _parse_error(error) from None
+    return _from_element(xml, cls, level, **kwargs)
+
+
+def _loads_expat(bytestring, cls=ListDmrs, level=None, **kwargs):
+    """
+    Parse a DMRS using expat callbacks, without building an element tree
+    """
+    parser = expat.ParserCreate()
+    builder = None
+    depth = 0
+    elem = None  # (tag, attrib, subelements) of the current <node> or <link>
+    text = None  # text of the current subelement, before any further elements
+
+    def start(tag, attrib):
+        nonlocal builder, depth, elem, text
+        depth += 1
+        if depth == 1:
+            builder = _DmrsBuilder(cls, attrib, kwargs, level)
+        elif depth == 2:
+            elem = (tag, attrib, [])
+        elif depth == 3:
+            text = []
+            elem[2].append((tag, attrib, text))
+        else:
+            text = None
+
+    def end(tag):
+        nonlocal depth, text
+        depth -= 1
+        if depth == 1:
+            builder.add(elem[0], elem[1], [(sub_tag, sub_attrib, ''.join(sub_text) or None)
+                                           for sub_tag, sub_attrib, sub_text in elem[2]])
+        elif depth == 2:
+            text = None
 
+    def data(string):
+        if text is not None:
+            text.append(string)
+
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = data
+    try:
+        parser.Parse(bytestring, True)
+    except expat.ExpatError as error:
+        # Raise the same error as ElementTree
+        raise _parse_error(error) from None
+    return builder.finish()
+
+
+def _from_element(xml, cls=ListDmrs, level=None, **kwargs):
+    """
+    Produce a DMRS from a parsed <dmrs> element
+    """
+    builder = _DmrsBuilder(cls, xml.attrib, kwargs, level)
     for elem in xml:
-        if elem.tag == 'node':
-            nodeid = int(elem.get('nodeid')) if 'nodeid' in elem.attrib else None
-            cfrom = int(elem.get('cfrom')) if 'cfrom' in elem.attrib else None
-            cto = int(elem.get('cto')) if 'cto' in elem.attrib else None
-            surface = elem.get('surface')
-            base = elem.get('base')
-            carg = elem.get('carg')
-
-            pred = None
-            sortinfo = None
-            for sub in elem:
-                if sub.tag == 'realpred':
-                    try:
-                        pred = RealPred(sub.get('lemma'), sub.get('pos'), sub.get('sense'))
-                    except PydmrsValueError:
-                        # If the whole pred name is under 'lemma', rather than split between 'lemma', 'pos', 'sense'
-                        pred = RealPred.from_string(sub.get('lemma'))
+        builder.add(elem.tag, elem.attrib, [(sub.tag, sub.attrib, sub.text) for sub in elem])
+    return builder.finish()
+
+
+class _DmrsBuilder(object):
+    """
+    Build a DMRS from the attributes of a <dmrs> element,
+    and the tags, attributes, and subelements of its children,
+    at the given validation level (which defaults to the global level)
+    """
+
+    def __init__(self, cls, attrib, kwargs, level=None):
+        self.cls = cls
+        self.level = level if level is not None else get_validation_level()
+        self.dmrs = dmrs = cls(**kwargs)
+        for key, value in _header_attributes(attrib).items():
+            setattr(dmrs, key, value)
+        self.index_id = int(attrib['index']) if 'index' in attrib else None
+        self.top_id = None
+
+    def add(self, tag, attrib, subelements):
+        """
+        Add a node or link, given its tag, attributes, and (tag, attrib, text) triples for its subelements
+        """
+        if tag == 'node':
+            self.add_node(attrib, subelements)
+        elif tag == 'link':
+            self.add_link(attrib, subelements)
+        else:
+            raise PydmrsValueError(tag)
+
+    def add_node(self, attrib, subelements):
+        nodeid = int(attrib['nodeid']) if 'nodeid' in attrib else None
+        cfrom = int(attrib['cfrom']) if 'cfrom' in attrib else None
+        cto = int(attrib['cto']) if 'cto' in attrib else None
+        surface = attrib.get('surface')
+        base = attrib.get('base')
+        carg = attrib.get('carg')
+
+        pred = None
+        sortinfo = None
+        for sub_tag, sub_attrib, sub_text in subelements:
+            if sub_tag == 'realpred':
+                try:
+                    pred = intern_pred(RealPred(sub_attrib.get('lemma'), sub_attrib.get('pos'), sub_attrib.get('sense'),
+                                                level=self.level))
+                except PydmrsValueError:
+                    # If the whole pred name is under 'lemma', rather than split between 'lemma', 'pos', 'sense'
+                    pred = RealPred.from_string(sub_attrib.get('lemma'), self.level)
+                    if self.level == STRICT:
                         warn("RealPred given as string rather than lemma, pos, sense", PydmrsWarning)
-                elif sub.tag == 'gpred':
-                    try:
-                        pred = GPred.from_string(sub.text)
-                    except PydmrsValueError:
-                        # If the string is actually for a RealPred, not a GPred
-                        pred = RealPred.from_string(sub.text)
+            elif sub_tag == 'gpred':
+                try:
+                    pred = GPred.from_string(sub_text, self.level)
+                except PydmrsValueError:
+                    # If the string is actually for a RealPred, not a GPred
+                    pred = RealPred.from_string(sub_text, self.level)
+                    if self.level == STRICT:
                         warn("RealPred string found in a <gpred> tag", PydmrsWarning)
-                elif sub.tag == 'sortinfo':
-                    sortinfo = sub.attrib
+            elif sub_tag == 'sortinfo':
+                sortinfo = dict(sub_attrib)
+            else:
+                raise PydmrsValueError(sub_tag)
+
+        self.dmrs.add_node(self.cls.Node(nodeid=nodeid, pred=pred, carg=carg, sortinfo=sortinfo, cfrom=cfrom, cto=cto, surface=surface, base=base,
+                                         level=self.level))
+
+    def add_link(self, attrib, subelements):
+        start = int(attrib['from'])
+        end = int(attrib['to'])
+        if start == end:
+            raise PydmrsValueError("Link start must not equal link end.")
+
+        if start == 0:
+            self.top_id = end
+        else:
+            rargname = None
+            post = None
+            for sub_tag, sub_attrib, sub_text in subelements:
+                if sub_tag == 'rargname':
+                    if sub_text and sub_text.upper() not in ('NONE', 'NULL', 'NIL'):
+                        rargname = sub_text
+                elif sub_tag == 'post':
+                    if sub_text and sub_text.upper() not in ('NONE', 'NULL', 'NIL'):
+                        post = sub_text
                 else:
-                    raise PydmrsValueError(sub.tag)
+                    raise PydmrsValueError(sub_tag)
+            self.dmrs.add_link(Link(start, end, rargname, post))
+
+    def finish(self):
+        """
+        Set the top and index, and return the DMRS
+        """
+        dmrs = self.dmrs
+        if self.top_id:
+            dmrs.top = dmrs[self.top_id]
+        if self.index_id:
+            dmrs.index = dmrs[self.index_id]
+        return dmrs
+
 
-            dmrs.add_node(cls.Node(nodeid=nodeid, pred=pred, carg=carg, sortinfo=sortinfo, cfrom=cfrom, cto=cto, surface=surface, base=base))
+try:
+    from lxml import etree as lxml_etree
+    _lxml_parser = lxml_etree.XMLParser(remove_comments=True, remove_pis=True)
+except ImportError:
+    lxml_etree = None
 
-        elif elem.tag == 'link':
-            start = int(elem.get('from'))
-            end = int(elem.get('to'))
-            if start == end:
-                raise PydmrsValueError("Link start must not equal link end.")
+XML_BACKENDS = {'etree': _loads_etree, 'expat': _loads_expat}
+if lxml_etree is not None:
+    XML_BACKENDS['lxml'] = _loads_lxml
 
-            if start == 0:
-                top_id = end
+xml_backend = 'etree'
+
+
+# Compression
+# Compressed input is detected from its first bytes, and decompressed while it is streamed,
+# so that readers accept gzip, bz2, and lzma (xz) files in place of plain XML.
+# Concatenated compressed members (as written by XmlWriter and parallel_dump) are read in turn.
+# Compressed output is written as a sequence of independently compressed members,
+# one per buffered chunk, so that chunks can be compressed in parallel (see parallel_dump).
+# For writing, the format can be given explicitly, or inferred from the file extension.
+
+COMPRESSION_FORMATS = {
+    # name: (magic bytes, file extensions, compress function, decompressor factory)
+    'gzip': ((b'\x1f\x8b',), ('.gz', '.gzip'),
+             lambda data, level: gzip.compress(data, 9 if level is None else level),
+             lambda: zlib.decompressobj(16 + zlib.MAX_WBITS)),
+    'bz2': ((b'BZh',), ('.bz2',),
+            lambda data, level: bz2.compress(data, 9 if level is None else level),
+            bz2.BZ2Decompressor),
+    'lzma': ((b'\xfd7zXZ\x00', b']\x00\x00'), ('.xz', '.lzma'),
+             lambda data, level: lzma.compress(data, preset=level),
+             lzma.LZMADecompressor)}
+
+_MAGIC_LENGTH = 6
+
+
+def detect_compression(head):
+    """
+    Find the compression format of a file from its first bytes (at least 6), or None if it is not compressed
+    """
+    for name, (magics, _, _, _) in COMPRESSION_FORMATS.items():
+        if head.startswith(magics):
+            return name
+    return None
+
+
+def compression_from_path(path):
+    """
+    Find the compression format of a file from its extension, or None if it is not compressed
+    """
+    extension = os.path.splitext(path)[1].lower()
+    for name, (_, extensions, _, _) in COMPRESSION_FORMATS.items():
+        if extension in extensions:
+            return name
+    return None
+
+
+def compress(bytestring, compression, level=None):
+    """
+    Compress a bytestring as a single member of the given format ('gzip', 'bz2', or 'lzma')
+    To override the format's default compression level, specify level
+    """
+    try:
+        compress_function = COMPRESSION_FORMATS[compression][2]
+    except KeyError:
+        raise PydmrsValueError("unknown compression format: {}".format(compression))
+    return compress_function(bytestring, level)
+
+
+def open_compressed(path, mode='rb', compression=None, level=None):
+    """
+    Open a possibly compressed file as bytes
+    For reading, the format is detected from the file's first bytes
+    For writing, the format can be specified, and is otherwise inferred from the extension
+    To override the format's default compression level, specify level
+    """
+    if 'b' not in mode:
+        raise PydmrsValueError("compressed files must be opened as bytes")
+    if mode.startswith('r'):
+        with open(path, 'rb') as filehandle:
+            compression = detect_compression(filehandle.read(_MAGIC_LENGTH))
+    elif compression is None:
+        compression = compression_from_path(path)
+    if compression is None:
+        return open(path, mode)
+    elif compression == 'gzip':
+        return gzip.open(path, mode, compresslevel=9 if level is None else level)
+    elif compression == 'bz2':
+        return bz2.open(path, mode, compresslevel=9 if level is None else level)
+    elif compression == 'lzma':
+        return lzma.open(path, mode, preset=level if mode.startswith('w') else None)
+    raise PydmrsValueError("unknown compression format: {}".format(compression))
+
+
+def _is_compressed(path):
+    with open(path, 'rb') as filehandle:
+        return detect_compression(filehandle.read(_MAGIC_LENGTH)) is not None
+
+
+def _decompress_stream(chunks):
+    """
+    Iterate through the decompressed chunks of a stream of bytestrings (unchanged if not compressed)
+    """
+    chunks = iter(chunks)
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= _MAGIC_LENGTH:
+            break
+    compression = detect_compression(head)
+    if compression is None:
+        if head:
+            yield head
+        yield from chunks
+        return
+    factory = COMPRESSION_FORMATS[compression][3]
+    decompressor = factory()
+    started = False
+    for chunk in _chain_head(head, chunks):
+        while chunk:
+            started = True
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+            if decompressor.eof:
+                # Start the next member (trailing padding is ignored, as by the gzip module)
+                chunk = decompressor.unused_data.lstrip(b'\x00')
+                decompressor = factory()
+                started = False
             else:
-                rargname = None
-                post = None
-                for sub in elem:
-                    if sub.tag == 'rargname':
-                        if sub.text and sub.text.upper() not in ('NONE', 'NULL', 'NIL'):
-                            rargname = sub.text
-                    elif sub.tag == 'post':
-                        if sub.text and sub.text.upper() not in ('NONE', 'NULL', 'NIL'):
-                            post = sub.text
-                    else:
-                        raise PydmrsValueError(sub.tag)
-                dmrs.add_link(Link(start, end, rargname, post))
-        else:
-            raise PydmrsValueError(elem.tag)
+                chunk = b''
+    if started:
+        raise PydmrsValueError("compressed stream ended before the end of a member")
+
+
+def _chain_head(head, chunks):
+    yield head
+    yield from chunks
+
+
+# Streaming input
+# Corpora are parsed incrementally, one chunk at a time, and each <dmrs> element
+# is discarded as soon as its graph has been produced, so memory use does not grow with the corpus.
+# To allow a stream of concatenated <dmrs> elements (which is not a well-formed XML document),
+# the input is wrapped in an extra root element, after any BOM and XML declaration.
+# Later XML declarations and doctypes (e.g. from concatenated documents) are not allowed inside an element,
+# so they are blanked out with spaces, keeping byte offsets the same (see index_xml).
 
-    if top_id:
-        dmrs.top = dmrs[top_id]
-    if index_id:
-        dmrs.index = dmrs[index_id]
+_STREAM_ROOT = 'pydmrs-stream'
+_XML_PROLOG = re.compile(br'(\xef\xbb\xbf)?\s*(<\?xml\b.*?\?>)?', re.DOTALL)
+_XML_DECLARATION = re.compile(br'<\?xml\b.*?\?>|<!DOCTYPE\b[^\[>]*(\[.*?\]\s*)?>', re.DOTALL)
+# The start of a declaration which may not be complete yet (including a partial '<?xml' or '<!DOCTYPE' at the end)
+_XML_DECLARATION_START = re.compile(br'<\?xml\b|<!DOCTYPE\b|<(\?(x(ml?)?)?|!(D(O(C(T(Y(PE?)?)?)?)?)?)?)?\Z')
 
-    return dmrs
+xml_chunk_size = 2 ** 16
 
 
-def load_xml(filehandle, cls=ListDmrs):
+def iter_xml(source, cls=ListDmrs, validation=None, chunk_size=None, **kwargs):
+    """
+    Iterate through the DMRS graphs in "<dmrslist>...</dmrslist>" or in a stream of "<dmrs>...</dmrs>" elements
+    The source can be a filename, a file (or pipe), a bytestring (or memoryview or memory map),
+    or an iterable of bytestrings
+    NB: read files as bytes!
+    Compressed input (gzip, bz2, or lzma) is detected and decompressed (see COMPRESSION_FORMATS)
+    Produces ListDmrs objects by default; for a different type, specify cls
+    To override the global validation level (e.g. TRUSTED for pydmrs output), specify validation
+    """
+    level = validation if validation is not None else get_validation_level()
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack = []
+    chunks = _decompress_stream(_iter_chunks(source, chunk_size or xml_chunk_size))
+    for data in _wrap_stream(chunks):
+        parser.feed(data)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                parent = stack[-1].tag if stack else None
+                if parent == _STREAM_ROOT and elem.tag not in ('dmrs', 'dmrslist') \
+                        or parent == 'dmrslist' and elem.tag != 'dmrs':
+                    raise PydmrsValueError(elem.tag)
+                stack.append(elem)
+                continue
+            stack.pop()
+            if elem.tag == 'dmrs' and stack[-1].tag in (_STREAM_ROOT, 'dmrslist'):
+                dmrs = _from_element(elem, cls, level, **kwargs)
+                # Discard the parsed element before handing over the graph
+                elem.clear()
+                stack[-1].remove(elem)
+                yield dmrs
+    parser.close()
+
+
+def _iter_chunks(source, chunk_size):
+    """
+    Iterate through the bytestring chunks of a filename, file, bytestring, or iterable of bytestrings
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as filehandle:
+            yield from _iter_chunks(filehandle, chunk_size)
+    elif isinstance(source, (bytes, bytearray)):
+        yield source
+    elif isinstance(source, (memoryview, mmap.mmap)):
+        # Feed slices of the buffer, without copying it
+        view = memoryview(source)
+        for i in range(0, len(view), chunk_size):
+            yield view[i:i + chunk_size]
+    elif hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from source
+
+
+def _wrap_stream(chunks):
+    """
+    Insert an extra root element around a stream of XML chunks, after any BOM and XML declaration
     """
-    Load a DMRS from a file
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        # Wait until the prolog is complete (or cannot be present)
+        stripped = head.lstrip(b'\xef\xbb\xbf \t\r\n')
+        if len(stripped) < 5 or (stripped.startswith(b'<?xml') and b'?>' not in stripped):
+            continue
+        break
+    prolog = _XML_PROLOG.match(head).end()
+    yield head[:prolog] + '<{}>'.format(_STREAM_ROOT).encode()
+    yield from _blank_declarations(_chain_head(head[prolog:], chunks))
+    yield '</{}>'.format(_STREAM_ROOT).encode()
+
+
+def _blank_declarations(chunks):
+    """
+    Replace XML declarations and doctypes in a stream of chunks with spaces (keeping newlines),
+    holding back the end of a chunk if a declaration might continue in the next one
+    """
+    rest = b''
+    for chunk in chunks:
+        data = rest + chunk if rest else chunk
+        if _XML_DECLARATION_START.search(data) is None:
+            rest = b''
+            yield data
+            continue
+        data = _XML_DECLARATION.sub(lambda match: re.sub(br'[^\n]', b' ', match.group()), bytes(data))
+        start = _XML_DECLARATION_START.search(data)
+        if start is None:
+            rest = b''
+            yield data
+        else:
+            rest = data[start.start():]
+            yield data[:start.start()]
+    if rest:
+        yield rest
+
+
+def load_xml(source, cls=ListDmrs, **kwargs):
+    """
+    Load a DMRS from a file, given its filename, or the file itself
     NB: read file as bytes!
+    Regular files are memory-mapped and parsed in place, rather than read into memory first
+    Compressed files (gzip, bz2, or lzma) are detected and decompressed
     Produces a ListDmrs by default; for a different type, specify cls
+    Further arguments are passed to loads_xml
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as filehandle:
+            return load_xml(filehandle, cls=cls, **kwargs)
+    buffer = _file_buffer(source)
+    if detect_compression(bytes(buffer[:_MAGIC_LENGTH])) is not None:
+        buffer = b''.join(_decompress_stream([buffer]))
+    return loads_xml(buffer, cls=cls, **kwargs)
+
+
+def _file_buffer(filehandle):
+    """
+    Get the rest of a file as a bytes-like object, using a memory map if possible,
+    and move to the end of the file
     """
-    return cls.loads(filehandle.read(), cls=cls)
+    try:
+        fileno = filehandle.fileno()
+        position = filehandle.tell()
+        size = os.fstat(fileno).st_size
+    except (AttributeError, OSError):
+        # Not a regular file (e.g. a pipe, or a file-like object in memory)
+        return filehandle.read()
+    if size <= position:
+        return filehandle.read()
+    buffer = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    filehandle.seek(0, os.SEEK_END)
+    return memoryview(buffer)[position:] if position else buffer
 
 
 def dumps_xml(dmrs, encoding=None):
@@ -165,6 +661,1024 @@ def dump_xml(filehandle, dmrs):
     filehandle.write(dumps_xml(dmrs))
 
 
+def dumps_json(dmrs):
+    """
+    Create a compact JSON string, using the flat schema of Dmrs.to_dict
+    """
+    return json.dumps(dmrs.to_dict(), separators=(',', ':'))
+
+
+def loads_json(string, cls=ListDmrs, validation=TRUSTED, **kwargs):
+    """
+    Load a DMRS from a JSON string (or bytestring) produced by dumps_json
+    Produces a ListDmrs by default; for a different type, specify cls
+    By default, the input is trusted; to check it, specify validation
+    """
+    return cls.from_dict(json.loads(string), validation=validation, **kwargs)
+
+
+# Streaming output
+# XmlWriter produces the same markup as dumps_xml, but writes strings directly
+# from iter_nodes() and iter_links(), without building an ElementTree for each graph.
+# Strings are collected in a buffer, which is encoded and written once it is large enough.
+
+_ATTRIB_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;',
+                                 '\r': '&#13;', '\n': '&#10;', '\t': '&#09;'})
+_TEXT_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+
+def _attrib(name, value):
+    return ' {}="{}"'.format(name, str(value).translate(_ATTRIB_ESCAPES))
+
+
+def _text_elem(tag, text):
+    if text:
+        return '<{0}>{1}</{0}>'.format(tag, text.translate(_TEXT_ESCAPES))
+    return '<{} />'.format(tag)
+
+
+def _iter_xml_strings(dmrs):
+    """
+    Iterate through strings which together give the XML of a DMRS graph
+    """
+    yield '<dmrs'
+    if dmrs.index is not None:
+        yield _attrib('index', dmrs.index.nodeid)
+    if dmrs.cfrom is not None and dmrs.cto is not None:
+        yield _attrib('cfrom', dmrs.cfrom)
+        yield _attrib('cto', dmrs.cto)
+    yield '>'
+    for node in dmrs.iter_nodes():
+        yield '<node'
+        yield _attrib('nodeid', node.nodeid)
+        if node.cfrom is not None and node.cto is not None:
+            yield _attrib('cfrom', node.cfrom)
+            yield _attrib('cto', node.cto)
+        if node.carg:
+            yield _attrib('carg', '"{}"'.format(node.carg))
+        yield '>'
+        if isinstance(node.pred, GPred):
+            yield _text_elem('gpred', str(node.pred) + '_rel')
+        elif isinstance(node.pred, RealPred):
+            yield '<realpred'
+            yield _attrib('lemma', node.pred.lemma)
+            yield _attrib('pos', node.pred.pos)
+            if node.pred.sense:
+                yield _attrib('sense', node.pred.sense)
+            yield ' />'
+        else:
+            raise PydmrsTypeError("predicates must be RealPred or GPred objects")
+        yield '<sortinfo'
+        if node.sortinfo:
+            for key in node.sortinfo:
+                value = node.sortinfo[key]
+                if value:
+                    yield _attrib(key, value)
+        yield ' /></node>'
+    if dmrs.top is not None:
+        yield '<link from="0"'
+        yield _attrib('to', dmrs.top.nodeid)
+        yield '><rargname /><post>H</post></link>'
+    for link in dmrs.iter_links():
+        yield '<link'
+        yield _attrib('from', link.start)
+        yield _attrib('to', link.end)
+        yield '>'
+        yield _text_elem('rargname', link.rargname)
+        yield _text_elem('post', link.post)
+        yield '</link>'
+    yield '</dmrs>'
+
+
+class XmlWriter(object):
+    """
+    Write DMRS graphs to a file, one at a time, as "<dmrslist>...</dmrslist>"
+    NB: open the file as bytes!
+    Output is buffered; to also flush the file every n graphs, specify flush_every
+    To compress the output, specify compression ('gzip', 'bz2', or 'lzma') and optionally level;
+    each buffered chunk is then written as an independently compressed member
+    """
+
+    def __init__(self, filehandle, encoding='utf-8', buffer_size=2 ** 16, flush_every=None,
+                 compression=None, level=None):
+        if compression is not None and compression not in COMPRESSION_FORMATS:
+            raise PydmrsValueError("unknown compression format: {}".format(compression))
+        self.filehandle = filehandle
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.flush_every = flush_every
+        self.compression = compression
+        self.level = level
+        self.count = 0
+        self.closed = False
+        self._buffer = ['<?xml version="1.0" encoding="{}"?>\n<dmrslist>\n'.format(encoding)]
+        self._buffered = 0
+
+    def write(self, dmrs):
+        """
+        Write a DMRS graph
+        """
+        self._write_text(''.join(_iter_xml_strings(dmrs)) + '\n')
+
+    def write_all(self, dmrs_iter):
+        """
+        Write a number of DMRS graphs
+        """
+        for dmrs in dmrs_iter:
+            self.write(dmrs)
+
+    def flush(self):
+        """
+        Write any buffered output, and flush the file
+        """
+        self._write_buffer()
+        self.filehandle.flush()
+
+    def close(self):
+        """
+        Finish the <dmrslist> and flush the file (the file itself is not closed)
+        """
+        if not self.closed:
+            self._buffer.append('</dmrslist>\n')
+            self.flush()
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_text(self, text, count=1):
+        """
+        Write the markup of a number of graphs (one per line)
+        """
+        if self.closed:
+            raise PydmrsValueError("cannot write to a closed XmlWriter")
+        self._buffer.append(text)
+        self._buffered += len(text)
+        old_count = self.count
+        self.count += count
+        if self._buffered >= self.buffer_size:
+            self._write_buffer()
+        if self.flush_every and self.count // self.flush_every > old_count // self.flush_every:
+            self.flush()
+
+    def _write_member(self, data, count):
+        """
+        Write a number of graphs that have already been encoded (and compressed, if compression is set)
+        """
+        if self.closed:
+            raise PydmrsValueError("cannot write to a closed XmlWriter")
+        self._write_buffer()
+        self.filehandle.write(data)
+        old_count = self.count
+        self.count += count
+        if self.flush_every and self.count // self.flush_every > old_count // self.flush_every:
+            self.flush()
+
+    def _write_buffer(self):
+        if self._buffer:
+            data = ''.join(self._buffer).encode(self.encoding, 'xmlcharrefreplace')
+            if self.compression is not None:
+                data = compress(data, self.compression, self.level)
+            self.filehandle.write(data)
+            self._buffer = []
+            self._buffered = 0
+
+
+# Binary corpora
+# A binary corpus file consists of:
+#   a header (magic bytes, version, and the sizes and positions of the tables below),
+#   graph data: for each graph, fixed-width node records followed by fixed-width link records,
+#   a string table: (count + 1) offsets into a block of UTF-8 text,
+#   a pred table: for each pred, its type and string ids (see PredVocabulary),
+#   a sortinfo table: for each sortinfo, a range of (feature, value) string id pairs,
+#   a graph table: for each graph, the position of its records, and the graph's attributes.
+# All integers are little-endian. Missing strings, preds, and sortinfos are stored as -1,
+# and missing integers are marked with flags. Strings, preds, and sortinfos are shared across the corpus.
+# The header is written last, so the output file must be seekable.
+
+BINARY_MAGIC = b'PYDMRSBC'
+BINARY_VERSION = 1
+
+_BINARY_HEADER = struct.Struct('<8sI4xQQQQQQQQ')
+_STRING_OFFSET = struct.Struct('<Q')
+_PRED_RECORD = struct.Struct('<iiii')  # type (0 Pred, 1 RealPred, 2 GPred), then string ids
+_SORTINFO_RECORD = struct.Struct('<II')  # start and number of pairs
+_SORTINFO_PAIR = struct.Struct('<ii')
+_GRAPH_RECORD = struct.Struct('<QIIiiiiiiB7x')
+_NODE_RECORD = struct.Struct('<iiiiiiiiB3x')
+_LINK_RECORD = struct.Struct('<iiii')
+
+# Flags for missing values
+_HAS_INDEX, _HAS_TOP, _HAS_CFROM, _HAS_CTO, _HAS_IDENT = 1, 2, 4, 8, 16
+
+
+def dump_binary(filehandle, dmrs_iter):
+    """
+    Write DMRS graphs to a binary corpus (see open_binary), one at a time
+    NB: write as bytes, to a seekable file!
+    Returns the number of graphs written
+    """
+    strings = {}
+    preds = PredVocabulary()
+    sortinfos = {}
+    graphs = []
+
+    def string_id(string):
+        if string is None:
+            return -1
+        try:
+            return strings[string]
+        except KeyError:
+            strings[string] = len(strings)
+            return strings[string]
+
+    def pred_id(pred):
+        if pred is None:
+            return -1
+        new_id = len(preds)
+        i = preds.add(pred)
+        if i == new_id:  # Add the pred's strings to the string table
+            if isinstance(pred, RealPred):
+                for string in pred:
+                    string_id(string)
+            elif isinstance(pred, GPred):
+                string_id(pred.name)
+        return i
+
+    def sortinfo_id(sortinfo):
+        if not sortinfo:
+            return -1
+        pairs = tuple((string_id(key), string_id(value)) for key, value in sortinfo.items() if value is not None)
+        try:
+            return sortinfos[pairs]
+        except KeyError:
+            sortinfos[pairs] = len(sortinfos)
+            return sortinfos[pairs]
+
+    def flags(*values):
+        return sum(flag for flag, value in values if value is not None)
+
+    # Positions are offsets from the start of the file, where open_binary reads the header
+    if filehandle.tell() != 0:
+        raise PydmrsValueError("binary corpora must be written at the start of the file")
+    filehandle.write(bytes(_BINARY_HEADER.size))
+    position = _BINARY_HEADER.size
+    try:
+        for dmrs in dmrs_iter:
+            records = []
+            for node in dmrs.iter_nodes():
+                records.append(_NODE_RECORD.pack(node.nodeid,
+                                                 pred_id(node.pred),
+                                                 string_id(node.carg),
+                                                 sortinfo_id(node.sortinfo),
+                                                 node.cfrom or 0, node.cto or 0,
+                                                 string_id(node.surface), string_id(node.base),
+                                                 flags((_HAS_CFROM, node.cfrom), (_HAS_CTO, node.cto))))
+            n_nodes = len(records)
+            for link in dmrs.iter_links():
+                records.append(_LINK_RECORD.pack(link.start, link.end,
+                                                 string_id(link.rargname), string_id(link.post)))
+            index = dmrs.index.nodeid if dmrs.index is not None else None
+            top = dmrs.top.nodeid if dmrs.top is not None else None
+            graphs.append(_GRAPH_RECORD.pack(position, n_nodes, len(records) - n_nodes,
+                                             index or 0, top or 0, dmrs.cfrom or 0, dmrs.cto or 0,
+                                             string_id(dmrs.surface), dmrs.ident or 0,
+                                             flags((_HAS_INDEX, index), (_HAS_TOP, top), (_HAS_CFROM, dmrs.cfrom),
+                                                   (_HAS_CTO, dmrs.cto), (_HAS_IDENT, dmrs.ident))))
+            records = b''.join(records)
+            filehandle.write(records)
+            position += len(records)
+    except struct.error as error:
+        raise PydmrsValueError("cannot store graph in binary format: {}".format(error))
+
+    # String table
+    strings_pos = position
+    blob = [string.encode('utf-8') for string in strings]
+    offset = 0
+    for data in blob:
+        filehandle.write(_STRING_OFFSET.pack(offset))
+        offset += len(data)
+    filehandle.write(_STRING_OFFSET.pack(offset))
+    filehandle.write(b''.join(blob))
+    position += _STRING_OFFSET.size * (len(blob) + 1) + offset
+
+    # Pred table
+    preds_pos = position
+    for pred in preds:
+        if isinstance(pred, RealPred):
+            record = (1, string_id(pred.lemma), string_id(pred.pos), string_id(pred.sense))
+        elif isinstance(pred, GPred):
+            record = (2, string_id(pred.name), -1, -1)
+        else:
+            record = (0, -1, -1, -1)
+        filehandle.write(_PRED_RECORD.pack(*record))
+    position += _PRED_RECORD.size * len(preds)
+
+    # Sortinfo table
+    sortinfos_pos = position
+    n_pairs = 0
+    for pairs in sortinfos:
+        filehandle.write(_SORTINFO_RECORD.pack(n_pairs, len(pairs)))
+        n_pairs += len(pairs)
+    for pairs in sortinfos:
+        for pair in pairs:
+            filehandle.write(_SORTINFO_PAIR.pack(*pair))
+    position += _SORTINFO_RECORD.size * len(sortinfos) + _SORTINFO_PAIR.size * n_pairs
+
+    # Graph table
+    graphs_pos = position
+    filehandle.write(b''.join(graphs))
+    position += _GRAPH_RECORD.size * len(graphs)
+
+    # Header
+    filehandle.seek(0)
+    filehandle.write(_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION,
+                                         len(graphs), graphs_pos,
+                                         len(strings), strings_pos,
+                                         len(preds), preds_pos,
+                                         len(sortinfos), sortinfos_pos))
+    filehandle.seek(position)
+    return len(graphs)
+
+
+def open_binary(source, cls=ListDmrs, **kwargs):
+    """
+    Open a binary corpus (see dump_binary), from a filename (or path object) or a file opened as bytes
+    The file is memory-mapped, and graphs are only read when they are accessed
+    Produces ListDmrs objects by default; for a different type, specify cls
+    """
+    return BinaryCorpus(source, cls=cls, **kwargs)
+
+
+class BinaryCorpus(Sequence):
+    """
+    A memory-mapped binary corpus of DMRS graphs, which can be indexed by position
+    Strings, preds, and sortinfos are decoded when first needed, and then shared between graphs
+    If cls is lazy (see LazyMixin), only the graph's attributes are decoded until its nodes or links are needed
+    """
+
+    def __init__(self, source, cls=ListDmrs, **kwargs):
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(os.fspath(source), 'rb')
+            self._owns_file = True
+        else:
+            self._file = source
+            self._owns_file = False
+        if not os.fstat(self._file.fileno()).st_size:
+            if self._owns_file:
+                self._file.close()
+            raise PydmrsValueError("not a binary DMRS corpus (the file is empty)")
+        self._init_data(mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ), cls, kwargs)
+
+    def _init_data(self, buffer, cls, kwargs):
+        """
+        Read the header from a buffer (e.g. a memory map) containing the corpus
+        """
+        self._data = buffer
+        self.cls = cls
+        self.kwargs = kwargs
+        try:
+            (magic, version,
+             self._n_graphs, self._graphs_pos,
+             self._n_strings, self._strings_pos,
+             self._n_preds, self._preds_pos,
+             self._n_sortinfos, self._sortinfos_pos) = _BINARY_HEADER.unpack_from(self._data)
+        except struct.error:
+            magic = version = None
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            self.close()
+            raise PydmrsValueError("not a binary DMRS corpus (version {})".format(BINARY_VERSION))
+        self._text_pos = self._strings_pos + _STRING_OFFSET.size * (self._n_strings + 1)
+        self._pairs_pos = self._sortinfos_pos + _SORTINFO_RECORD.size * self._n_sortinfos
+        self._strings = {}
+        self._preds = {}
+        self._sortinfos = {}
+
+    def __len__(self):
+        return self._n_graphs
+
+    def __getitem__(self, i):
+        """
+        Produce the graph at position i
+        """
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._n_graphs))]
+        if i < 0:
+            i += self._n_graphs
+        if not 0 <= i < self._n_graphs:
+            raise IndexError(i)
+        record = _GRAPH_RECORD.unpack_from(self._data, self._graphs_pos + _GRAPH_RECORD.size * i)
+        if _is_lazy(self.cls):
+            cfrom, cto, surface, ident, flags = record[5:]
+            return self.cls.lazy(partial(self._decode, record),
+                                 cfrom=cfrom if flags & _HAS_CFROM else None,
+                                 cto=cto if flags & _HAS_CTO else None,
+                                 surface=self._string(surface),
+                                 ident=ident if flags & _HAS_IDENT else None)
+        return self._decode(record)
+
+    def _decode(self, record):
+        """
+        Produce a graph from its record in the graph table
+        """
+        position, n_nodes, n_links, index, top, cfrom, cto, surface, ident, flags = record
+        links_pos = position + _NODE_RECORD.size * n_nodes
+        end = links_pos + _LINK_RECORD.size * n_links
+        string = self._string
+        nodes = [self.cls.Node(nodeid=nodeid, pred=self._pred(pred), sortinfo=self._sortinfo(sortinfo),
+                               cfrom=node_cfrom if node_flags & _HAS_CFROM else None,
+                               cto=node_cto if node_flags & _HAS_CTO else None,
+                               surface=string(node_surface), base=string(base), carg=string(carg), level=TRUSTED)
+                 for (nodeid, pred, carg, sortinfo, node_cfrom, node_cto, node_surface, base, node_flags)
+                 in _NODE_RECORD.iter_unpack(self._data[position:links_pos])]
+        links = [Link(start, end, string(rargname), string(post))
+                 for start, end, rargname, post in _LINK_RECORD.iter_unpack(self._data[links_pos:end])]
+        return self.cls(nodes, links,
+                        cfrom=cfrom if flags & _HAS_CFROM else None,
+                        cto=cto if flags & _HAS_CTO else None,
+                        surface=string(surface),
+                        ident=ident if flags & _HAS_IDENT else None,
+                        index=index if flags & _HAS_INDEX else None,
+                        top=top if flags & _HAS_TOP else None,
+                        **self.kwargs)
+
+    def close(self):
+        """
+        Close the memory map (and the file, if it was opened from a filename)
+        """
+        self._data.close()
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _string(self, i):
+        if i < 0:
+            return None
+        try:
+            return self._strings[i]
+        except KeyError:
+            start, end = struct.unpack_from('<QQ', self._data, self._strings_pos + _STRING_OFFSET.size * i)
+            string = str(self._data[self._text_pos + start:self._text_pos + end], 'utf-8')
+            self._strings[i] = string
+            return string
+
+    def _pred(self, i):
+        if i < 0:
+            return None
+        try:
+            return self._preds[i]
+        except KeyError:
+            predtype, first, second, third = _PRED_RECORD.unpack_from(self._data, self._preds_pos + _PRED_RECORD.size * i)
+            if predtype == 1:
+                pred = RealPred(self._string(first), self._string(second), self._string(third), level=TRUSTED)
+            elif predtype == 2:
+                pred = GPred(self._string(first))
+            else:
+                pred = Pred()
+            pred = intern_pred(pred)
+            self._preds[i] = pred
+            return pred
+
+    def _sortinfo(self, i):
+        if i < 0:
+            return None
+        try:
+            return self._sortinfos[i]
+        except KeyError:
+            start, count = _SORTINFO_RECORD.unpack_from(self._data, self._sortinfos_pos + _SORTINFO_RECORD.size * i)
+            pairs_pos = self._pairs_pos + _SORTINFO_PAIR.size * start
+            sortinfo = intern_sortinfo([(self._string(key), self._string(value)) for key, value
+                                        in _SORTINFO_PAIR.iter_unpack(self._data[pairs_pos:pairs_pos + _SORTINFO_PAIR.size * count])],
+                                       TRUSTED)
+            self._sortinfos[i] = sortinfo
+            return sortinfo
+
+
+# Shared-memory corpora
+# A binary corpus (see dump_binary) can be copied into shared memory once,
+# and other processes can then attach to it by name, without copying, parsing, or unpickling it.
+# Each graph is only decoded when it is accessed, from the shared node and link records.
+# Pickling a SharedCorpus (e.g. to pass it to a worker process) only pickles its name.
+
+def share_corpus(source, name=None, cls=ListDmrs, **kwargs):
+    """
+    Copy a corpus into shared memory, and return a SharedCorpus
+    The source can be the filename of a binary corpus, or an iterable of DMRS graphs
+    The shared memory should be freed with unlink() when no longer needed (or by using a 'with' statement)
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as filehandle:
+            return _share_file(filehandle, name, cls, kwargs)
+    else:
+        with tempfile.TemporaryFile() as filehandle:
+            dump_binary(filehandle, source)
+            filehandle.seek(0)
+            return _share_file(filehandle, name, cls, kwargs)
+
+
+def _share_file(filehandle, name, cls, kwargs):
+    """
+    Copy a binary corpus file into new shared memory
+    """
+    size = os.fstat(filehandle.fileno()).st_size
+    shm = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+    try:
+        position = 0
+        while position < size:
+            with shm.buf[position:min(position + xml_chunk_size, size)] as view:
+                position += filehandle.readinto(view)
+        corpus = SharedCorpus.__new__(SharedCorpus)
+        corpus._attach(shm, True, cls, kwargs)
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    return corpus
+
+
+# Before Python 3.13, SharedMemory cannot be told not to track memory it attaches to
+_SHM_TRACK_ARGUMENT = sys.version_info >= (3, 13)
+
+
+class SharedCorpus(BinaryCorpus):
+    """
+    A binary corpus of DMRS graphs in shared memory (see share_corpus), which can be indexed by position
+    To attach to an existing corpus, specify its name
+    """
+
+    def __init__(self, name, cls=ListDmrs, **kwargs):
+        # Attaching processes should not free the shared memory when they exit
+        if _SHM_TRACK_ARGUMENT:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # Attaching registers the memory with the resource tracker, which would free it
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        self._attach(shm, False, cls, kwargs)
+
+    def _attach(self, shm, owner, cls, kwargs):
+        self._shm = shm
+        self._owner = owner
+        self.name = shm.name
+        self._init_data(shm.buf, cls, kwargs)
+
+    def __reduce__(self):
+        return (_attach_corpus, (self.name, self.cls, self.kwargs))
+
+    def close(self):
+        """
+        Detach from the shared memory (without freeing it)
+        """
+        self._data = None
+        self._shm.close()
+
+    def unlink(self):
+        """
+        Free the shared memory (once all processes have closed it)
+        """
+        if not _SHM_TRACK_ARGUMENT:
+            # unlink() unregisters the memory, which an attaching process may already have done
+            # (forked processes share the resource tracker), so register it again first
+            resource_tracker.register(self._shm._name, 'shared_memory')
+        self._shm.unlink()
+
+    def __exit__(self, *exc_info):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+
+# Shared corpora unpickled in this process, so that each process only attaches once
+_attached_corpora = {}
+
+
+def _attach_corpus(name, cls, kwargs):
+    key = (name, cls, tuple(sorted(kwargs.items())))
+    corpus = _attached_corpora.get(key)
+    if corpus is None or corpus._data is None:
+        corpus = _attached_corpora[key] = SharedCorpus(name, cls=cls, **kwargs)
+    return corpus
+
+
+# Indexed XML corpora
+# An XML corpus is scanned once, recording the byte offset and length of each top-level <dmrs> element,
+# and its ident attribute. The index can be stored in a sidecar text file (by default, the corpus path + '.idx'):
+# a header line (format version, size and modification time of the corpus, and declared encoding),
+# then one line per graph: "offset length ident", with '-' for a missing ident.
+# If the corpus has changed since the index was written, the index is rebuilt.
+# Reading a corpus only writes a sidecar file if asked to; otherwise, a missing index is kept in memory.
+
+XML_INDEX_SUFFIX = '.idx'
+_XML_INDEX_HEADER = 'pydmrs-xml-index'
+_XML_INDEX_VERSION = '1'
+
+
+def index_xml(path, index_path=None, chunk_size=None):
+    """
+    Scan an XML corpus, and write a sidecar index of its <dmrs> elements (see XmlCorpus)
+    Returns the list of (offset, length, ident) triples
+    """
+    if index_path is None:
+        index_path = path + XML_INDEX_SUFFIX
+    entries, encoding = _scan_xml_file(path, chunk_size)
+    _write_xml_index(path, index_path, entries, encoding)
+    return entries
+
+
+def _scan_xml_file(path, chunk_size=None):
+    """
+    Scan an XML corpus, returning (entries, encoding) without writing an index
+    """
+    if _is_compressed(path):
+        raise PydmrsValueError("compressed corpora cannot be indexed: {}".format(path))
+    with open(path, 'rb') as filehandle:
+        return _scan_xml(filehandle, chunk_size or xml_chunk_size)
+
+
+def _write_xml_index(path, index_path, entries, encoding):
+    """
+    Write a sidecar index for an XML corpus
+    """
+    stat = os.stat(path)
+    with open(index_path, 'w', encoding='utf-8') as filehandle:
+        filehandle.write('\t'.join([_XML_INDEX_HEADER, _XML_INDEX_VERSION, str(stat.st_size),
+                                    str(stat.st_mtime_ns), encoding or '-']) + '\n')
+        for offset, length, ident in entries:
+            filehandle.write('{} {} {}\n'.format(offset, length, '-' if ident is None else ident))
+
+
+def _scan_xml(filehandle, chunk_size):
+    """
+    Find the (offset, length, ident) triples of the top-level <dmrs> elements in a file,
+    and the encoding given in the XML declaration (if any)
+    """
+    parser = expat.ParserCreate()
+    entries = []
+    stack = []
+    shift = len(_STREAM_ROOT) + 2  # Offsets in the wrapped stream are shifted by the extra root's start tag
+    encoding = None
+    current = None  # (offset, ident) of the current <dmrs> element
+    finished = None  # (offset, ident) of a <dmrs> element whose end tag has just been parsed
+
+    def finish():
+        # The element ends where the next event starts
+        nonlocal finished
+        if finished is not None:
+            offset, ident = finished
+            entries.append((offset, parser.CurrentByteIndex - shift - offset, ident))
+            finished = None
+
+    def start(tag, attrib):
+        nonlocal current
+        finish()
+        parent = stack[-1] if stack else None
+        if parent == _STREAM_ROOT and tag not in ('dmrs', 'dmrslist') \
+                or parent == 'dmrslist' and tag != 'dmrs':
+            raise PydmrsValueError(tag)
+        if tag == 'dmrs' and parent in (_STREAM_ROOT, 'dmrslist'):
+            ident = attrib.get('ident')
+            current = (parser.CurrentByteIndex - shift, int(ident) if ident is not None else None)
+        stack.append(tag)
+
+    def end(tag):
+        nonlocal current, finished
+        finish()
+        stack.pop()
+        if tag == 'dmrs' and stack and stack[-1] in (_STREAM_ROOT, 'dmrslist'):
+            finished, current = current, None
+
+    def xml_decl(version, decl_encoding, standalone):
+        nonlocal encoding
+        encoding = decl_encoding
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = lambda data: finish()
+    parser.CommentHandler = lambda data: finish()
+    parser.ProcessingInstructionHandler = lambda target, data: finish()
+    parser.XmlDeclHandler = xml_decl
+    for data in _wrap_stream(_iter_chunks(filehandle, chunk_size)):
+        parser.Parse(data, False)
+    parser.Parse(b'', True)
+    return entries, encoding
+
+
+def _read_xml_index(path, index_path):
+    """
+    Read a sidecar index, returning (entries, encoding), or None if it is missing or out of date
+    """
+    try:
+        with open(index_path, encoding='utf-8') as filehandle:
+            header = filehandle.readline().rstrip('\n').split('\t')
+            stat = os.stat(path)
+            if header[:4] != [_XML_INDEX_HEADER, _XML_INDEX_VERSION, str(stat.st_size), str(stat.st_mtime_ns)]:
+                return None
+            entries = []
+            for line in filehandle:
+                offset, length, ident = line.split()
+                entries.append((int(offset), int(length), None if ident == '-' else int(ident)))
+    except (OSError, ValueError, IndexError):
+        return None
+    return entries, (header[4] if header[4] != '-' else None)
+
+
+def _load_xml_index(path, index_path=None, write=False):
+    """
+    Read a sidecar index, or scan the corpus if the index is missing or out of date, returning (entries, encoding)
+    A new index is only written to a file if index_path is given or write is True,
+    and if it cannot be written, it is only kept in memory
+    """
+    if index_path is not None:
+        write = True
+    else:
+        index_path = path + XML_INDEX_SUFFIX
+    index = _read_xml_index(path, index_path)
+    if index is None:
+        index = _scan_xml_file(path)
+        if write:
+            try:
+                _write_xml_index(path, index_path, *index)
+            except OSError:
+                pass
+    return index
+
+
+def _to_utf8(bytestring, encoding):
+    """
+    Recode part of a document, if the encoding from its XML declaration is not compatible with UTF-8
+    """
+    if encoding is not None and encoding.lower().replace('-', '') not in ('utf8', 'usascii', 'ascii'):
+        return str(bytestring, encoding).encode('utf-8')
+    return bytestring
+
+
+class XmlCorpus(Sequence):
+    """
+    An XML corpus of DMRS graphs, which can be indexed by position, or by ident (see by_ident)
+    Only the requested graph is read from the file and parsed
+    If cls is lazy (see LazyMixin), only the graph's attributes are parsed until its nodes or links are needed
+    The corpus is indexed when first opened, using a sidecar file if there is an up-to-date one (see index_xml)
+    To store a new index in a sidecar file, specify index_path, or set write_index to use the default path
+    Produces ListDmrs objects by default; for a different type, specify cls
+    """
+
+    def __init__(self, path, cls=ListDmrs, index_path=None, validation=None, write_index=False, **kwargs):
+        self.path = path
+        self.index_path = index_path if index_path is not None else path + XML_INDEX_SUFFIX
+        self.cls = cls
+        self.validation = validation
+        self.kwargs = kwargs
+        entries, self.encoding = _load_xml_index(self.path, index_path, write_index)
+        self._offsets = array('Q', (offset for offset, _, _ in entries))
+        self._lengths = array('Q', (length for _, length, _ in entries))
+        self._idents = {ident: i for i, (_, _, ident) in enumerate(entries) if ident is not None}
+        with open(self.path, 'rb') as filehandle:
+            if os.fstat(filehandle.fileno()).st_size:
+                self._data = mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._data = None
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, i):
+        """
+        Parse the graph at position i, directly from the memory-mapped file
+        """
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        offset = self._offsets[i]
+        bytestring = _to_utf8(memoryview(self._data)[offset:offset + self._lengths[i]], self.encoding)
+        return loads_xml(bytestring, cls=self.cls, validation=self.validation, **self.kwargs)
+
+    def by_ident(self, ident):
+        """
+        Read and parse the graph with the given ident
+        """
+        return self[self._idents[ident]]
+
+    def position(self, ident):
+        """
+        Return the position of the graph with the given ident
+        """
+        return self._idents[ident]
+
+    def close(self):
+        """
+        Close the memory map (unless lazy graphs still refer to it, in which case it is closed once they are released)
+        """
+        if self._data is not None:
+            try:
+                self._data.close()
+            except BufferError:
+                pass
+            self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Parallel processing
+# Corpora are split into batches of graphs, which are parsed or serialised in worker processes.
+# Files are split at <dmrs> boundaries using the sidecar index (see XmlCorpus).
+# Compressed files cannot be indexed, so they are decompressed in this process,
+# and split at the end tags of <dmrs> elements (this assumes an ASCII-compatible encoding).
+# At most max_pending batches are in flight at once, so memory use is bounded
+# even if the consumer is slower than the workers.
+
+parallel_batch_size = 256
+
+_XML_ENCODING = re.compile(br'(?:\xef\xbb\xbf)?\s*<\?xml\b[^>]*?\bencoding\s*=\s*["\']([A-Za-z0-9._-]+)["\']')
+_GRAPH_START = re.compile(br'<dmrs[\s/>]')
+_GRAPH_END = re.compile(br'</dmrs\s*>|<dmrs(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*\s*/>')
+
+
+def parallel_load(sources, workers=None, cls=ListDmrs, validation=None, ordered=True,
+                  batch_size=None, max_pending=None, **kwargs):
+    """
+    Iterate through the DMRS graphs in a number of XML files or bytestrings, parsing them in worker processes
+    Each source can be a filename, or a bytestring of "<dmrslist>...</dmrslist>" or "<dmrs>...</dmrs>" elements
+    Graphs are produced in order by default; to produce them as soon as they are parsed, set ordered=False
+    Produces ListDmrs objects by default; for a different type, specify cls
+    """
+    batch_size = batch_size or parallel_batch_size
+    tasks = ((_load_batch, task, cls, validation, kwargs) for task in _iter_load_tasks(sources, batch_size))
+    for graphs in _run_parallel(tasks, workers, ordered, max_pending):
+        yield from graphs
+
+
+def parallel_dump(filehandle, dmrs_iter, workers=None, encoding='utf-8', batch_size=None, max_pending=None,
+                  compression=None, level=None):
+    """
+    Write DMRS graphs to a file as "<dmrslist>...</dmrslist>", serialising them in worker processes
+    NB: open the file as bytes!
+    To compress the output, specify compression ('gzip', 'bz2', or 'lzma') and optionally level;
+    each batch is then compressed in a worker process, as an independent member
+    Returns the number of graphs written
+    """
+    batch_size = batch_size or parallel_batch_size
+    tasks = ((_dump_batch, batch, encoding, compression, level)
+             for batch in _iter_batches(dmrs_iter, batch_size))
+    with XmlWriter(filehandle, encoding=encoding, compression=compression, level=level) as writer:
+        for data, count in _run_parallel(tasks, workers, True, max_pending):
+            writer._write_member(data, count)
+    return writer.count
+
+
+def _iter_load_tasks(sources, batch_size):
+    """
+    Split sources into (filename, offset, length, encoding), (bytestring, encoding), or (bytestring,) tasks
+    """
+    for source in sources:
+        if isinstance(source, str) and _is_compressed(source):
+            yield from _iter_stream_tasks(source, batch_size)
+        elif isinstance(source, str):
+            entries, encoding = _load_xml_index(source)
+            for i in range(0, len(entries), batch_size):
+                first = entries[i]
+                last = entries[min(i + batch_size, len(entries)) - 1]
+                yield (source, first[0], last[0] + last[1] - first[0], encoding)
+        else:
+            yield (source,)
+
+
+def _iter_stream_tasks(path, batch_size):
+    """
+    Split a compressed file into (bytestring, encoding) tasks, at the ends of top-level <dmrs> elements
+    """
+    buffer = bytearray()
+    encoding = None
+    first = True  # Whether the prolog and any <dmrslist> start tag are still in the buffer
+    count = 0  # The number of complete elements in the buffer
+    end = 0  # The end of the last complete element in the buffer
+    for chunk in _decompress_stream(_iter_chunks(path, xml_chunk_size)):
+        if first and not buffer:
+            match = _XML_ENCODING.match(chunk)
+            if match:
+                encoding = match.group(1).decode('ascii')
+        buffer += chunk
+        while True:
+            for match in _GRAPH_END.finditer(buffer, end):
+                end = match.end()
+                count += 1
+                if count == batch_size:
+                    break
+            if count < batch_size:
+                break
+            yield (_strip_prolog(buffer[:end], first), encoding)
+            del buffer[:end]
+            first = False
+            count = 0
+            end = 0
+    if count:
+        yield (_strip_prolog(buffer[:end], first), encoding)
+    elif first and buffer:
+        # No elements were found (e.g. if the encoding is not ASCII-compatible), so parse the whole document
+        yield (bytes(buffer),)
+
+
+def _strip_prolog(bytestring, first):
+    """
+    Remove anything before the first <dmrs> element (the XML declaration and <dmrslist> start tag)
+    """
+    if first:
+        match = _GRAPH_START.search(bytestring)
+        if match:
+            return bytes(bytestring[match.start():])
+    return bytes(bytestring)
+
+
+def _iter_batches(iterable, batch_size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load_batch(task, cls, validation, kwargs):
+    """
+    Parse a batch of graphs (in a worker process)
+    """
+    if len(task) == 1:
+        bytestring = task[0]
+    elif len(task) == 2:
+        bytestring = _to_utf8(task[0], task[1])
+    else:
+        filename, offset, length, encoding = task
+        with open(filename, 'rb') as filehandle:
+            filehandle.seek(offset)
+            bytestring = _to_utf8(filehandle.read(length), encoding)
+    return list(iter_xml(bytestring, cls=cls, validation=validation, **kwargs))
+
+
+def _dump_batch(batch, encoding, compression, level):
+    """
+    Serialise a batch of graphs (in a worker process), returning the encoded (and compressed) bytes
+    and the number of graphs
+    """
+    text = ''.join(''.join(_iter_xml_strings(dmrs)) + '\n' for dmrs in batch)
+    data = text.encode(encoding, 'xmlcharrefreplace')
+    if compression is not None:
+        data = compress(data, compression, level)
+    return data, len(batch)
+
+
+def _run_parallel(tasks, workers, ordered, max_pending):
+    """
+    Run (function, *args) tasks in a process pool, keeping at most max_pending tasks in flight,
+    and iterate through the results (in order, or as they are completed)
+    If workers is 0, tasks are run in this process
+    """
+    if workers == 0:
+        for function, *args in tasks:
+            yield function(*args)
+        return
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * workers
+    executor = ProcessPoolExecutor(workers)
+    pending = deque()
+    try:
+        for function, *args in tasks:
+            pending.append(executor.submit(function, *args))
+            if len(pending) >= max_pending:
+                yield from _collect(pending, ordered)
+        while pending:
+            yield from _collect(pending, ordered)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _collect(pending, ordered):
+    """
+    Remove the next result from a queue of futures (or all completed results, if not ordered)
+    """
+    if ordered:
+        yield pending.popleft().result()
+    else:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in list(pending):
+            if future in done:
+                pending.remove(future)
+                yield future.result()
+
+
 def visualise(dmrs, format):
     """
     Returns the bytestring of the chosen visualisation representation.
@@ -1,7 +1,7 @@
 import argparse
 from configparser import ConfigParser, NoSectionError, NoOptionError
 
-from pydmrs.serial import loads_xml, dumps_xml
+from pydmrs.serial import iter_xml, dumps_xml
 from pydmrs.simplification.gpred_filtering import gpred_filtering
 
 
@@ -57,19 +57,6 @@ def parse_gpred_filter_config(gpred_filter_config):
     return gpred_filters
 
 
-def split_dmrs_string(content):
-    """
-    Split a string of DMRS read from a file into indvidual DMRS strings.
-    :param content: File content
-    :return: List of DMRS XML strings
-    """
-
-    content_split = content.split('<dmrs')
-    content_filter = filter(lambda x: x.strip() != '', content_split)
-    content_fixed = [('<dmrs' + x).strip() for x in content_filter]
-    return content_fixed
-
-
 def dmrs_simplification(dmrs, gpred_filter, allow_disconnected_dmrs=False):
 
     if gpred_filter is not None:
@@ -95,11 +82,8 @@ if __name__ == '__main__':
     gpred_filter_allow_disconnected_dmrs = get_config_option(config, 'General Predicate Filtering', 'allow_disconnected_dmrs', bool)
     gpred_filter = parse_gpred_filter_config(gpred_filter_config)
 
-    with open(args.input_dmrs, 'r', encoding="utf-8") as fin, open(args.output_dmrs, 'w') as fout:
-        content = fin.read().strip()
-
-        for dmrs_string in split_dmrs_string(content):
-            dmrs = loads_xml(dmrs_string)
+    with open(args.input_dmrs, 'rb') as fin, open(args.output_dmrs, 'w') as fout:
+        for dmrs in iter_xml(fin):
             simplified_dmrs = dmrs_simplification(dmrs, gpred_filter,
                                                   allow_disconnected_dmrs=gpred_filter_allow_disconnected_dmrs)
             simplified_dmrs_string = dumps_xml(simplified_dmrs)
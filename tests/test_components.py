@@ -2,7 +2,9 @@ import unittest, warnings
 
 from pydmrs.components import (
     Pred, RealPred, GPred,
-    Sortinfo, EventSortinfo, InstanceSortinfo
+    Sortinfo, EventSortinfo, InstanceSortinfo, PackedSortinfo, FrozenSortinfo,
+    intern_pred, clear_pred_cache, intern_sortinfo, PredVocabulary,
+    STRICT, NORMALISE, TRUSTED, get_validation_level, set_validation_level, validation_level
 )
 
 class TestPred(unittest.TestCase):
@@ -52,6 +54,52 @@ class TestPred(unittest.TestCase):
         # Strip trailing _rel
         self.assertEqual(Pred.normalise_string('pron_rel'), 'pron')
     
+    def test_Pred_normalise_string_validation(self):
+        """
+        With NORMALISE, strings should be normalised without checks or warnings.
+        With TRUSTED, only '_rel' should be stripped.
+        """
+        with validation_level(NORMALISE):
+            self.assertEqual(get_validation_level(), NORMALISE)
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                self.assertEqual(Pred.normalise_string('"PRON_REL"'), 'pron')
+                self.assertEqual(Pred.normalise_string("'pron"), 'pron')
+                self.assertEqual(Pred.normalise_string('pred name'), 'pred name')
+        self.assertEqual(get_validation_level(), STRICT)
+        with validation_level(TRUSTED):
+            self.assertEqual(Pred.normalise_string('pron_rel'), 'pron')
+            self.assertEqual(Pred.normalise_string('PRON'), 'PRON')
+            self.assertEqual(RealPred('nowhere near', 'x'), ('nowhere near', 'x', None))
+            # Trusted results are not returned for strict calls
+            self.assertEqual(Pred.from_string('_CAT_N_1'), RealPred('CAT', 'N', '1'))
+        self.assertEqual(Pred.from_string('_CAT_N_1'), RealPred('cat', 'n', '1'))
+        with self.assertRaises(ValueError):
+            RealPred('nowhere near', 'x')
+        with self.assertRaises(ValueError):
+            set_validation_level('lenient')
+
+    def test_Pred_from_string_level(self):
+        """
+        A validation level given explicitly should override the global level
+        """
+        self.assertEqual(Pred.from_string('_CAT_N_1', TRUSTED), RealPred('CAT', 'N', '1'))
+        self.assertEqual(RealPred('nowhere near', 'x', level=TRUSTED), ('nowhere near', 'x', None))
+        self.assertEqual(intern_sortinfo({'cvarsort': 'E', 'tense': 'PAST'}, NORMALISE), EventSortinfo(tense='past'))
+        # Trusted sortinfos are kept as they are, even if the global level is STRICT
+        self.assertEqual(get_validation_level(), STRICT)
+        self.assertEqual(Sortinfo.from_dict({'cvarsort': 'e', 'tense': 'PAST'}, TRUSTED).tense, 'PAST')
+        self.assertEqual(intern_sortinfo({'cvarsort': 'e', 'tense': 'PRES'}, TRUSTED).tense, 'PRES')
+        with self.assertRaises(AttributeError):
+            Sortinfo.from_dict({'cvarsort': 'e', 'num': 'sg'}, TRUSTED)
+        with validation_level(TRUSTED):
+            self.assertEqual(Pred.from_string('_CAT_N_1', STRICT), RealPred('cat', 'n', '1'))
+            self.assertEqual(Pred.from_string('_CAT_N_1'), RealPred('CAT', 'N', '1'))
+            with self.assertRaises(ValueError):
+                RealPred('nowhere near', 'x', level=STRICT)
+            self.assertEqual(Sortinfo.from_dict({'cvarsort': 'E', 'tense': 'PAST'}, STRICT).tense, 'past')
+        self.assertEqual(get_validation_level(), STRICT)
+    
     def test_Pred_from_normalised_string(self):
         """
         Pred.from_normalised_string should instantiate RealPreds or GPreds
@@ -83,6 +131,30 @@ class TestPred(unittest.TestCase):
         self.assertEqual(Pred.from_string('"the_rel"'), the_pred)
         self.assertEqual(Pred.from_string('THE_REL'), the_pred)
     
+    def test_Pred_from_string_interned(self):
+        """
+        Equal preds created from strings should be the same instance,
+        whatever form the string was in
+        """
+        clear_pred_cache()
+        cat = Pred.from_string('_cat_n_1_rel')
+        self.assertIs(Pred.from_string('_cat_n_1_rel'), cat)
+        self.assertIs(Pred.from_string('_cat_n_1'), cat)
+        self.assertIs(RealPred.from_string('"_cat_n_1"'), cat)
+        self.assertIs(intern_pred(RealPred('cat', 'n', '1')), cat)
+        pron = GPred.from_string('pron_rel')
+        self.assertIs(Pred.from_string('pron'), pron)
+        self.assertIs(intern_pred(GPred('pron')), pron)
+        # Failures should not be cached
+        with self.assertRaises(ValueError):
+            GPred.from_string('_cat_n_1')
+        with self.assertRaises(ValueError):
+            GPred.from_string('_cat_n_1')
+        # Warnings should be given every time, not only when the string is first seen
+        for _ in range(2):
+            with self.assertWarns(Warning):
+                self.assertIs(Pred.from_string('_Cat_n_1', STRICT), cat)
+    
     def test_Pred_cmp_self(self):
         """
         All Pred instances should be equal. 
@@ -114,6 +186,37 @@ class TestPred(unittest.TestCase):
         self.assertGreaterEqual(cat, p)
         self.assertGreaterEqual(pron, p)
 
+    def test_Pred_sort_key(self):
+        """
+        Sort keys should give a consistent total order,
+        even for preds which are incomparable by subsumption.
+        Equal preds should have equal keys.
+        """
+        preds = [GPred('udef_q'), RealPred('take', 'v', '1'), Pred(), RealPred('take', 'v'),
+                 GPred('pron'), RealPred('cat', 'n', '1'), RealPred('?', 'v', '?')]
+        self.assertEqual(sorted(preds, key=lambda p: p.sort_key),
+                         [Pred(), RealPred('?', 'v', '?'), RealPred('cat', 'n', '1'),
+                          RealPred('take', 'v'), RealPred('take', 'v', '1'),
+                          GPred('pron'), GPred('udef_q')])
+        for pred in preds:
+            for other in preds:
+                self.assertEqual(pred == other, pred.sort_key == other.sort_key)
+
+    def test_Pred_dict(self):
+        """
+        Preds converted to dicts should be recreated exactly,
+        including lemmas with underscores, and GPreds named 'predsort'
+        """
+        preds = [Pred(), RealPred('a_b', 'n'), RealPred('take', 'v', '1'), GPred('predsort'), GPred('udef_q')]
+        for pred in preds:
+            new = Pred.from_dict(pred.to_dict())
+            self.assertEqual(new, pred)
+            self.assertIs(type(new), type(pred))
+        with self.assertRaises(ValueError):
+            Pred.from_dict({'type': 'real', 'lemma': 'a b', 'pos': 'n'}, STRICT)
+        with self.assertRaises(ValueError):
+            Pred.from_dict({'name': 'udef_q'})
+
     def test_Pred_subclasses(self):
         """
         RealPred and GPred should be subclasses of Pred
@@ -425,6 +528,56 @@ class TestPred(unittest.TestCase):
         self.assertLessEqual(g, pron)
 
 
+class TestPredVocabulary(unittest.TestCase):
+    """
+    Test methods of PredVocabulary class
+    """
+    preds = [RealPred('cat', 'n', '1'), RealPred('the', 'q'),
+             RealPred('nowhere_near', 'x', 'deg'), GPred('udef_q'), Pred()]
+    
+    def test_PredVocabulary_ids(self):
+        """
+        Preds should be given dense ids in order of addition
+        """
+        vocab = PredVocabulary(self.preds)
+        self.assertEqual(len(vocab), 5)
+        self.assertEqual(list(vocab), self.preds)
+        for i, pred in enumerate(self.preds):
+            self.assertEqual(vocab.get_id(pred), i)
+            self.assertEqual(vocab.add(pred), i)
+            self.assertEqual(vocab.get_pred(i), pred)
+        self.assertNotIn(GPred('pron'), vocab)
+        with self.assertRaises(KeyError):
+            vocab.get_id(GPred('pron'))
+        self.assertEqual(vocab.add(GPred('pron')), 5)
+        self.assertIn(GPred('pron'), vocab)
+    
+    def test_PredVocabulary_dump_load(self):
+        """
+        A vocabulary should have the same ids after saving and loading,
+        or after pickling
+        """
+        import io, pickle
+        vocab = PredVocabulary(self.preds)
+        filehandle = io.StringIO()
+        vocab.dump(filehandle)
+        filehandle.seek(0)
+        self.assertEqual(PredVocabulary.load(filehandle), vocab)
+        self.assertEqual(pickle.loads(pickle.dumps(vocab)), vocab)
+    
+    def test_PredVocabulary_annotate(self):
+        """
+        Nodes should be annotated with pred ids
+        """
+        from pydmrs.core import Node
+        nodes = [Node(1, '_the_q'), Node(2, '_cat_n_1'), Node(3, '_the_q')]
+        vocab = PredVocabulary()
+        vocab.annotate(nodes)
+        self.assertEqual([node.pred_id for node in nodes], [0, 1, 0])
+        with self.assertRaises(KeyError):
+            vocab.annotate([Node(4, 'udef_q')], add=False)
+
+
 class TestSortinfo(unittest.TestCase):
     """
     Test methods of SortInfo and subclasses
@@ -606,6 +759,34 @@ class TestSortinfo(unittest.TestCase):
         self.assertEqual(instance.as_dict(), instance_dict)
         self.assertEqual(instance, InstanceSortinfo.from_dict(instance_dict))
     
+    def test_Sortinfo_validation(self):
+        """
+        With TRUSTED, Sortinfo values should not be converted to lowercase
+        """
+        with validation_level(TRUSTED):
+            event = EventSortinfo(tense='past')
+            self.assertEqual(Sortinfo.from_dict({'cvarsort': 'e', 'tense': 'past'}), event)
+            event.mood = 'INDICATIVE'
+            self.assertEqual(event.mood, 'INDICATIVE')
+        event.mood = 'INDICATIVE'
+        self.assertEqual(event.mood, 'indicative')
+    
+    def test_Sortinfo_copy(self):
+        """
+        copy.copy and copy.deepcopy should return an equal Sortinfo
+        of the same type, which can be changed independently
+        """
+        from copy import copy, deepcopy
+        event = EventSortinfo('prop', 'past', 'indicative', '-', None)
+        for new in (copy(event), deepcopy(event)):
+            self.assertIs(type(new), EventSortinfo)
+            self.assertEqual(new, event)
+            self.assertIsNot(new, event)
+            self.assertIsNone(new.prog)
+            new.tense = 'PRES'
+            self.assertEqual(new.tense, 'pres')
+            self.assertEqual(event.tense, 'past')
+    
     def test_Sortinfo_cmp(self):
         """
         Sortinfo objects should be equal if all features are equal.
@@ -645,6 +826,130 @@ class TestSortinfo(unittest.TestCase):
         self.assertFalse(underspec_instance < another_instance)
         self.assertFalse(underspec_instance > another_instance)
     
+    def test_Sortinfo_sort_key(self):
+        """
+        Equal Sortinfos should have equal sort keys,
+        regardless of underspecified values or mutability
+        """
+        event = EventSortinfo('prop', 'past', 'indicative', '-', '-')
+        underspec_event = EventSortinfo('prop', 'past', 'indicative', '?', 'u')
+        another_event = EventSortinfo('prop', 'past', 'indicative', None, None)
+        self.assertEqual(event.sort_key, event.freeze().sort_key)
+        self.assertEqual(underspec_event.sort_key, another_event.sort_key)
+        self.assertNotEqual(event.sort_key, another_event.sort_key)
+        self.assertNotEqual(Sortinfo().sort_key, InstanceSortinfo().sort_key)
+
+    def test_Sortinfo_pickle(self):
+        """
+        Unpickling should give an equal Sortinfo of the same class
+        """
+        import pickle
+        for sortinfo in (Sortinfo(), EventSortinfo('prop', 'past', 'u', None, '-'), InstanceSortinfo(num='sg')):
+            new = pickle.loads(pickle.dumps(sortinfo))
+            self.assertIs(type(new), type(sortinfo))
+            self.assertEqual(list(new.values()), list(sortinfo.values()))
+        frozen = InstanceSortinfo(num='sg').freeze()
+        self.assertIs(pickle.loads(pickle.dumps(frozen)), pickle.loads(pickle.dumps(frozen)))
+
+    def test_FrozenSortinfo(self):
+        """
+        Frozen Sortinfos should be equal to mutable ones, hashable, and immutable
+        """
+        from copy import copy, deepcopy
+        event = EventSortinfo('prop', 'past', 'indicative', '-', 'u')
+        frozen = event.freeze()
+        self.assertIsInstance(frozen, EventSortinfo)
+        self.assertIsInstance(frozen, FrozenSortinfo)
+        self.assertEqual(frozen, event)
+        self.assertEqual(frozen.cvarsort, 'e')
+        self.assertEqual(frozen.prog, 'u')
+        self.assertEqual(repr(frozen), repr(event))
+        self.assertEqual(hash(frozen), hash(EventSortinfo('prop', 'past', 'indicative', '-').freeze()))
+        self.assertIs(copy(frozen), frozen)
+        self.assertIs(deepcopy(frozen), frozen)
+        with self.assertRaises(TypeError):
+            frozen.tense = 'pres'
+        with self.assertRaises(TypeError):
+            del frozen['tense']
+        thawed = frozen.thaw()
+        self.assertIs(type(thawed), EventSortinfo)
+        thawed.tense = 'pres'
+        self.assertEqual(frozen.tense, 'past')
+        # Frozen classes can also be instantiated directly
+        frozen_class = EventSortinfo.frozen_class()
+        self.assertEqual(frozen_class('prop', tense='PAST', mood='indicative', perf='-', prog='u'), event)
+        self.assertEqual(Sortinfo().freeze(), Sortinfo())
+    
+    def test_intern_sortinfo(self):
+        """
+        intern_sortinfo should return shared frozen Sortinfos
+        """
+        event = intern_sortinfo({'cvarsort': 'e', 'tense': 'past'})
+        self.assertIsInstance(event, FrozenSortinfo)
+        self.assertEqual(event, EventSortinfo(tense='past'))
+        self.assertIs(intern_sortinfo({'cvarsort': 'e', 'tense': 'past'}), event)
+        self.assertIs(intern_sortinfo([('CVARSORT', 'E'), ('TENSE', 'PAST')]), event)
+        self.assertIs(intern_sortinfo(EventSortinfo(tense='past')), event)
+        # Underspecified values are equal, but not identical
+        underspecified = intern_sortinfo({'cvarsort': 'e', 'tense': 'past', 'sf': 'u'})
+        self.assertEqual(underspecified, event)
+        self.assertIsNot(underspecified, event)
+        self.assertEqual(underspecified.sf, 'u')
+    
+    def test_PackedSortinfo_roundtrip(self):
+        """
+        Packing and unpacking should give an identical Sortinfo,
+        including which underspecified value was used
+        """
+        for sortinfo in (Sortinfo(),
+                         EventSortinfo('prop', 'past', 'indicative', '-', '-'),
+                         EventSortinfo(None, '?', 'u', '-', None),
+                         InstanceSortinfo('3', 'sg', 'f', '+', 'std')):
+            unpacked = sortinfo.pack().unpack()
+            self.assertIs(type(unpacked), type(sortinfo))
+            self.assertEqual(repr(unpacked), repr(sortinfo))
+            self.assertEqual(str(sortinfo.pack()), str(sortinfo))
+    
+    def test_PackedSortinfo_cmp(self):
+        """
+        Packed Sortinfos should compare in the same way as Sortinfos,
+        and equal Sortinfos should have equal hashes
+        """
+        sortinfos = [Sortinfo(),
+                     EventSortinfo('prop', 'past', 'indicative', '-', '-'),
+                     EventSortinfo('prop', 'past', 'indicative', '-', '-'),
+                     InstanceSortinfo('3', 'sg', 'f', '+', '+'),
+                     EventSortinfo(None, '?', 'u', '-', '-'),
+                     InstanceSortinfo(None, '?', 'u', '+', '+'),
+                     EventSortinfo('prop', 'past', 'indicative', None, None),
+                     EventSortinfo('prop', 'past', 'indicative', 'u', '?'),
+                     InstanceSortinfo('3', 'sg', 'f', None, None)]
+        for first in sortinfos:
+            for second in sortinfos:
+                first_packed = first.pack()
+                second_packed = second.pack()
+                self.assertEqual(first_packed == second_packed, first == second)
+                self.assertEqual(first_packed != second_packed, first != second)
+                self.assertEqual(first_packed < second_packed, first < second)
+                self.assertEqual(first_packed > second_packed, first > second)
+                if first == second:
+                    self.assertEqual(hash(first_packed), hash(second_packed))
+                if first.cvarsort == 'i' or first.cvarsort == second.cvarsort:
+                    self.assertEqual(first_packed <= second_packed, first <= second)
+                    self.assertEqual(second_packed >= first_packed, first <= second)
+        with self.assertRaises(AttributeError):
+            sortinfos[1].pack().values = 0
+        with self.assertRaises(AttributeError):
+            del sortinfos[1].pack().values
+        # Unpacked Sortinfos are packed before comparing, and other types are not equal
+        self.assertEqual(sortinfos[1].pack(), sortinfos[2])
+        self.assertTrue(sortinfos[6].pack() <= sortinfos[1])
+        self.assertTrue(sortinfos[1].pack() >= sortinfos[6])
+        self.assertFalse(sortinfos[1].pack() < sortinfos[2])
+        self.assertNotEqual(sortinfos[1].pack(), 'e')
+        with self.assertRaises(TypeError):
+            sortinfos[1].pack() <= 'e'
+    
     def test_Sortinfo_features(self):
         """
         We should be able to add new features to subclasses
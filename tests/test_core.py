@@ -1,5 +1,7 @@
 import unittest
+from operator import attrgetter
 
+from pydmrs.components import RealPred, GPred, EventSortinfo, InstanceSortinfo, FrozenSortinfo, TRUSTED, validation_level
 from pydmrs.core import (
     Link, LinkLabel,
     Node, PointerNode,
@@ -7,10 +9,50 @@ from pydmrs.core import (
     SetDict, DictDmrs,
     PointerMixin, ListPointDmrs, DictPointDmrs,
     SortDictDmrs,
+    LazyMixin, LazyListDmrs, LazyDictDmrs,
     filter_links
 )
 
 
+class TupleDmrs(Dmrs):
+    """
+    A minimal graph class outside pydmrs, which does not define _copy_containers (for testing copying)
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.node_dict = {}
+        self.link_list = []
+        super().__init__(*args, **kwargs)
+
+    def add_node(self, node):
+        self.node_dict[node.nodeid] = node
+
+    def add_link(self, link):
+        self.link_list.append(link)
+
+    def iter_nodes(self):
+        return iter(self.node_dict.values())
+
+    def iter_links(self):
+        return iter(self.link_list)
+
+    def __getitem__(self, nodeid):
+        return self.node_dict[nodeid]
+
+    def __iter__(self):
+        return iter(self.node_dict)
+
+    def __len__(self):
+        return len(self.node_dict)
+
+
+class AspectSortinfo(EventSortinfo):
+    """
+    An event sortinfo with an extra feature (for testing pickling)
+    """
+    __slots__ = ('aspect',)
+
+
 class TestLink(unittest.TestCase):
     """
     Test methods of Link and LinkLabel classes
@@ -173,3 +215,272 @@ class TestNode(unittest.TestCase):
         # Different sortinfo.
         node2 = Node(pred='_the_q', sortinfo=sortinfo2, carg='Kim')
         self.assertNotEqual(node1, node2)
+
+    def test_Node_sort_key(self):
+        """
+        Sort keys should order nodes by pred, carg, then sortinfo,
+        and equal nodes should have equal keys
+        """
+        nodes = [Node(1, 'named', carg='Kim'),
+                 Node(2, '_cat_n_1', {'cvarsort': 'x', 'num': 'sg'}),
+                 Node(3, '_cat_n_1', {'cvarsort': 'x', 'num': 'pl'}),
+                 Node(4, 'named', carg='Jane'),
+                 Node(5),
+                 Node(6, '_cat_n_1', {'cvarsort': 'x', 'num': 'pl'}, cfrom=0, cto=3)]
+        self.assertEqual([n.nodeid for n in sorted(nodes, key=lambda n: n.sort_key)],
+                         [5, 3, 6, 2, 4, 1])
+        for node in nodes:
+            for other in nodes:
+                self.assertEqual(node == other, node.sort_key == other.sort_key)
+
+    def test_Node_sort_key_update(self):
+        """
+        Sort keys should follow changes to the pred, carg, or sortinfo
+        """
+        node = Node(1, 'named', {'cvarsort': 'x', 'num': 'sg'}, carg='Kim')
+        node.carg = 'Jane'
+        self.assertEqual(node.sort_key, Node(pred='named', sortinfo={'cvarsort': 'x', 'num': 'sg'}, carg='Jane').sort_key)
+        node.pred = RealPred('cat', 'n', '1')
+        self.assertEqual(node.sort_key[0], RealPred('cat', 'n', '1').sort_key)
+        node.sortinfo = InstanceSortinfo(num='pl')
+        self.assertEqual(node.sort_key[3], ('x', (('num', 'pl'),)))
+        node.sortinfo.num = 'sg'
+        self.assertEqual(node.sort_key[3], ('x', (('num', 'sg'),)))
+
+    def test_Node_carg_validation(self):
+        """
+        Quotes around cargs should always be stripped,
+        but other quotes are only checked if the validation level is STRICT
+        """
+        self.assertEqual(Node(carg='"Kim"').carg, 'Kim')
+        with self.assertRaises(ValueError):
+            Node(carg='K"im')
+        with validation_level(TRUSTED):
+            self.assertEqual(Node(carg='"Kim"').carg, 'Kim')
+            self.assertEqual(Node(carg='K"im').carg, 'K"im')
+
+    def test_Node_copy(self):
+        """
+        copy.copy should return an equal Node, sharing the sortinfo.
+        copy.deepcopy should return an equal Node, with a new (mutable) sortinfo,
+        but sharing the (immutable) pred.
+        """
+        from copy import copy, deepcopy
+        node = Node(nodeid=1, pred='_cat_n_1', sortinfo=InstanceSortinfo(num='sg'), cfrom=0, cto=3)
+        node_copy = copy(node)
+        node_deep = deepcopy(node)
+        for new in (node_copy, node_deep):
+            self.assertIsNot(node, new)
+            self.assertEqual(node, new)
+            self.assertEqual(new.nodeid, 1)
+            self.assertEqual(new.span, (0, 3))
+            self.assertIs(node.pred, new.pred)
+        self.assertIs(node.sortinfo, node_copy.sortinfo)
+        self.assertIsNot(node.sortinfo, node_deep.sortinfo)
+        self.assertEqual(node.sortinfo, node_deep.sortinfo)
+        # Frozen sortinfos are shared
+        node = Node(nodeid=1, pred='_cat_n_1', sortinfo={'cvarsort': 'x', 'num': 'sg'})
+        self.assertIs(node.sortinfo, deepcopy(node).sortinfo)
+
+    def test_Node_sortinfo_interned(self):
+        """
+        Sortinfos given as dicts or (key, value) pairs should be frozen,
+        and equal sortinfos should be shared between nodes
+        """
+        node1 = Node(pred='_cat_n_1', sortinfo={'cvarsort': 'x', 'num': 'sg'})
+        node2 = Node(pred='_dog_n_1', sortinfo={'CVARSORT': 'x', 'NUM': 'SG'})
+        node3 = Node(pred='_dog_n_1', sortinfo=[('cvarsort', 'x'), ('num', 'sg')])
+        self.assertIsInstance(node1.sortinfo, InstanceSortinfo)
+        self.assertIsInstance(node1.sortinfo, FrozenSortinfo)
+        self.assertIs(node1.sortinfo, node2.sortinfo)
+        self.assertIs(node1.sortinfo, node3.sortinfo)
+        with self.assertRaises(TypeError):
+            node1.sortinfo['num'] = 'pl'
+        # Sortinfo objects are kept as they are
+        sortinfo = InstanceSortinfo(num='sg')
+        self.assertIs(Node(sortinfo=sortinfo).sortinfo, sortinfo)
+
+
+class TestDmrs(unittest.TestCase):
+    """
+    Test methods for Dmrs classes.
+    """
+    def example_dmrs(self, cls):
+        return cls([cls.Node(1, '_the_q'),
+                    cls.Node(2, '_cat_n_1', {'cvarsort': 'x', 'num': 'sg'}),
+                    cls.Node(3, '_sleep_v_1', {'cvarsort': 'e', 'tense': 'past'})],
+                   [Link(1, 2, 'RSTR', 'H'), Link(3, 2, 'ARG1', 'NEQ')],
+                   index=3, top=3)
+
+    def test_Dmrs_copy(self):
+        """
+        copy.copy should return a new graph sharing the same nodes.
+        copy.deepcopy should return a new graph with new nodes.
+        Changing the copies should not change the original.
+        """
+        from copy import copy, deepcopy
+        for cls in (ListDmrs, DictDmrs, ListPointDmrs, DictPointDmrs, SortDictDmrs):
+            dmrs = self.example_dmrs(cls)
+            for new in (copy(dmrs), deepcopy(dmrs)):
+                self.assertIs(type(new), cls)
+                self.assertEqual(sorted(new), [1, 2, 3])
+                self.assertEqual(set(new.iter_links()), set(dmrs.iter_links()))
+                self.assertIs(new.index, new[3])
+                self.assertIs(new.top, new[3])
+                new.remove_node(1)
+                self.assertEqual(len(dmrs), 3)
+                self.assertEqual(dmrs.count_links(), 2)
+                self.assertEqual(new.count_links(), 1)
+            shallow = copy(dmrs)
+            deep = deepcopy(dmrs)
+            self.assertIs(shallow[2], dmrs[2])
+            self.assertIsNot(deep[2], dmrs[2])
+            self.assertEqual(deep[2], dmrs[2])
+            self.assertIs(deep[2].pred, dmrs[2].pred)
+        # Classes which do not copy their own containers are copied with add_node and add_link
+        dmrs = self.example_dmrs(TupleDmrs)
+        dmrs.score = 0.5
+        for new in (copy(dmrs), deepcopy(dmrs)):
+            self.assertIs(type(new), TupleDmrs)
+            self.assertEqual(sorted(new), [1, 2, 3])
+            self.assertEqual(new.link_list, dmrs.link_list)
+            self.assertIsNot(new.link_list, dmrs.link_list)
+            self.assertIs(new.index, new[3])
+            self.assertEqual(new.score, 0.5)
+        self.assertIsNot(deepcopy(dmrs)[2], dmrs[2])
+
+    def test_PointDmrs_deepcopy(self):
+        """
+        Nodes in a deep copy of a pointer graph should point to the new graph
+        """
+        from copy import deepcopy
+        for cls in (ListPointDmrs, DictPointDmrs):
+            dmrs = self.example_dmrs(cls)
+            deep = deepcopy(dmrs)
+            for node in deep.iter_nodes():
+                self.assertIs(node.graph, deep)
+            self.assertEqual(deep[2].incoming, dmrs[2].incoming)
+            # Copying a single node does not copy the graph
+            self.assertIsNone(deepcopy(dmrs[2]).graph)
+
+    def test_SortDictDmrs_copy(self):
+        """
+        A copy of a SortDictDmrs should keep its sorted order when modified
+        """
+        from copy import deepcopy
+        dmrs = SortDictDmrs(self.example_dmrs(ListDmrs).nodes,
+                            self.example_dmrs(ListDmrs).links,
+                            node_key=lambda n: -n.nodeid)
+        deep = deepcopy(dmrs)
+        deep.remove_node(3)
+        deep.add_node(Node(4, '_dog_n_1'))
+        deep.add_link(Link(1, 4, 'RSTR', 'H'))
+        self.assertEqual(list(deep), [4, 2, 1])
+        self.assertEqual(deep.links, [Link(1, 4, 'RSTR', 'H'), Link(1, 2, 'RSTR', 'H')])
+        self.assertEqual(list(dmrs), [3, 2, 1])
+
+    def test_Dmrs_pickle(self):
+        """
+        Unpickling should give an equal graph of the same class, with rebuilt indexes,
+        keeping non-standard attributes and mutable sortinfos
+        """
+        import pickle
+        for cls in (ListDmrs, DictDmrs, ListPointDmrs, DictPointDmrs, SortDictDmrs):
+            dmrs = self.example_dmrs(cls)
+            dmrs[1].sortinfo = InstanceSortinfo(num='sg')
+            dmrs[2].pred_id = 5
+            dmrs.score = 0.5
+            new = pickle.loads(pickle.dumps(dmrs))
+            self.assertIs(type(new), cls)
+            self.assertEqual(sorted(new), [1, 2, 3])
+            for nodeid in new:
+                self.assertEqual(new[nodeid], dmrs[nodeid])
+            self.assertEqual(set(new.iter_links()), set(dmrs.iter_links()))
+            self.assertEqual(new.get_in(2), dmrs.get_in(2))
+            self.assertIs(new.index, new[3])
+            self.assertIs(new.top, new[3])
+            self.assertEqual(new[2].pred_id, 5)
+            self.assertEqual(new.score, 0.5)
+            new[1].sortinfo.num = 'pl'
+            self.assertIsInstance(new[2].sortinfo, FrozenSortinfo)
+            if issubclass(cls, PointerMixin):
+                self.assertIs(new[2].graph, new)
+                self.assertIsNone(pickle.loads(pickle.dumps(dmrs[2])).graph)
+        # Sorted graphs keep their keys
+        dmrs = SortDictDmrs(self.example_dmrs(ListDmrs).nodes,
+                            self.example_dmrs(ListDmrs).links,
+                            node_key=attrgetter('cfrom', 'nodeid'))
+        new = pickle.loads(pickle.dumps(dmrs))
+        new.add_node(Node(0, '_dog_n_1'))
+        self.assertEqual(list(new)[0], 0)
+        # Preds and sortinfos are kept exactly, including user-defined sortinfo classes
+        dmrs = ListDmrs([Node(1, RealPred('a_b', 'n')), Node(2, GPred('predsort')),
+                         Node(3, sortinfo=AspectSortinfo(tense='past', aspect='perf')),
+                         Node(4, sortinfo=AspectSortinfo(aspect='prog').freeze())])
+        new = pickle.loads(pickle.dumps(dmrs))
+        self.assertEqual((new[1].pred, new[2].pred), (RealPred('a_b', 'n'), GPred('predsort')))
+        self.assertIs(type(new[2].pred), GPred)
+        self.assertIs(type(new[3].sortinfo), AspectSortinfo)
+        self.assertEqual((new[3].sortinfo.tense, new[3].sortinfo.aspect), ('past', 'perf'))
+        self.assertEqual(new[4].sortinfo, dmrs[4].sortinfo)
+        self.assertIsInstance(new[4].sortinfo, FrozenSortinfo)
+        # Attributes set by constructors are not pickled as extra attributes
+        for cls in (ListDmrs, DictDmrs, ListPointDmrs, DictPointDmrs, SortDictDmrs, LazyListDmrs, LazyDictDmrs):
+            self.assertLessEqual(set(cls().__dict__), cls._standard_attributes)
+
+    def test_LazyMixin(self):
+        """
+        A lazy graph should only be loaded when something other than its simple attributes is accessed
+        """
+        class LazyListPointDmrs(LazyMixin, ListPointDmrs):
+            pass
+        for cls in (LazyListDmrs, LazyDictDmrs, LazyListPointDmrs):
+            calls = []
+
+            def loader():
+                calls.append(cls)
+                return self.example_dmrs(cls)
+
+            dmrs = cls.lazy(loader, cfrom=0, cto=13, surface='the cat slept', ident=7)
+            self.assertEqual((dmrs.cfrom, dmrs.cto, dmrs.surface, dmrs.ident), (0, 13, 'the cat slept', 7))
+            dmrs.ident = 8
+            self.assertFalse(dmrs.loaded)
+            self.assertEqual(calls, [])
+            self.assertEqual(sorted(dmrs), [1, 2, 3])
+            self.assertTrue(dmrs.loaded)
+            self.assertIs(dmrs.index, dmrs[3])
+            self.assertEqual(dmrs.ident, 8)
+            self.assertEqual(dmrs.count_links(), 2)
+            dmrs.load()
+            self.assertEqual(len(calls), 1)
+            self.assertRaises(AttributeError, getattr, dmrs, 'missing')
+            if issubclass(cls, PointerMixin):
+                self.assertIs(dmrs[2].graph, dmrs)
+        # Graphs constructed directly are already loaded
+        self.assertTrue(self.example_dmrs(LazyListDmrs).loaded)
+        # Copying a lazy graph loads it once, and the copy is loaded
+        from copy import copy, deepcopy
+        for copy_function in (copy, deepcopy):
+            calls = []
+
+            def loader():
+                calls.append(None)
+                return self.example_dmrs(LazyListDmrs)
+
+            dmrs = LazyListDmrs.lazy(loader, ident=7)
+            new = copy_function(dmrs)
+            self.assertTrue(new.loaded)
+            self.assertEqual((sorted(new), new.ident), ([1, 2, 3], 7))
+            self.assertIs(new.index, new[3])
+            self.assertEqual(len(calls), 1)
+
+    def test_Node_pickle(self):
+        """
+        Unpickling a node should give an equal node with the same attributes
+        """
+        import pickle
+        node = Node(nodeid=1, pred='_cat_n_1', sortinfo=InstanceSortinfo(num='sg'), cfrom=0, cto=3, carg='x')
+        node.pred_id = 3
+        new = pickle.loads(pickle.dumps(node))
+        self.assertEqual(new, node)
+        self.assertEqual((new.nodeid, new.span, new.carg, new.pred_id), (1, (0, 3), 'x', 3))
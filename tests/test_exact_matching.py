@@ -0,0 +1,139 @@
+import time
+import unittest
+import warnings
+
+from pydmrs.core import ListDmrs
+from pydmrs.develop.graphlang import parse_graphlang
+from pydmrs.matching.exact_matching import dmrs_exact_matching
+from pydmrs.matching.index import NodeIndex
+from pydmrs.matching.query import dmrs_query
+from pydmrs._exceptions import PydmrsWarning
+
+
+class TestExactMatching(unittest.TestCase):
+    """
+    Test exact (sub)graph matching
+    """
+    dmrs = parse_graphlang('_the_q -rstr/h-> 1:_cat_n_1 x <-1- _chase_v_1 e -2-> 2:_dog_n_1 x <-rstr/h- udef_q;'
+                           ' _big_a_1 e -1/eq-> :2; _small_a_1 e -1/eq-> :1; _fat_a_1 e ==> :2', cls=ListDmrs)
+
+    def assertMatches(self, pattern, expected, **kwargs):
+        """
+        Match a GraphLang pattern, and compare the results,
+        as the preds of the matched nodes in the order of the pattern nodes
+        """
+        sub_dmrs = parse_graphlang(pattern, cls=ListDmrs)
+        results = set()
+        for matching in dmrs_exact_matching(sub_dmrs, self.dmrs, **kwargs):
+            results.add(tuple(str(self.dmrs[matching[sub_nodeid]].pred) for sub_nodeid in sorted(matching)))
+        self.assertEqual(results, set(expected))
+
+    def test_dmrs_exact_matching(self):
+        """
+        Patterns should be matched against all consistent assignments of nodes
+        """
+        self.assertMatches('_chase_v_1 e', [('_chase_v_1',)])
+        self.assertMatches('_?_n_? x', [('_cat_n_1',), ('_dog_n_1',)])
+        self.assertMatches('_chase_v_1 e -2-> _?_n_? x', [('_chase_v_1', '_dog_n_1')])
+        self.assertMatches('_?_a_? e -1/eq-> _?_n_? x <-1- _chase_v_1 e',
+                           [('_small_a_1', '_cat_n_1', '_chase_v_1')])
+        self.assertMatches('_?_q -rstr/h-> _?_n_? x', [('_the_q', '_cat_n_1')])
+        self.assertMatches('node -rstr/h-> _?_n_? x', [('_the_q', '_cat_n_1'), ('udef_q', '_dog_n_1')])
+        self.assertMatches('_chase_v_1 e -2-> _cat_n_1 x', [])
+        self.assertMatches('_eat_v_1 e', [])
+
+    def test_dmrs_exact_matching_links(self):
+        """
+        Links between matched nodes should correspond to the links of the pattern
+        """
+        # underspecified labels
+        self.assertMatches('_chase_v_1 e -?/?-> _?_n_? x', [('_chase_v_1', '_cat_n_1'), ('_chase_v_1', '_dog_n_1')])
+        self.assertMatches('_chase_v_1 e -arg/neq-> _?_n_? x', [('_chase_v_1', '_cat_n_1'), ('_chase_v_1', '_dog_n_1')])
+        self.assertMatches('_chase_v_1 e -1/h-> _?_n_? x', [])
+        # links in the graph must also be in the pattern
+        self.assertMatches('_chase_v_1 e; _small_a_1 e', [('_chase_v_1', '_small_a_1')])
+        self.assertMatches('_?_n_? x; _small_a_1 e', [('_dog_n_1', '_small_a_1')])
+        # undirected EQ links
+        self.assertMatches('_?_n_? x <== _fat_a_1 e', [('_dog_n_1', '_fat_a_1')])
+        self.assertMatches('_?_n_? x ==> _fat_a_1 e', [('_dog_n_1', '_fat_a_1')])
+        self.assertMatches('_?_n_? x -1/eq-> _big_a_1 e', [])
+        # distinct pattern nodes match distinct nodes
+        self.assertMatches('_chase_v_1 e; _chase_v_1 e', [])
+
+    def test_dmrs_exact_matching_index_top(self):
+        """
+        Index and top nodes of the pattern should only match index and top nodes
+        """
+        dmrs = parse_graphlang('**_chase_v_1 e -1-> 1:_cat_n_1 x; *_fast_a_1 e -1/eq-> :1', cls=ListDmrs)
+        for pattern, count in (('**_?_v_? e -1-> _?_n_? x', 1), ('**_?_a_? e', 0), ('*_?_a_? e', 1), ('*_?_?_? e', 1)):
+            self.assertEqual(len(list(dmrs_exact_matching(parse_graphlang(pattern, cls=ListDmrs), dmrs))), count, pattern)
+        self.assertEqual(list(dmrs_exact_matching(parse_graphlang('**_?_n_? x', cls=ListDmrs), self.dmrs)), [])
+
+    def test_dmrs_exact_matching_generic(self):
+        """
+        Patterns of generic nodes should be matched efficiently against long graphs
+        """
+        nodes = ['udef_q -rstr/h-> {}:_n{}_n_1 x <-1- _v{}_v_1 e'.format(i + 1, i, i) for i in range(50)]
+        links = [':{} <-2- _w{}_v_1 e -1-> :{}'.format(i + 1, i, i + 2) for i in range(49)]
+        dmrs = parse_graphlang(';'.join(nodes + links), cls=ListDmrs)
+        for pattern, count in (('node -rstr/h-> node <-1- node', 99),
+                               ('node -rstr/h-> 1:node <-2- node -1-> node <-rstr/h- node; :1 <-1- node', 97),
+                               ('_?_?_? e -1-> _?_?_? x <-2- _?_?_? e', 97),
+                               ('node <-1- node -2-> node -1-> node', 0)):
+            self.assertEqual(len(list(dmrs_exact_matching(parse_graphlang(pattern, cls=ListDmrs), dmrs))), count, pattern)
+
+    def test_dmrs_exact_matching_index(self):
+        """
+        A NodeIndex of the graph can be reused for several patterns
+        """
+        index = NodeIndex(self.dmrs)
+        self.assertMatches('_?_n_? x', [('_cat_n_1',), ('_dog_n_1',)], index=index)
+        self.assertMatches('_chase_v_1 e -1-> _?_n_? x', [('_chase_v_1', '_cat_n_1')], index=index)
+
+    def test_dmrs_exact_matching_budget(self):
+        """
+        The search should stop when its budget is exhausted, and report this
+        """
+        sub_dmrs = parse_graphlang('_?_n_? x', cls=ListDmrs)
+        matchings = dmrs_exact_matching(sub_dmrs, self.dmrs)
+        self.assertEqual(len(list(matchings)), 2)
+        self.assertFalse(matchings.truncated)
+        for kwargs in ({'max_results': 1}, {'max_steps': 1}):
+            matchings = dmrs_exact_matching(sub_dmrs, self.dmrs, **kwargs)
+            self.assertEqual(len(list(matchings)), 1)
+            self.assertTrue(matchings.truncated)
+        # Reaching max_results only truncates the search if there is another matching
+        matchings = dmrs_exact_matching(parse_graphlang('_cat_n_1 x', cls=ListDmrs), self.dmrs, max_results=1)
+        self.assertEqual(len(list(matchings)), 1)
+        self.assertFalse(matchings.truncated)
+        self.assertFalse(matchings.exists())
+        matchings = dmrs_exact_matching(sub_dmrs, self.dmrs, deadline=time.monotonic() - 1)
+        self.assertEqual(list(matchings), [])
+        self.assertTrue(matchings.truncated)
+
+    def test_Matchings_exists(self):
+        """
+        Checking for a matching should not lose it
+        """
+        matchings = dmrs_exact_matching(parse_graphlang('_?_n_? x', cls=ListDmrs), self.dmrs)
+        self.assertTrue(matchings.exists())
+        self.assertTrue(matchings.exists())
+        self.assertEqual(matchings.steps, 1)
+        self.assertEqual(len(list(matchings)), 2)
+        self.assertFalse(matchings.exists())
+        self.assertFalse(dmrs_exact_matching(parse_graphlang('_eat_v_1 e', cls=ListDmrs), self.dmrs).exists())
+
+    def test_dmrs_query_budget(self):
+        """
+        Truncated searches should give a warning
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            results = list(dmrs_query([self.dmrs], '_?x_n_? x', max_results=2))
+        self.assertEqual(sorted(results), [('cat',), ('dog',)])
+        with self.assertWarns(PydmrsWarning):
+            results = list(dmrs_query([self.dmrs, self.dmrs], '_?x_n_? x', results_per_dmrs=True, max_results=1))
+        self.assertEqual(results, [[('cat',)], [('cat',)]])
+        with self.assertWarns(PydmrsWarning):
+            results = list(dmrs_query([self.dmrs], '_?x_n_? x', max_steps=1))
+        self.assertEqual(results, [('cat',)])
@@ -0,0 +1,87 @@
+import unittest
+from io import BytesIO
+
+from pydmrs.components import RealPred, GPred, EventSortinfo, InstanceSortinfo
+from pydmrs.core import Link, Node, ListDmrs, DictDmrs
+from pydmrs.develop.graphlang import parse_graphlang, dumps_graphlang, GraphlangWriter, iter_graphlang
+from pydmrs.mapping.mapping import AnchorNode
+from pydmrs._exceptions import PydmrsValueError
+
+
+def example_dmrs():
+    return ListDmrs([Node(1, RealPred('the', 'q')),
+                     Node(2, RealPred('cat', 'n', '1'), InstanceSortinfo('3', 'sg', None, '+', None)),
+                     Node(3, RealPred('sleep', 'v', '1'), EventSortinfo('prop', 'past', 'indicative', '-', '-')),
+                     Node(4, GPred('named'), InstanceSortinfo(pers='3'), carg='Kim Smith'),
+                     Node(5, GPred('neg'), EventSortinfo('u', 'u', 'u', 'u', 'u')),
+                     Node(6, RealPred('?', 'n', '?'), EventSortinfo(tense='future-ish'), carg='?x')],
+                    [Link(1, 2, 'RSTR', 'H'), Link(3, 2, 'ARG1', 'NEQ'), Link(3, 4, 'L-INDEX', 'EQ'),
+                     Link(5, 3, 'ARG1', 'H'), Link(5, 4, 'MOD', None)],
+                    index=3, top=5)
+
+
+class TestGraphlang(unittest.TestCase):
+    """
+    Test GraphLang serialisation
+    """
+
+    def assert_same_dmrs(self, dmrs, other):
+        self.assertEqual(sorted(dmrs), sorted(other))
+        for nodeid in dmrs:
+            self.assertEqual(dmrs[nodeid], other[nodeid])
+            self.assertEqual(type(dmrs[nodeid].sortinfo), type(other[nodeid].sortinfo))
+        self.assertEqual(sorted(dmrs.iter_links()), sorted(other.iter_links()))
+        self.assertEqual(dmrs.index.nodeid, other.index.nodeid)
+        self.assertEqual(dmrs.top.nodeid, other.top.nodeid)
+
+    def test_dumps_graphlang(self):
+        """
+        Dumped graphs should use shorthands and reference ids, and be parsed to the same graph
+        """
+        dmrs = example_dmrs()
+        string = dumps_graphlang(dmrs)
+        self.assertEqual(string, '_the_q --> _cat_n_1 x[3s_+_] <-1- **1:_sleep_v_1 e[pai--] =l=> named(Kim Smith) x[3____] '
+                                 '<-mod/- *neg e? -1h-> :1; _?_n_??(??x) e[tense=future-ish]')
+        self.assertNotIn('\n', string)
+        self.assert_same_dmrs(parse_graphlang(string), dmrs)
+        self.assertEqual(dumps_graphlang(ListDmrs()), '')
+
+    def test_dumps_graphlang_patterns(self):
+        """
+        Underspecified patterns should be dumped to equivalent GraphLang strings
+        """
+        for pattern in ('_?_?_? <-?- _eat_v_1 e? -2-> pred x',
+                        '[1]:node =2h=> [2]:_a_q <=/heq= _b_n_? e[t=p,perf=?]',
+                        'udef_q --> 1:_?_n x[3p___]; :1 <-1- *_eat_v_1 e[ppi--]; :1 <-r-hndl/- and_c'):
+            dmrs = parse_graphlang(pattern)
+            self.assert_same_nodes_and_links(parse_graphlang(dumps_graphlang(dmrs)), dmrs)
+        self.assertIsInstance(parse_graphlang(dumps_graphlang(parse_graphlang('[3]:_a_q')))[1], AnchorNode)
+
+    def assert_same_nodes_and_links(self, dmrs, other):
+        self.assertEqual([dmrs[nodeid] for nodeid in sorted(dmrs)], [other[nodeid] for nodeid in sorted(other)])
+        self.assertEqual(sorted(dmrs.iter_links()), sorted(other.iter_links()))
+
+    def test_dumps_graphlang_invalid(self):
+        """
+        Graphs which cannot be written in GraphLang should raise an error
+        """
+        for node in (Node(1, GPred('a'), carg='a;b'),
+                     Node(1, None),
+                     Node(1, GPred('a'), InstanceSortinfo(pers='3'), carg='(a)')):
+            self.assertRaises(PydmrsValueError, dumps_graphlang, ListDmrs([node]))
+
+    def test_GraphlangWriter(self):
+        """
+        Graphs should be written one per line, and read back
+        """
+        filehandle = BytesIO()
+        with GraphlangWriter(filehandle, buffer_size=10, flush_every=2) as writer:
+            writer.write_all([example_dmrs(), ListDmrs(), example_dmrs()])
+        self.assertEqual(writer.count, 3)
+        self.assertRaises(PydmrsValueError, writer.write, example_dmrs())
+        self.assertEqual(filehandle.getvalue().count(b'\n'), 3)
+        filehandle.seek(0)
+        graphs = list(iter_graphlang(filehandle, cls=DictDmrs))
+        self.assertEqual([len(dmrs) for dmrs in graphs], [6, 0, 6])
+        self.assertIsInstance(graphs[0], DictDmrs)
+        self.assert_same_dmrs(graphs[2], example_dmrs())
@@ -0,0 +1,93 @@
+import unittest
+
+from pydmrs.components import Pred, RealPred, GPred, Sortinfo, EventSortinfo, InstanceSortinfo
+from pydmrs.core import Node, ListDmrs
+from pydmrs.matching.index import PredIndex, NodeIndex
+
+
+class TestPredIndex(unittest.TestCase):
+    """
+    Test methods of PredIndex class
+    """
+    preds = [RealPred('take', 'v', '1'),
+             RealPred('take', 'v', 'off'),
+             RealPred('take', 'n', '1'),
+             RealPred('take', 'v'),
+             RealPred('jump', 'v', '1'),
+             RealPred('cat', 'n', '1'),
+             RealPred('?', 'v', '1'),
+             GPred('udef_q'),
+             GPred('pron'),
+             GPred('?'),
+             Pred(),
+             None]
+
+    patterns = preds + [RealPred('take', 'u', 'unknown'),
+                        RealPred('take', '?', '1'),
+                        RealPred('take', 'v', '?'),
+                        RealPred('?', '?', '?'),
+                        RealPred('?', 'n', '?'),
+                        RealPred('?', '?', '1'),
+                        RealPred('dog', 'n', '1'),
+                        GPred('card')]
+
+    def test_PredIndex_subsumed(self):
+        """
+        PredIndex.subsumed should find the same items as checking
+        every pred against the pattern
+        """
+        index = PredIndex((pred, i) for i, pred in enumerate(self.preds))
+        self.assertEqual(len(index), len(self.preds))
+        for pattern in self.patterns:
+            if pattern is None:
+                expected = {i for i, pred in enumerate(self.preds) if pred is None}
+            else:
+                expected = {i for i, pred in enumerate(self.preds) if pred is not None and pattern <= pred}
+            self.assertEqual(set(index.subsumed(pattern)), expected, pattern)
+
+    def test_PredIndex_from_dmrs(self):
+        """
+        Graphs should be indexed by nodeid, and corpora by position and nodeid
+        """
+        dmrs = ListDmrs([Node(1, '_the_q'), Node(2, '_cat_n_1'), Node(3, '_dog_n_1')])
+        index = PredIndex.from_dmrs(dmrs)
+        self.assertEqual(set(index.subsumed(RealPred('?', 'n', '?'))), {2, 3})
+        index = PredIndex.from_corpus([dmrs, dmrs])
+        self.assertEqual(set(index.subsumed(RealPred('cat', 'n', '1'))), {(0, 2), (1, 2)})
+
+
+class TestNodeIndex(unittest.TestCase):
+    """
+    Test methods of NodeIndex class
+    """
+    dmrs = ListDmrs([Node(1, '_the_q', Sortinfo()),
+                     Node(2, '_cat_n_1', InstanceSortinfo(num='sg', pers='3')),
+                     Node(3, '_chase_v_1', EventSortinfo(tense='past')),
+                     Node(4, 'udef_q', Sortinfo()),
+                     Node(5, '_dog_n_1', InstanceSortinfo(num='pl', pers='3')),
+                     Node(6, 'named', InstanceSortinfo(num='sg'), carg='Kim'),
+                     Node(7, 'named', InstanceSortinfo(num='sg'), carg='Sandy'),
+                     Node(8, Pred(), EventSortinfo())])
+
+    patterns = [Node(pred=RealPred('?', '?', '?'), sortinfo=Sortinfo()),
+                Node(pred=RealPred('?', 'n', '?'), sortinfo=InstanceSortinfo(num='sg')),
+                Node(pred=RealPred('cat', '?', '?'), sortinfo=InstanceSortinfo()),
+                Node(pred=RealPred('cat', 'n', '1'), sortinfo=EventSortinfo()),
+                Node(pred=GPred('named'), sortinfo=Sortinfo(), carg='Kim'),
+                Node(pred=GPred('named'), sortinfo=Sortinfo(), carg='?'),
+                Node(pred=GPred('?'), sortinfo=Sortinfo()),
+                Node(pred=Pred(), sortinfo=EventSortinfo()),
+                Node(pred=Pred(), sortinfo=InstanceSortinfo(num='sg')),
+                Node(pred=Pred(), sortinfo=Sortinfo(), carg='Sandy'),
+                Node(pred=Pred(), sortinfo=Sortinfo(), carg='Lee')]
+
+    def test_NodeIndex_subsumed(self):
+        """
+        NodeIndex.subsumed should find the same nodes as checking
+        every node against the pattern, in the order of the graph
+        """
+        index = NodeIndex(self.dmrs)
+        self.assertEqual(len(index), len(self.dmrs))
+        for pattern in self.patterns:
+            expected = [node.nodeid for node in self.dmrs.iter_nodes() if pattern <= node]
+            self.assertEqual(index.subsumed(pattern), expected, pattern)
@@ -0,0 +1,496 @@
+import gzip, mmap, os, pathlib, subprocess, sys, tempfile, threading, unittest, warnings
+from io import BytesIO
+from xml.etree.ElementTree import ParseError
+
+import pydmrs
+from pydmrs.components import Pred, RealPred, GPred, EventSortinfo, STRICT, TRUSTED, get_validation_level
+from pydmrs.core import Link, ListDmrs, DictDmrs, LazyListDmrs, LazyDictDmrs
+from pydmrs.serial import (
+    loads_xml, load_xml, dumps_xml, iter_xml, XmlWriter, XML_BACKENDS,
+    dumps_json, loads_json,
+    dump_binary, open_binary, share_corpus, SharedCorpus,
+    index_xml, XmlCorpus,
+    parallel_load, parallel_dump,
+    COMPRESSION_FORMATS, compress, open_compressed
+)
+from pydmrs._exceptions import PydmrsValueError
+
+
+def example_dmrs(cls=ListDmrs):
+    return cls([cls.Node(1, '_the_q'),
+                cls.Node(2, '_cat_n_1', {'cvarsort': 'x', 'num': 'sg'}),
+                cls.Node(3, '_sleep_v_1', {'cvarsort': 'e', 'tense': 'past'}, cfrom=8, cto=13),
+                cls.Node(4, 'named', {'cvarsort': 'x'}, carg='Kim')],
+               [Link(1, 2, 'RSTR', 'H'), Link(3, 2, 'ARG1', 'NEQ')],
+               index=3, top=3)
+
+
+class TestSerial(unittest.TestCase):
+    """
+    Test reading and writing DMRS graphs
+    """
+    def assert_same_dmrs(self, dmrs, other):
+        self.assertEqual(sorted(dmrs), sorted(other))
+        for nodeid in dmrs:
+            self.assertEqual(dmrs[nodeid], other[nodeid])
+            self.assertEqual(dmrs[nodeid].span, other[nodeid].span)
+        self.assertEqual(set(dmrs.iter_links()), set(other.iter_links()))
+        self.assertEqual(dmrs.top.nodeid, other.top.nodeid)
+        self.assertEqual(dmrs.index.nodeid, other.index.nodeid)
+
+    def test_xml_roundtrip(self):
+        """
+        Loading a dumped DMRS should give the same graph
+        """
+        dmrs = example_dmrs()
+        self.assert_same_dmrs(dmrs, loads_xml(dumps_xml(dmrs)))
+        self.assertEqual(loads_xml(dumps_xml(dmrs))[1].pred, RealPred('the', 'q'))
+
+    def test_iter_xml(self):
+        """
+        Graphs should be read one at a time from <dmrslist> documents
+        and from streams of <dmrs> elements, given as bytestrings, files, or chunks
+        """
+        single = dumps_xml(example_dmrs())
+        dmrslist = b'<?xml version="1.0" encoding="utf-8"?>\n<dmrslist>' + single * 3 + b'</dmrslist>\n'
+        stream = b'\n\n'.join([single] * 3)
+        for data in (dmrslist, stream):
+            for source in (data, BytesIO(data), [data[i:i + 10] for i in range(0, len(data), 10)]):
+                graphs = list(iter_xml(source, cls=DictDmrs, chunk_size=7))
+                self.assertEqual(len(graphs), 3)
+                for dmrs in graphs:
+                    self.assertIsInstance(dmrs, DictDmrs)
+                    self.assert_same_dmrs(dmrs, example_dmrs())
+        self.assertEqual(list(iter_xml(b'<dmrslist></dmrslist>')), [])
+        with self.assertRaises(PydmrsValueError):
+            list(iter_xml(b'<dmrslist><mrs></mrs></dmrslist>'))
+
+    def test_iter_xml_concatenated(self):
+        """
+        Concatenated documents, each with an XML declaration or doctype, should be read as a stream,
+        and indexed with the right offsets
+        """
+        single = dumps_xml(example_dmrs())
+        document = b'<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE dmrs [\n<!ELEMENT dmrs ANY>]>\n' + single + b'\n'
+        data = document * 3
+        for chunk_size in (1, 7, len(data)):
+            chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+            graphs = list(iter_xml(chunks))
+            self.assertEqual(len(graphs), 3)
+            for dmrs in graphs:
+                self.assert_same_dmrs(dmrs, example_dmrs())
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'corpus.xml')
+            with open(filename, 'wb') as filehandle:
+                filehandle.write(data)
+            entries = index_xml(filename, chunk_size=5)
+            self.assertEqual([data[offset:offset + length] for offset, length, _ in entries], [single] * 3)
+
+    def test_iter_xml_lazy(self):
+        """
+        Graphs should be produced before the rest of the input is read
+        """
+        def chunks():
+            yield b'<dmrslist>' + dumps_xml(example_dmrs())
+            raise AssertionError("input read too early")
+        self.assertEqual(len(next(iter_xml(chunks()))), 4)
+
+    def test_XmlWriter(self):
+        """
+        XmlWriter should write a <dmrslist> of graphs,
+        with the same markup for each graph as dumps_xml
+        """
+        dmrs = example_dmrs()
+        dmrs[4].carg = 'K&m <x>'
+        dmrs.add_link(Link(4, 3, None, 'EQ'))
+        filehandle = BytesIO()
+        with XmlWriter(filehandle, buffer_size=100, flush_every=2) as writer:
+            writer.write(dmrs)
+            writer.write_all([dmrs, example_dmrs(DictDmrs)])
+        self.assertEqual(writer.count, 3)
+        output = filehandle.getvalue()
+        self.assertIn(dumps_xml(dmrs) + b'\n' + dumps_xml(dmrs), output)
+        graphs = list(iter_xml(output))
+        self.assertEqual(len(graphs), 3)
+        self.assert_same_dmrs(graphs[0], dmrs)
+        self.assertEqual(graphs[0][4].carg, 'K&m <x>')
+        self.assert_same_dmrs(graphs[2], example_dmrs())
+        with self.assertRaises(PydmrsValueError):
+            writer.write(dmrs)
+
+    def test_binary(self):
+        """
+        Graphs in a binary corpus should be accessible by position,
+        with the same nodes, links, and attributes as the original graphs
+        """
+        graphs = [example_dmrs(), example_dmrs(DictDmrs), ListDmrs(surface='', ident=7)]
+        graphs[1].remove_node(1)
+        graphs[1].add_node(DictDmrs.Node(5, GPred('udef_q'), EventSortinfo(tense='?'), surface='a', base='é'))
+        graphs[1].ident = 3
+        graphs[1].cfrom, graphs[1].cto = 0, 13
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'corpus.bin')
+            with open(filename, 'wb') as filehandle:
+                self.assertEqual(dump_binary(filehandle, iter(graphs)), 3)
+            with open_binary(filename, cls=DictDmrs) as corpus:
+                self.assertEqual(len(corpus), 3)
+                self.assert_same_dmrs(corpus[0], graphs[0])
+                dmrs = corpus[-2]
+                self.assertIsInstance(dmrs, DictDmrs)
+                self.assertEqual(sorted(dmrs), [2, 3, 4, 5])
+                self.assertEqual(set(dmrs.iter_links()), set(graphs[1].iter_links()))
+                self.assertEqual((dmrs.ident, dmrs.cfrom, dmrs.cto, dmrs.surface), (3, 0, 13, None))
+                self.assertEqual(dmrs[5].pred, GPred('udef_q'))
+                self.assertEqual(dmrs[5].sortinfo.tense, '?')
+                self.assertEqual((dmrs[5].surface, dmrs[5].base, dmrs[5].span), ('a', 'é', (None, None)))
+                self.assertEqual((dmrs[4].carg, dmrs[3].span), ('Kim', (8, 13)))
+                self.assertIs(corpus[0][2].sortinfo, corpus[1][2].sortinfo)
+                empty = corpus[2]
+                self.assertEqual((len(empty), empty.surface, empty.ident, empty.top), (0, '', 7, None))
+                self.assertEqual(len(list(corpus)), 3)
+                with self.assertRaises(IndexError):
+                    corpus[3]
+            with open_binary(pathlib.Path(filename)) as corpus:
+                self.assert_same_dmrs(corpus[0], graphs[0])
+            with open(filename, 'wb') as filehandle:
+                filehandle.write(b'<dmrslist></dmrslist>')
+            with self.assertRaises(PydmrsValueError):
+                open_binary(filename)
+            # The header must be at the start of the file
+            with open(filename, 'wb') as filehandle:
+                filehandle.write(b'data')
+                with self.assertRaises(PydmrsValueError):
+                    dump_binary(filehandle, iter(graphs))
+            open(filename, 'wb').close()
+            with self.assertRaises(PydmrsValueError):
+                open_binary(filename)
+
+    def test_XmlCorpus(self):
+        """
+        Graphs in an indexed XML corpus should be accessible by position and by ident,
+        and the index should be rebuilt if the corpus changes
+        """
+        graphs = []
+        for ident in (10, 20, 30):
+            dmrs = example_dmrs()
+            dmrs.ident = ident
+            graphs.append(dumps_xml(dmrs).replace(b'<dmrs ', '<dmrs ident="{}" '.format(ident).encode()))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'corpus.xml')
+            for data in (b'<?xml version="1.0"?>\n<dmrslist>\n' + b'\n'.join(graphs) + b'\n</dmrslist>',
+                         b''.join(graphs)):
+                with open(filename, 'wb') as filehandle:
+                    filehandle.write(data)
+                os.utime(filename, ns=(0, len(data)))  # Make sure the modification time changes
+                entries = index_xml(filename)
+                self.assertEqual([data[offset:offset + length] for offset, length, _ in entries], graphs)
+                self.assertEqual([ident for _, _, ident in entries], [10, 20, 30])
+                with XmlCorpus(filename, cls=DictDmrs) as corpus:
+                    self.assertEqual(len(corpus), 3)
+                    self.assert_same_dmrs(corpus[-1], example_dmrs())
+                    self.assertEqual(corpus.by_ident(20).ident, 20)
+                    self.assertEqual(corpus.position(30), 2)
+                    self.assertEqual([dmrs.ident for dmrs in corpus], [10, 20, 30])
+            # Changing the corpus should rebuild the index
+            with open(filename, 'wb') as filehandle:
+                filehandle.write(graphs[1])
+            with XmlCorpus(filename) as corpus:
+                self.assertEqual(len(corpus), 1)
+                self.assertEqual(corpus[0].ident, 20)
+            # Reading should only write an index if asked to (and a failed write should not matter)
+            os.remove(filename + '.idx')
+            with XmlCorpus(filename) as corpus:
+                self.assertEqual(len(corpus), 1)
+            self.assertEqual(len(list(parallel_load([filename], workers=0))), 1)
+            self.assertFalse(os.path.exists(filename + '.idx'))
+            with XmlCorpus(filename, index_path=os.path.join(tmpdir, 'missing', 'corpus.idx')) as corpus:
+                self.assertEqual(corpus[0].ident, 20)
+            with XmlCorpus(filename, write_index=True) as corpus:
+                self.assertEqual(len(corpus), 1)
+            self.assertTrue(os.path.exists(filename + '.idx'))
+
+    def test_load_xml_buffers(self):
+        """
+        Graphs should be loaded from bytes-like objects, strings, files, and filenames
+        """
+        dmrs = example_dmrs()
+        data = dumps_xml(dmrs)
+        self.assert_same_dmrs(loads_xml(memoryview(b'  ' + data)[2:]), dmrs)
+        self.assert_same_dmrs(loads_xml(bytearray(data)), dmrs)
+        self.assert_same_dmrs(loads_xml(data.decode('utf-8')), dmrs)
+        with self.assertWarns(DeprecationWarning):
+            self.assert_same_dmrs(loads_xml(data.decode('utf-8'), encoding='utf-8'), dmrs)
+        # The given encoding overrides the XML declaration
+        latin = ('<?xml version="1.0" encoding="utf-8"?>\n'
+                 '<dmrs><node nodeid="1"><realpred lemma="caf\xe9" pos="n"/></node></dmrs>').encode('latin-1')
+        with self.assertRaises(ParseError):
+            loads_xml(latin)
+        self.assertEqual(loads_xml(latin, encoding='latin-1')[1].pred, RealPred('caf\xe9', 'n'))
+        self.assert_same_dmrs(DictDmrs.load_xml(BytesIO(data)), dmrs)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'graph.xml')
+            with open(filename, 'wb') as filehandle:
+                filehandle.write(b'<!-- skipped -->' + data)
+            for source in (filename, pathlib.Path(filename)):
+                self.assertIsInstance(load_xml(source, cls=DictDmrs), DictDmrs)
+            with open(filename, 'rb') as filehandle:
+                filehandle.read(len(b'<!-- skipped -->'))
+                self.assert_same_dmrs(load_xml(filehandle), dmrs)
+                self.assertEqual(filehandle.read(), b'')
+            with open(filename, 'r+b') as filehandle:
+                buffer = mmap.mmap(filehandle.fileno(), 0)
+                self.assertEqual(len(list(iter_xml(buffer, chunk_size=10))), 1)
+                lazy = loads_xml(memoryview(buffer)[len(b'<!-- skipped -->'):], cls=LazyListDmrs)
+                # The graph is parsed from the memory map, so later changes are seen
+                buffer[buffer.find(b'"cat"') + 1] = ord(b'b')
+                self.assertEqual(lazy[2].pred, RealPred('bat', 'n', '1'))
+                del lazy
+                buffer.close()
+            with open(filename, 'wb') as filehandle:
+                filehandle.write(gzip.compress(data))
+            self.assert_same_dmrs(load_xml(filename), dmrs)
+
+    def test_lazy(self):
+        """
+        Corpus readers should produce lazy graphs with the simple attributes set,
+        and nodes and links parsed on first access
+        """
+        dmrs = example_dmrs()
+        dmrs.cfrom, dmrs.cto, dmrs.surface, dmrs.ident = 0, 13, 'The cat & Kim', 5
+        data = dumps_xml(dmrs).replace(b'<dmrs ', b'<dmrs surface="The cat &amp; Kim" ident="5" ')
+        lazy = loads_xml(data, cls=LazyDictDmrs)
+        self.assertIsInstance(lazy, LazyDictDmrs)
+        self.assertEqual((lazy.cfrom, lazy.cto, lazy.surface, lazy.ident), (0, 13, 'The cat & Kim', 5))
+        self.assertFalse(lazy.loaded)
+        self.assert_same_dmrs(lazy, dmrs)
+        self.assertTrue(lazy.loaded)
+        # Errors in nodes and links are only found when loading
+        broken = loads_xml(data.replace(b'</node>', b'</node><x />', 1), cls=LazyListDmrs)
+        self.assertEqual(broken.ident, 5)
+        self.assertRaises(PydmrsValueError, broken.load)
+        self.assertFalse(broken.loaded)
+        self.assertRaises(ParseError, loads_xml, b'<dmrs ident="1"', cls=LazyListDmrs)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'corpus.bin')
+            with open(filename, 'wb') as filehandle:
+                dump_binary(filehandle, [example_dmrs(), dmrs])
+            with open_binary(filename, cls=LazyListDmrs) as corpus:
+                lazy = corpus[1]
+                self.assertEqual((lazy.cfrom, lazy.surface, lazy.ident), (0, 'The cat & Kim', 5))
+                self.assertFalse(lazy.loaded)
+                self.assert_same_dmrs(lazy, dmrs)
+            filename = os.path.join(tmpdir, 'corpus.xml')
+            with open(filename, 'wb') as filehandle:
+                filehandle.write(data)
+            with XmlCorpus(filename, cls=LazyListDmrs) as corpus:
+                self.assertEqual(corpus[0].surface, 'The cat & Kim')
+                self.assert_same_dmrs(corpus.by_ident(5), dmrs)
+                lazy = corpus[0]
+            # Closing the corpus should not invalidate lazy graphs
+            self.assert_same_dmrs(lazy, dmrs)
+
+    def test_parallel(self):
+        """
+        Graphs should be loaded from files and bytestrings in worker processes,
+        and dumped as a <dmrslist>, in order
+        """
+        graphs = []
+        for i in range(7):
+            dmrs = example_dmrs()
+            dmrs.cfrom, dmrs.cto = i, 13
+            graphs.append(dmrs)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'corpus.xml')
+            with open(filename, 'wb') as filehandle:
+                self.assertEqual(parallel_dump(filehandle, graphs, workers=2, batch_size=2), 7)
+            with open(filename, 'rb') as filehandle:
+                data = filehandle.read()
+            self.assertEqual(len(list(iter_xml(data))), 7)
+            for workers in (0, 2):
+                loaded = list(parallel_load([filename, dumps_xml(graphs[0])], workers=workers,
+                                            cls=DictDmrs, batch_size=3, max_pending=1))
+                self.assertEqual([dmrs.cfrom for dmrs in loaded], list(range(7)) + [0])
+                for dmrs in loaded:
+                    self.assertIsInstance(dmrs, DictDmrs)
+                    self.assert_same_dmrs(dmrs, example_dmrs())
+            unordered = parallel_load([filename], workers=2, batch_size=1, ordered=False)
+            self.assertEqual(len(list(unordered)), 7)
+
+    def test_compression(self):
+        """
+        Compressed corpora should be detected and read transparently,
+        and written as independently compressed members, in parallel
+        """
+        graphs = []
+        for i in range(5):
+            dmrs = example_dmrs()
+            dmrs.cfrom, dmrs.cto = i, 13
+            graphs.append(dmrs)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for compression in COMPRESSION_FORMATS:
+                filename = os.path.join(tmpdir, 'corpus.' + compression)
+                with open(filename, 'wb') as filehandle:
+                    with XmlWriter(filehandle, buffer_size=1, compression=compression, level=1) as writer:
+                        writer.write_all(graphs)
+                with open(filename, 'rb') as filehandle:
+                    loaded = list(iter_xml(filehandle, chunk_size=7))
+                self.assertEqual([dmrs.cfrom for dmrs in loaded], list(range(5)))
+                self.assert_same_dmrs(loaded[0], example_dmrs())
+                with open(filename, 'wb') as filehandle:
+                    self.assertEqual(parallel_dump(filehandle, graphs, workers=0, batch_size=2,
+                                                   compression=compression), 5)
+                loaded = list(parallel_load([filename], workers=0, batch_size=2))
+                self.assertEqual([dmrs.cfrom for dmrs in loaded], list(range(5)))
+                with open_compressed(filename) as filehandle:
+                    self.assertEqual(len(list(iter_xml(filehandle.read()))), 5)
+                self.assertRaises(PydmrsValueError, index_xml, filename)
+            # The format is inferred from the extension when writing, and from the content when reading
+            filename = os.path.join(tmpdir, 'corpus.xml.gz')
+            with open_compressed(filename, 'wb') as filehandle:
+                filehandle.write(dumps_xml(graphs[0]))
+            with open(filename, 'rb') as filehandle:
+                self.assertEqual(filehandle.read(2), b'\x1f\x8b')
+            self.assertEqual(len(list(iter_xml(filename))), 1)
+        self.assertEqual(len(list(iter_xml(compress(dumps_xml(graphs[0]), 'bz2')))), 1)
+        self.assertRaises(PydmrsValueError, list, iter_xml(compress(dumps_xml(graphs[0]), 'gzip')[:-4]))
+        self.assertRaises(PydmrsValueError, compress, b'', 'zip')
+
+    def test_validation(self):
+        """
+        Loads with different validation levels should not affect each other, or the global level
+        """
+        xml = b'<dmrs><node nodeid="1"><gpred>PRON</gpred><sortinfo cvarsort="x" num="sg" /></node></dmrs>'
+        expected = {TRUSTED: GPred('PRON'), STRICT: GPred('pron')}
+        errors = []
+
+        def load(validation):
+            try:
+                for _ in range(200):
+                    node = loads_xml(xml, validation=validation, backend='expat')[1]
+                    if node.pred != expected[validation]:
+                        errors.append((validation, node))
+            except Exception as error:
+                errors.append(error)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            threads = [threading.Thread(target=load, args=(validation,)) for validation in (TRUSTED, STRICT) * 4]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(get_validation_level(), STRICT)
+
+    def test_xml_backends(self):
+        """
+        All XML backends should produce the same graphs, warnings, and errors
+        """
+        documents = [dumps_xml(example_dmrs()),
+                     b'<?xml version="1.0" encoding="utf-8"?>\n'
+                     b'<dmrs cfrom="0" cto="9" surface="Kim &amp; Zo\xc3\xab" ident="4" index="2">\n'
+                     b'  <!-- comment --><node nodeid="1" carg="Kim"><gpred>named_rel</gpred><sortinfo cvarsort="x" /></node>\n'
+                     b'  <node nodeid="2" cfrom="4" cto="9" surface="sings" base="sing">'
+                     b'<realpred lemma="_sing_v_1_rel" /><sortinfo cvarsort="e" tense="pres" /></node>\n'
+                     b'  <node nodeid="3"><gpred>_sing_v_1_rel</gpred></node>\n'
+                     b'  <link from="0" to="2"><rargname /><post>H</post></link>\n'
+                     b'  <link from="2" to="1"><rargname>ARG1</rargname><post>NEQ</post></link>\n'
+                     b'  <link from="3" to="1"><rargname>NIL</rargname><post>EQ<x /> ignored</post></link>\n'
+                     b'</dmrs>']
+        expected = []
+        for data in documents:
+            with warnings.catch_warnings(record=True) as expected_warnings:
+                warnings.simplefilter('always')
+                expected.append((loads_xml(data, backend='etree'), expected_warnings))
+        for backend in ('etree', 'expat', 'lxml'):
+            with self.subTest(backend=backend):
+                if backend not in XML_BACKENDS:
+                    self.skipTest('{} is not installed'.format(backend))
+                for data, (expected_dmrs, expected_warnings) in zip(documents, expected):
+                    with warnings.catch_warnings(record=True) as backend_warnings:
+                        warnings.simplefilter('always')
+                        dmrs = loads_xml(data, cls=DictDmrs, backend=backend)
+                    self.assert_same_dmrs(dmrs, expected_dmrs)
+                    self.assertEqual((dmrs.cfrom, dmrs.cto, dmrs.surface, dmrs.ident),
+                                     (expected_dmrs.cfrom, expected_dmrs.cto, expected_dmrs.surface, expected_dmrs.ident))
+                    for nodeid in dmrs:
+                        self.assertEqual((dmrs[nodeid].carg, dmrs[nodeid].surface, dmrs[nodeid].base),
+                                         (expected_dmrs[nodeid].carg, expected_dmrs[nodeid].surface,
+                                          expected_dmrs[nodeid].base))
+                    self.assertEqual([str(w.message) for w in backend_warnings],
+                                     [str(w.message) for w in expected_warnings])
+                with self.assertRaises(PydmrsValueError):
+                    loads_xml(b'<dmrs><node nodeid="1"><pred /></node></dmrs>', backend=backend)
+                with self.assertRaises(PydmrsValueError):
+                    loads_xml(b'<dmrs><link from="1" to="1" /></dmrs>', backend=backend)
+                with self.assertRaises(ParseError):
+                    loads_xml(b'<dmrs><node></dmrs>', backend=backend)
+        with self.assertRaises(PydmrsValueError):
+            loads_xml(documents[0], backend='unknown')
+
+    def test_json(self):
+        """
+        Loading a graph dumped as JSON should give the same graph,
+        with preds and sortinfos stored once
+        """
+        dmrs = example_dmrs()
+        dmrs.add_node(ListDmrs.Node(5, Pred(), EventSortinfo(tense='?'), surface='a', base='b'))
+        dmrs.add_node(ListDmrs.Node(6, '_cat_n_1', {'cvarsort': 'x', 'num': 'sg'}))
+        dmrs.add_node(ListDmrs.Node(7, RealPred('a_b', 'n')))
+        dmrs.add_node(ListDmrs.Node(8, GPred('predsort')))
+        dmrs.ident = 12
+        dictionary = dmrs.to_dict()
+        self.assertEqual(len(dictionary['nodes']), 8)
+        self.assertEqual(len(dictionary['preds']), 7)
+        self.assertEqual(len(dictionary['sortinfos']), 4)
+        for validation in (None, STRICT):
+            for cls in (ListDmrs, DictDmrs):
+                new = loads_json(dumps_json(dmrs), cls=cls, validation=validation)
+                self.assertIsInstance(new, cls)
+                self.assert_same_dmrs(new, dmrs)
+                self.assertEqual(new.ident, 12)
+                self.assertEqual(new[5].pred, Pred())
+                self.assertEqual((new[7].pred, new[8].pred), (RealPred('a_b', 'n'), GPred('predsort')))
+                self.assertEqual(new[5].sortinfo.tense, '?')
+                self.assertEqual((new[5].surface, new[5].base), ('a', 'b'))
+                self.assertEqual(new[4].carg, 'Kim')
+                self.assertIs(new[2].sortinfo, new[6].sortinfo)
+                self.assertEqual(cls.from_dict(new.to_dict()).to_dict(), dictionary)
+
+    def test_SharedCorpus(self):
+        """
+        Graphs in shared memory should be accessible from other processes, by name or by pickling the corpus
+        """
+        import pickle
+        from concurrent.futures import ProcessPoolExecutor
+        graphs = []
+        for ident in range(4):
+            dmrs = example_dmrs()
+            dmrs.ident = ident
+            graphs.append(dmrs)
+        with share_corpus(graphs, cls=DictDmrs) as corpus:
+            self.assertEqual(len(corpus), 4)
+            self.assert_same_dmrs(corpus[1], example_dmrs())
+            self.assertIsInstance(corpus[1], DictDmrs)
+            with SharedCorpus(corpus.name) as attached:
+                self.assertEqual([dmrs.ident for dmrs in attached], [0, 1, 2, 3])
+            with ProcessPoolExecutor(2) as executor:
+                results = list(executor.map(_shared_corpus_idents, [corpus] * 3, [0, 2, -1]))
+            self.assertEqual(results, [(0, 'DictDmrs'), (2, 'DictDmrs'), (3, 'DictDmrs')])
+            self.assertLess(len(pickle.dumps(corpus)), 200)
+            # A separately started process should not free the memory when it exits
+            script = ('from pydmrs.serial import SharedCorpus\n'
+                      'corpus = SharedCorpus({!r})\n'
+                      'print(corpus[2].ident)\n'
+                      'corpus.close()\n').format(corpus.name)
+            root = os.path.dirname(os.path.dirname(os.path.abspath(pydmrs.__file__)))
+            result = subprocess.run([sys.executable, '-c', script], env=dict(os.environ, PYTHONPATH=root),
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+            self.assertEqual(result.stdout.split(), [b'2'])
+            self.assertNotIn(b'leaked', result.stderr)
+            with SharedCorpus(corpus.name) as attached:
+                self.assertEqual(attached[3].ident, 3)
+
+
+def _shared_corpus_idents(corpus, i):
+    return corpus[i].ident, type(corpus[i]).__name__